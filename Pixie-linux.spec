@@ -0,0 +1,86 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Linux build: pyinstaller Pixie-linux.spec
+#   PIXIE_BACKENDS=x11,wayland   backends to bundle typelibs for (default: both, if installed)
+#   PIXIE_STARTUP_CHECK=1.0      after building, run the app once and fail if the first frame takes longer
+import os, subprocess, sys
+
+import gi
+
+def _have(namespace, version):
+    try:
+        gi.require_version(namespace, version)
+        return True
+    except (ValueError, ImportError):
+        return False
+
+backends = [b.strip() for b in os.environ.get("PIXIE_BACKENDS", "x11,wayland").split(",") if b.strip()]
+
+gi_modules = ["GLib", "GObject", "Gio", "GdkPixbuf", "Gdk", "Gtk"]
+hiddenimports = ["gi", "gi._gi", "gi.repository"]
+if "x11" in backends:
+    if _have("GdkX11", "4.0"):
+        gi_modules.append("GdkX11")
+    hiddenimports += ["Xlib", "Xlib.display", "Xlib.X"]
+if "wayland" in backends and _have("Gtk4LayerShell", "1.0"):
+    gi_modules.append("Gtk4LayerShell")
+hiddenimports += [f"gi.repository.{m}" for m in gi_modules]
+
+pack = os.path.join("build", "framepacks", "frames.pack")
+os.makedirs(os.path.dirname(pack), exist_ok=True)
+subprocess.run([sys.executable, "-m", "pixie.framepack", "-o", pack], check=True)
+
+a = Analysis(
+    ['run_pixie.py'],
+    pathex=[],
+    binaries=[],
+    datas=[(pack, 'pixie/assets')],
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={
+        "gi": {
+            "icons": [],
+            "themes": [],
+            "languages": [],
+            "module-versions": {"Gtk": "4.0", "Gdk": "4.0", "GdkX11": "4.0"},
+        },
+    },
+    runtime_hooks=[],
+    excludes=['gi.repository.GdkWin32', 'win32api', 'win32con', 'win32gui', 'tkinter', 'unittest', 'pydoc', 'benchmarks'],
+    noarchive=False,
+    optimize=2,
+)
+a.binaries = [b for b in a.binaries if "pixbufloader-gif" not in b[0] and "pixbufloader_gif" not in b[0]]
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='pixie',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=True,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=True,
+    upx=False,
+    name='pixie',
+)
+
+budget = os.environ.get("PIXIE_STARTUP_CHECK")
+if budget:
+    cmd = [os.path.join(DISTPATH, "pixie", "pixie"), "--startup-check", budget]
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        cmd = ["xvfb-run", "-a"] + cmd
+    rc = subprocess.run(cmd, timeout=120).returncode
+    if rc:
+        raise SystemExit(f"startup check failed: first frame slower than {budget}s (exit {rc})")
@@ -0,0 +1,58 @@
+import argparse, sys
+
+from . import harness
+from . import cases
+from . import e2e
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="run the micro-benchmarks")
+    r.add_argument("-o", "--output", default=None, help="write results as JSON")
+    r.add_argument("-k", "--filter", default=None, help="only run cases whose name contains this")
+    r.add_argument("--repeat", type=int, default=5)
+    r.add_argument("--min-time", type=float, default=0.05)
+    e = sub.add_parser("e2e", help="run pixie under Xvfb with synthetic input and measure it")
+    e.add_argument("-o", "--output", default=None, help="write the report as JSON")
+    e.add_argument("--pets", type=int, default=1)
+    e.add_argument("--scale", type=float, default=1.0)
+    e.add_argument("--color", default=None)
+    e.add_argument("--mix", default=None, help="behavior mix forced over the run, e.g. 'walk=3,run=1,sit=1'")
+    e.add_argument("--mix-every", type=float, default=5.0, help="seconds between forced behavior switches")
+    e.add_argument("--duration", type=float, default=30.0)
+    e.add_argument("--warmup", type=float, default=3.0)
+    e.add_argument("--rate", type=float, default=20.0, help="synthetic input events per second (0 for none)")
+    e.add_argument("--display", default=":99")
+    e.add_argument("--size", default="1920x1080")
+    e.add_argument("--seed", type=int, default=1)
+    e.add_argument("extra", nargs="*", help="extra pixie arguments (after --)")
+    c = sub.add_parser("compare", help="compare two result files")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    c.add_argument("--key", default="min_us", choices=("min_us", "mean_us"))
+    args = p.parse_args(argv)
+
+    if args.cmd == "run":
+        data = harness.run(args.filter, repeat=args.repeat, min_time=args.min_time)
+        if args.output:
+            harness.save(data, args.output)
+        return 0
+    if args.cmd == "e2e":
+        data = e2e.run(args.pets, args.scale, args.color, e2e.parse_mix(args.mix), args.duration, args.warmup,
+                       args.rate, args.mix_every, args.display, args.size, args.extra, args.seed)
+        if args.output:
+            harness.save(data, args.output)
+        return 0
+    base, new = harness.load(args.base), harness.load(args.new)
+    if base.get("kind") == "e2e" or new.get("kind") == "e2e":
+        regressions = e2e.compare(base, new, args.threshold)
+    else:
+        regressions = harness.compare(base, new, args.threshold, args.key)
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import glob, os, sys, types
+
+from .harness import case
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pixie", "assets")
+SIZES  = (32, 64, 128)
+SCALES = (1.0, 2.0, 3.0, 1.5)
+PINK   = (1.0, 0.41, 0.71)
+
+def _assets():
+    return sorted(glob.glob(os.path.join(ASSET_DIR, "*.gif")))
+
+def _pixbuf(size):
+    import gi
+    gi.require_version("GdkPixbuf", "2.0")
+    from gi.repository import GdkPixbuf
+    pix = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, True, 8, size, size)
+    pix.fill(0x80A0C0FF)
+    return pix
+
+@case("render")
+def render_cases():
+    from pixie import render
+    from gi.repository import GdkPixbuf
+    for size in SIZES:
+        src = _pixbuf(size)
+        for factor in SCALES:
+            for tint in (None, PINK):
+                label = f"tint_and_scale/{size}px/x{factor:g}/{'tint' if tint else 'plain'}"
+                yield label, (lambda s=src, f=factor, t=tint: render.tint_and_scale(s, f, t))
+                yield label.replace("tint_and_scale", "render_raw"), (lambda s=src, f=factor, t=tint: render.render_raw(s, f, t, facing=-1))
+        for k in (2, 3, 4):
+            yield f"replicate/{size}px/x{k}", (lambda s=src, k=k: render.replicate(s, k))
+            yield f"scale_simple/{size}px/x{k}", (lambda s=src, k=k: s.scale_simple(
+                s.get_width() * k, s.get_height() * k, GdkPixbuf.InterpType.BILINEAR))
+
+@case("sprite")
+def sprite_cases():
+    from pixie.sprite import AnimatedSprite
+    def build(path):
+        AnimatedSprite(path).stop()
+    for path in _assets():
+        name = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+        yield f"AnimatedSprite/{name}", (lambda p=path: build(p))
+
+def _fake_backends(pos=(20, 10)):
+    return (lambda: None, lambda: pos)
+
+@case("behavior")
+def behavior_cases():
+    from pixie import pointer
+    from pixie.behavior_manager import BehaviorManager
+    chain = _fake_backends()
+    batch = 1000
+    for mode in ("walk", "run", "sit", "idle", "attack", "happy"):
+        bm = BehaviorManager(1920, 1080)
+        def step(bm=bm, mode=mode):
+            saved, pointer._backends = pointer._backends, chain
+            try:
+                x, y = 960.0, 540.0
+                for _ in range(batch):
+                    if bm.mode() != mode:
+                        bm.switch(mode)
+                    x, y, _f = bm.update(x, y)
+            finally:
+                pointer._backends = saved
+        yield f"BehaviorManager.update/{mode}/x{batch}", step
+
+class _FakeXDisplay:
+    class _Root:
+        def query_pointer(self):
+            return types.SimpleNamespace(_data={"root_x": 100, "root_y": 200})
+    def __init__(self, *_):
+        self._root = self._Root()
+    def screen(self):
+        return types.SimpleNamespace(root=self._root)
+
+@case("pointer")
+def pointer_cases():
+    from pixie import pointer
+    fake_xlib = types.ModuleType("Xlib")
+    fake_xlib.display = types.SimpleNamespace(Display=_FakeXDisplay)
+    saved = {k: sys.modules.get(k) for k in ("Xlib", "Xlib.display")}
+    def x11():
+        sys.modules["Xlib"], sys.modules["Xlib.display"] = fake_xlib, fake_xlib.display
+        env = os.environ.pop("WAYLAND_DISPLAY", None)
+        try:
+            return pointer._x11_backend()
+        finally:
+            if env is not None:
+                os.environ["WAYLAND_DISPLAY"] = env
+            for k, v in saved.items():
+                if v is None:
+                    sys.modules.pop(k, None)
+                else:
+                    sys.modules[k] = v
+    yield "backend/gtk", pointer._gtk_backend
+    yield "backend/win", pointer._win_backend
+    yield "backend/x11-fake", x11
+    chain = _fake_backends()
+    def dispatch():
+        saved_chain, pointer._backends = pointer._backends, chain
+        try:
+            return pointer.get_mouse_position()
+        finally:
+            pointer._backends = saved_chain
+    yield "get_mouse_position/fake-chain", dispatch
+
+@case("assets")
+def asset_cases():
+    from pixie.sprite import _resolve_asset
+    yield "sprite._resolve_asset/relative", lambda: _resolve_asset("walk.gif")
+    yield "sprite._resolve_asset/prefixed", lambda: _resolve_asset("assets/walk.gif")
+    yield "sprite._resolve_asset/absolute", lambda: _resolve_asset(os.path.join(ASSET_DIR, "walk.gif"))
+    yield "sprite._resolve_asset/missing",  lambda: _resolve_asset("assets/nope.gif")
+
+@case("spatial")
+def spatial_cases():
+    import random
+    from pixie.spatial import SpatialHash, naive_pairs
+    from pixie.interactions import PetWorld
+    from pixie.behavior_manager import BehaviorManager
+    radius = 96.0
+    for n in (50, 200, 800):
+        rng = random.Random(n)
+        pos = {i: (rng.uniform(0, 1920), rng.uniform(0, 1080)) for i in range(n)}
+        grid = SpatialHash(radius)
+        for i, (x, y) in pos.items():
+            grid.update(i, x, y)
+        def rebuild(pos=pos):
+            g = SpatialHash(radius)
+            for i, (x, y) in pos.items():
+                g.update(i, x, y)
+            return g.pairs(radius)
+        yield f"pairs/naive/{n}", (lambda pos=pos: naive_pairs(pos, radius))
+        yield f"pairs/hash/{n}", (lambda g=grid: g.pairs(radius))
+        yield f"pairs/hash+rebuild/{n}", rebuild
+        yield f"query/all-pets/{n}", (lambda g=grid, pos=pos: [g.query(x, y, radius, exclude=i) for i, (x, y) in pos.items()])
+    for n in (20, 200):
+        world = PetWorld()
+        rng = random.Random(n)
+        pets = []
+        for _ in range(n):
+            bm = BehaviorManager(1920, 1080)
+            x, y = rng.uniform(0, 1920), rng.uniform(0, 1080)
+            bm.attach(world, x, y)
+            pets.append([bm, x, y])
+        def tick(pets=pets):
+            for p in pets:
+                p[1], p[2], _f = p[0].update(p[1], p[2])
+        yield f"PetWorld.tick/{n}", tick
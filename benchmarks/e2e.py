@@ -0,0 +1,223 @@
+import glob, json, os, random, shutil, signal, subprocess, sys, tempfile, time
+
+from .harness import _commit
+
+MODES = ("walk", "run", "sit", "idle")
+LOWER_IS_BETTER = ("cpu_pct", "rss_max_kb", "ctx_switches_per_s", "tick_p95_ms", "tick_p99_ms", "tick_max_ms", "lag_max_ms", "render_allocs_per_s")
+
+def parse_mix(text):
+    mix = {}
+    for part in (text or "").split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in MODES:
+            raise ValueError(f"unknown mode {name!r} in mix (choose from {', '.join(MODES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def start_xvfb(display, size):
+    if not shutil.which("Xvfb"):
+        raise RuntimeError("Xvfb not found on PATH")
+    proc = subprocess.Popen(["Xvfb", display, "-screen", "0", f"{size}x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    sock = f"/tmp/.X11-unix/X{display.lstrip(':')}"
+    deadline = time.monotonic() + 10
+    while not os.path.exists(sock):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            raise RuntimeError(f"Xvfb {display} did not start")
+        time.sleep(0.05)
+    return proc
+
+def start_pixie(env, args):
+    return subprocess.Popen([sys.executable, "-m", "pixie"] + args, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def ctl(words, path, timeout=2.0):
+    from pixie.control import send_command
+    reply = send_command(words, path, timeout)
+    if not reply.startswith("ok"):
+        raise RuntimeError(f"ctl {' '.join(words)}: {reply}")
+    return reply[3:]
+
+def wait_ready(proc, path, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"pixie exited with {proc.returncode}")
+        try:
+            ctl(["ping"], path, timeout=0.5)
+            return
+        except (OSError, RuntimeError):
+            time.sleep(0.1)
+    raise RuntimeError("pixie did not open its control socket")
+
+def proc_sample(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    tick = os.sysconf("SC_CLK_TCK")
+    cpu = (int(fields[11]) + int(fields[12])) / tick
+    rss = ctx = 0
+    for status in glob.glob(f"/proc/{pid}/task/*/status"):
+        try:
+            with open(status) as f:
+                for line in f:
+                    if line.startswith(("voluntary_ctxt_switches", "nonvoluntary_ctxt_switches")):
+                        ctx += int(line.split()[1])
+        except OSError:
+            pass
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    return {"t": time.monotonic(), "cpu_s": cpu, "rss_kb": rss, "ctx": ctx}
+
+class Driver:
+    def __init__(self, display, rng):
+        from Xlib import X, display as xdisplay
+        from Xlib.ext import xtest
+        self.X = X
+        self.xtest = xtest
+        self.dpy = xdisplay.Display(display)
+        self.rng = rng
+        self.events = 0
+
+    def motion(self, x, y):
+        self.xtest.fake_input(self.dpy, self.X.MotionNotify, x=int(x), y=int(y))
+        self.events += 1
+
+    def button(self, n):
+        self.xtest.fake_input(self.dpy, self.X.ButtonPress, n)
+        self.xtest.fake_input(self.dpy, self.X.ButtonRelease, n)
+        self.events += 1
+
+    def step(self, pets, width, height):
+        if not pets:
+            return
+        pet = self.rng.choice(pets)
+        px, py = pet["pos"]
+        sw, sh = pet["size"] or (64, 64)
+        cx, cy = px + sw / 2, py + sh / 2
+        roll = self.rng.random()
+        if roll < 0.5:
+            self.motion(cx + self.rng.uniform(-sw, sw), cy + self.rng.uniform(-sh, sh))
+        elif roll < 0.7:
+            self.motion(cx, cy)
+            self.button(self.rng.choice((4, 5)))
+        elif roll < 0.75:
+            self.motion(cx, cy)
+            self.button(1)
+        else:
+            self.motion(self.rng.uniform(0, width), self.rng.uniform(0, height))
+        self.dpy.flush()
+
+    def close(self):
+        self.dpy.close()
+
+def run(pets=1, scale=1.0, color=None, mix=None, duration=30.0, warmup=3.0, rate=20.0,
+        mix_every=5.0, display=":99", size="1920x1080", extra=(), seed=1, out=sys.stdout):
+    width, height = (int(v) for v in size.split("x"))
+    rng = random.Random(seed)
+    mix = mix or {}
+    tmp = tempfile.mkdtemp(prefix="pixie-e2e-")
+    sock = os.path.join(tmp, "ctl.sock")
+    env = dict(os.environ, DISPLAY=display, GDK_BACKEND="x11", PIXIE_CONTROL_SOCKET=sock, XDG_STATE_HOME=tmp)
+    env.pop("WAYLAND_DISPLAY", None)
+    args = ["--pets", str(pets), "--scale", str(scale)] + (["--color", color] if color else []) + list(extra)
+
+    xvfb = start_xvfb(display, size)
+    pixie = driver = None
+    try:
+        pixie = start_pixie(env, args)
+        wait_ready(pixie, sock)
+        driver = Driver(display, rng)
+        time.sleep(warmup)
+        ctl(["stats", "reset"], sock)
+        first = proc_sample(pixie.pid)
+        rss_max = first["rss_kb"]
+        end = first["t"] + duration
+        next_mix = first["t"]
+        next_poll = first["t"]
+        pets_state = []
+        while time.monotonic() < end:
+            now = time.monotonic()
+            if mix and now >= next_mix:
+                names, weights = zip(*mix.items())
+                ctl(["mode", rng.choices(names, weights)[0]], sock)
+                next_mix = now + mix_every
+            if now >= next_poll:
+                pets_state = json.loads(ctl(["stats"], sock))["pets"]
+                rss_max = max(rss_max, proc_sample(pixie.pid)["rss_kb"])
+                next_poll = now + 1.0
+            if rate > 0:
+                driver.step(pets_state, width, height)
+                time.sleep(1.0 / rate)
+            else:
+                time.sleep(0.1)
+        last = proc_sample(pixie.pid)
+        stats = json.loads(ctl(["stats"], sock))
+    finally:
+        if driver:
+            driver.close()
+        if pixie and pixie.poll() is None:
+            pixie.send_signal(signal.SIGTERM)
+            try:
+                pixie.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                pixie.kill()
+        xvfb.terminate()
+        xvfb.wait()
+
+    wall = last["t"] - first["t"]
+    worst = lambda k: max((p["interval_ms"][k] for p in stats["pets"]), default=0.0)
+    metrics = {
+        "cpu_pct":            100.0 * (last["cpu_s"] - first["cpu_s"]) / wall,
+        "rss_max_kb":         max(rss_max, last["rss_kb"]),
+        "ctx_switches_per_s": (last["ctx"] - first["ctx"]) / wall,
+        "tick_p50_ms":        worst("p50"),
+        "tick_p95_ms":        worst("p95"),
+        "tick_p99_ms":        worst("p99"),
+        "tick_max_ms":        worst("max"),
+        "frames_per_s":       sum(p["frames"] for p in stats["pets"]) / wall,
+        "lag_max_ms":         (stats.get("lag") or {}).get("max_ms", 0.0),
+        "render_allocs_per_s": (stats["cache"].get("buffers") or {}).get("allocs_per_s", 0.0),
+        "render_frames_per_s": (stats["cache"].get("buffers") or {}).get("frames_per_s", 0.0),
+        "input_events":       driver.events if driver else 0,
+    }
+    for name, value in metrics.items():
+        print(f"{name:<24} {value:>12.2f}", file=out)
+    return {
+        "kind": "e2e",
+        "meta": {
+            "commit":    _commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "cpus":      os.cpu_count(),
+        },
+        "config": {
+            "pets": pets, "scale": scale, "color": color, "mix": mix, "duration": duration,
+            "rate": rate, "size": size, "seed": seed, "extra": list(extra),
+        },
+        "metrics": metrics,
+        "pets": stats["pets"],
+        "cache": stats["cache"],
+    }
+
+def compare(base, new, threshold=0.10, out=sys.stdout):
+    if base.get("config") != new.get("config"):
+        print("warning: runs used different configurations", file=out)
+    regressions = []
+    b, n = base["metrics"], new["metrics"]
+    for name in sorted(set(b) & set(n)):
+        old_v, new_v = b[name], n[name]
+        ratio = (new_v / old_v) if old_v > 0 else 1.0
+        flag = ""
+        if name in LOWER_IS_BETTER:
+            if ratio > 1.0 + threshold:
+                flag = "  REGRESSION"
+                regressions.append(name)
+            elif ratio < 1.0 - threshold:
+                flag = "  improved"
+        print(f"{name:<24} {old_v:>12.2f} -> {new_v:>12.2f}  x{ratio:.2f}{flag}", file=out)
+    return regressions
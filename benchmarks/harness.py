@@ -0,0 +1,103 @@
+import gc, json, os, platform, statistics, subprocess, sys, time
+
+CASES = []
+
+def case(group):
+    def deco(fn):
+        CASES.append((group, fn))
+        return fn
+    return deco
+
+def timeit(fn, min_time=0.05, repeat=5):
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        dt = time.perf_counter() - t0
+        if dt >= min_time or number >= 1 << 20:
+            break
+        number *= 2 if dt <= 0 else max(2, min(10, int(min_time / dt) + 1))
+    samples = []
+    gc_was = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            samples.append((time.perf_counter() - t0) / number)
+    finally:
+        if gc_was:
+            gc.enable()
+    return {
+        "min_us":   min(samples) * 1e6,
+        "mean_us":  statistics.fmean(samples) * 1e6,
+        "stdev_us": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1e6,
+        "number":   number,
+        "repeat":   repeat,
+    }
+
+def _commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+def run(pattern=None, repeat=5, min_time=0.05, out=sys.stdout):
+    results = {}
+    for group, fn in CASES:
+        try:
+            benches = list(fn())
+        except Exception as e:
+            print(f"{group + '/*':<48} skipped: {e!r}", file=out)
+            continue
+        for name, bench in benches:
+            full = f"{group}/{name}"
+            if pattern and pattern not in full:
+                continue
+            try:
+                res = timeit(bench, min_time=min_time, repeat=repeat)
+            except Exception as e:
+                print(f"{full:<48} skipped: {e!r}", file=out)
+                continue
+            results[full] = res
+            print(f"{full:<48} {res['min_us']:>12.2f} us  (mean {res['mean_us']:.2f} ±{res['stdev_us']:.2f})", file=out)
+    return {
+        "meta": {
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "machine":   platform.machine(),
+            "cpus":      os.cpu_count(),
+            "commit":    _commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+def save(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def compare(base, new, threshold=0.10, key="min_us", out=sys.stdout):
+    regressions = []
+    b, n = base.get("results", {}), new.get("results", {})
+    for name in sorted(set(b) | set(n)):
+        if name not in b or name not in n:
+            print(f"{name:<48} {'only in ' + ('new' if name in n else 'base'):>30}", file=out)
+            continue
+        old_v, new_v = b[name][key], n[name][key]
+        ratio = (new_v / old_v) if old_v > 0 else 1.0
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1.0 - threshold:
+            flag = "  improved"
+        print(f"{name:<48} {old_v:>12.2f} -> {new_v:>12.2f} us  x{ratio:.2f}{flag}", file=out)
+    return regressions
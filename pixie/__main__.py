@@ -1,6 +1,12 @@
 import os, sys
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "ctl":
+        from .control import main as ctl_main
+        sys.exit(ctl_main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "replay":
+        from .trace import main as replay_main
+        sys.exit(replay_main(sys.argv[2:]))
     if "GDK_BACKEND" not in os.environ:
         st = os.environ.get("XDG_SESSION_TYPE", "").lower()
         if os.environ.get("WAYLAND_DISPLAY") or os.environ.get("HYPRLAND_INSTANCE_SIGNATURE") or st == "wayland":
@@ -1,8 +1,22 @@
-import os, sys, signal, math, argparse, ctypes, ctypes.util, gi
+import os, sys, time, json, signal, math, random, argparse, ctypes, ctypes.util, gi
 from importlib import resources
+from collections import deque
 from .tray import Tray
+from pixie import debug
 from pixie.debug import debug_print
 
+_T0 = time.monotonic()
+
+def process_age() -> float:
+    try:
+        with open("/proc/self/stat") as f:
+            start = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.monotonic() - _T0
+
 def resolve_asset_path(path: str) -> str:
     if os.path.isabs(path) and os.path.exists(path):
         return path
@@ -39,8 +53,24 @@ gi.require_version("GdkPixbuf", "2.0")
 from gi.repository import Gtk, Gdk, GdkPixbuf, GLib
 
 from .sprite import AnimatedSprite
-from .behavior_manager import BehaviorManager
+from .framecache import FrameCache, texture_from_raw
+from .behavior_manager import BehaviorManager, TRANSIENT
 from .positioner import Positioner
+from .control import ControlServer, SETTINGS
+from .timestep import FixedStep
+from .worker import WorkerPool, LagMonitor
+from .timers import TimerService
+from .profiler import SamplingProfiler
+from .prerender import Prerenderer
+from .shmcache import SharedFrameCache
+from .governor import Governor
+from .trace import TraceRecorder
+from .interactions import PetWorld
+from .workarea import WorkArea
+from . import pointer
+from . import render
+from . import framepack
+from . import snapshot
 
 def _install_css_for_display(display: Gdk.Display):
     css = Gtk.CssProvider()
@@ -54,7 +84,16 @@ def _install_css_for_display(display: Gdk.Display):
     )
 
 DEATH_DURATION_MS = 500
+DEAD_ASSET = "assets/dead.gif"
 ATTACK_THRESHOLD  = 64
+ATTACK_RELEASE    = 1.25
+MIN_DWELL_MS      = 250
+MIN_TICK_MS       = 4
+PARK_MAX_S        = 60
+PARK_SLACK_S      = 0.25
+PARK_LENIENT_S    = 2.0
+TOPMOST_EVERY_S   = 1.5
+LAG_HOLD_S        = 60
 
 def parse_color(hexstr):
     h = hexstr.lstrip('#')
@@ -62,15 +101,39 @@ def parse_color(hexstr):
     return tuple(int(h[i:i+2],16)/255.0 for i in (0,2,4))
 
 class CatWindow(Gtk.ApplicationWindow):
-    def __init__(self, app, speed, scale, color):
+    def __init__(self, app, speed, scale, color, tick_ms=None, interpolate=False, interp="bilinear",
+                 cache=None, world=None, start_pos=None, workarea=None, restore=None, overlay=None):
         super().__init__(application=app, title="Pixie")
         _install_css_for_display(self.get_display())
         self._app   = app
         self._dying = False
+        self.overlay = overlay
         self.total_steps = 0
         self.speed = max(0.01, speed)
         self.scale = max(0.01, scale)
+        self.tick_ms = tick_ms
+        self.interpolate = interpolate
         self.tint  = parse_color(color) if color else None
+        self.color = color
+        self.cache = cache or FrameCache(self.scale, self.tint, shared=getattr(app, "shared_cache", None))
+        self.pool  = getattr(app, "pool", None)
+        self.timers = getattr(app, "timers", None) or TimerService()
+        self.cache.pool = self.pool
+        self.interp = render.INTERP.get(interp, GdkPixbuf.InterpType.BILINEAR)
+        self.cache.set_interp(self.interp)
+        self.quality = 0
+        self.frame = 0
+        self.sprite = None
+        self._shown = None
+        self._move_id = self._refresh_id = 0
+        self._mask  = None
+        self._input_mask = None
+        self.trace  = None
+        self.frames_shown = 0
+        self._intervals = deque(maxlen=4096)
+        self._last_tick = None
+        self._resume_index = None
+        self._warm = []
         self.add_css_class("transparent")
         self.set_decorated(False)
         self.set_resizable(False)
@@ -83,10 +146,20 @@ class CatWindow(Gtk.ApplicationWindow):
 
         self.bm = BehaviorManager(geom.width, geom.height, scale=self.scale)
 
-        self.pos_x   = geom.width/2
-        self.pos_y   = geom.height/2
+        self.pos_x, self.pos_y = start_pos or (geom.width/2, geom.height/2)
+        if world is not None:
+            self.bm.attach(world, self.pos_x, self.pos_y)
+        self._prev_x, self._prev_y = self.pos_x, self.pos_y
+        self._clock  = FixedStep(1.0)
         self.facing  = 1
         self._mode   = None
+        self._sprite_size = (0, 0)
+        self._offset = (0, 0)
+        self.workarea = workarea or WorkArea((geom.x, geom.y, geom.width, geom.height), disp).start()
+        self._work = self.workarea.rect
+        self.workarea.subscribe(self._on_workarea)
+        if restore:
+            self._restore(restore)
 
         self.picture = Gtk.Picture.new_for_paintable(None)
         self.set_child(self.picture)
@@ -105,9 +178,17 @@ class CatWindow(Gtk.ApplicationWindow):
         scroll.connect("scroll", self._on_scroll)
         self.picture.add_controller(scroll)
 
-        self._happy_timeout = None
+        self._input_id = 0
+        self._pending_motion = None
+        self._pending_leave = self._pending_click = self._pending_scroll = self._pending_attack = False
+        self._mode_since = 0.0
 
         self.pos = Positioner(self)
+        if self.pool:
+            self.pos.use_worker(self.pool)
+            assets = [a for a, _f in self._warm] + [resolve_asset_path(b.asset) for b in self.bm._behaviors.values()]
+            assets.append(resolve_asset_path(DEAD_ASSET))
+            self.cache.prefetch(list(dict.fromkeys(assets)), self.pool)
 
         def _after_map(*_):
             try:
@@ -115,23 +196,35 @@ class CatWindow(Gtk.ApplicationWindow):
                 self.set_keep_above(True)
             except Exception:
                 pass
-            GLib.timeout_add(200, self._assert_topmost)
+            self._apply_input_region()
+            self._place(self.pos_x, self.pos_y)
+            if (self, "topmost") not in self.timers and not self._dying:
+                self.timers.schedule((self, "topmost"), 0.2, self._assert_topmost)
             debug_print("[map] hide_from_taskbar done")
             return False
 
         self.connect("map", _after_map)
 
-        self._load_behavior()
+        raw = restore.get("raw") if restore else None
+        if raw:
+            self._show_raw(raw, restore.get("place"))
+            GLib.idle_add(self._resume)
+        else:
+            self._load_behavior()
+        for facing in (1, -1):
+            GLib.idle_add(self._warm_variant, resolve_asset_path(DEAD_ASSET), facing, priority=GLib.PRIORITY_LOW)
 
         self.connect("close-request", self._on_close_request)
         try:
-            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT,  self._on_close_request)
-            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self._on_close_request)
+            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGINT,  self._on_signal)
+            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signal.SIGTERM, self._on_signal)
         except AttributeError:
-            signal.signal(signal.SIGINT,  lambda *a: GLib.idle_add(self._on_close_request))
-            signal.signal(signal.SIGTERM, lambda *a: GLib.idle_add(self._on_close_request))
+            signal.signal(signal.SIGINT,  lambda *a: GLib.idle_add(self._on_signal))
+            signal.signal(signal.SIGTERM, lambda *a: GLib.idle_add(self._on_signal))
 
     def _assert_topmost(self):
+        if self._dying:
+            return None
         keep_above_ok = False
         try:
             self.set_keep_above(True)
@@ -144,159 +237,527 @@ class CatWindow(Gtk.ApplicationWindow):
         except Exception:
             pass
         debug_print(f"[top] tick asserted topmost: pos={pos_ok} keep_above={keep_above_ok} {self.pos.debug_report()}")
-        GLib.timeout_add(1500, self._assert_topmost)
+        return TOPMOST_EVERY_S
+
+    def _restore(self, pet):
+        try:
+            self.bm.restore(pet["bm"])
+            snapshot.restore_rng(self.bm.rng, pet.get("rng"))
+            self.pos_x, self.pos_y = self.bm.clamp(*pet["pos"])
+            self.facing = pet.get("facing", 1)
+            self._resume_index = pet.get("index", 0)
+            if pet["bm"].get("mode") in TRANSIENT:
+                pet.pop("raw", None)
+                self._resume_index = 0
+            self._warm = [(a, f) for a, f in pet.get("variants", []) if os.path.exists(a) or framepack.stamp(a)]
+        except (KeyError, TypeError, ValueError) as e:
+            debug_print(f"[snapshot] restore failed: {e!r}")
+
+    def _show_raw(self, raw, place=None):
+        tex = texture_from_raw(raw)
+        sw, sh = tex.get_width(), tex.get_height()
+        self.set_default_size(sw, sh)
+        self.picture.set_size_request(sw, sh)
+        self.picture.set_paintable(tex)
+        if place:
+            ox, oy, fw, fh = place
+            self._offset, self._sprite_size = (ox, oy), (fw, fh)
+        else:
+            self._sprite_size = (sw, sh)
+        self._apply_area()
+        if self.overlay:
+            self.overlay.show(self, tex, None)
+
+    def _resume(self):
+        if self._dying:
+            return False
+        self._load_behavior()
+        for asset, facing in self._warm:
+            GLib.idle_add(self._warm_variant, asset, facing, priority=GLib.PRIORITY_LOW)
+        self._warm = []
         return False
 
+    def _warm_variant(self, asset, facing):
+        if not self._dying:
+            try:
+                self.cache.texture(asset, 0, facing)
+            except Exception as e:
+                debug_print(f"[snapshot] warm {asset} failed: {e!r}")
+        return False
+
+    def variants_in_use(self):
+        return self.cache.variants()
+
     def tint_and_scale(self, pixbuf: GdkPixbuf.Pixbuf) -> GdkPixbuf.Pixbuf:
-        if self.scale != 1.0:
-            new_w = int(pixbuf.get_width()  * self.scale)
-            new_h = int(pixbuf.get_height() * self.scale)
-            pixbuf = pixbuf.scale_simple(new_w, new_h, GdkPixbuf.InterpType.BILINEAR)
-        if self.tint:
-            r_t, g_t, b_t = self.tint
-            w, h      = pixbuf.get_width(), pixbuf.get_height()
-            stride    = pixbuf.get_rowstride()
-            nch       = pixbuf.get_n_channels()
-            bps       = pixbuf.get_bits_per_sample()
-            has_alpha = pixbuf.get_has_alpha()
-            cs        = pixbuf.get_colorspace()
-            data = bytearray(pixbuf.get_pixels())
-            for yy in range(h):
-                row_start = yy * stride
-                for xx in range(w):
-                    idx = row_start + xx * nch
-                    data[idx+0] = int(data[idx+0] * r_t)
-                    data[idx+1] = int(data[idx+1] * g_t)
-                    data[idx+2] = int(data[idx+2] * b_t)
-            pixbuf = GdkPixbuf.Pixbuf.new_from_data(bytes(data), cs, has_alpha, bps, w, h, stride)
-        return pixbuf
-
-    def _load_behavior(self):
+        return render.tint_and_scale(pixbuf, self.scale, self.tint)
+
+    def _cancel_timers(self):
         for tid in ("_move_id", "_refresh_id"):
-            if hasattr(self, tid):
+            if getattr(self, tid):
                 GLib.source_remove(getattr(self, tid))
-        asset = resolve_asset_path(self.bm.get_asset())
-        fps      = self.bm.get_fps()
-        interval = int(self.bm.get_move_interval() / self.speed)
-        self.sprite = AnimatedSprite(asset, fps=fps)
-        first = self.sprite.get_pixbuf()
-        first = self.tint_and_scale(first.copy())
-        if self.facing < 0:
-            first = first.flip(True)
-        sw, sh = first.get_width(), first.get_height()
-        self.set_default_size(sw, sh)
-        self.picture.set_size_request(sw, sh)
-        self.picture.set_paintable(Gdk.Texture.new_for_pixbuf(first))
-        self._refresh_id = GLib.timeout_add(int(1000 / fps), self._refresh)
-        self._move_id    = GLib.timeout_add(interval,        self._move)
+                setattr(self, tid, 0)
+        self.timers.cancel((self, "park"))
+
+    def _load_behavior(self, carry=False):
+        self._cancel_timers()
+        if self.sprite:
+            self.sprite.stop()
+        self._asset = resolve_asset_path(self.bm.get_asset())
+        fps = self.bm.get_fps()
+        self.sprite = AnimatedSprite(self._asset, fps=fps, frames=self.cache.frames(self._asset), autoplay=False)
+        if self._resume_index is not None:
+            self.sprite.index = self._resume_index % len(self.cache.frames(self._asset))
+            self._resume_index = None
+        self._show_frame(resize=True)
+        if self.bm.mode() != self._mode:
+            self._mode_since = time.monotonic()
         self._mode       = self.bm.mode()
+        if carry:
+            self._clock.retime(self._step_seconds())
+        else:
+            self._clock.set_dt(self._step_seconds())
+            self._clock.reset()
+        self._prev_x, self._prev_y = self.pos_x, self.pos_y
+        if self.bm.is_static():
+            self._park()
+            return
+        if self.quality < 1:
+            self.sprite.play()
+        self._refresh_id = GLib.timeout_add(self._refresh_ms(fps), self._refresh)
+        self._move_id    = GLib.timeout_add(self._tick_interval(), self._move)
 
-    def _refresh(self):
-        pix = self.sprite.get_pixbuf()
-        pix = self.tint_and_scale(pix.copy())
-        if self.facing < 0:
-            pix = pix.flip(True)
-        tex = Gdk.Texture.new_for_pixbuf(pix)
-        self.picture.set_paintable(tex)
-        return True
+    def _park(self):
+        now = time.monotonic()
+        frame = self.sprite.time_to_next(now)
+        if frame is not None and self.quality >= 1:
+            frame = max(frame, self._refresh_ms(self.bm.get_fps()))
+        waits = [w for w in (frame,) if w is not None]
+        deadline = self.bm.next_deadline()
+        if deadline is not None:
+            waits.append(max(0.0, (deadline - now) * 1000.0))
+        wait = min(min(waits) if waits else PARK_MAX_S * 1000.0, PARK_MAX_S * 1000.0)
+        slack = PARK_LENIENT_S
+        if frame is not None:
+            slack = min(slack, max(PARK_SLACK_S, (frame - wait) / 1000.0))
+        self.timers.schedule((self, "park"), wait / 1000.0, self._on_park, slack=slack)
 
-    def _move(self):
-        prev_x, prev_y = self.pos_x, self.pos_y
+    def _on_park(self):
+        now = time.monotonic()
+        self.sprite.catch_up(now)
+        self.bm.expire(now)
+        if self.trace:
+            self.trace.step(self.pos_x, self.pos_y)
         nx, ny, f = self.bm.update(self.pos_x, self.pos_y)
-        moved = math.hypot(nx - prev_x, ny - prev_y)
-        self.total_steps += int(moved)
-        self.pos_x, self.pos_y = nx, ny
-        self.facing = f
+        self.pos_x, self.pos_y, self.facing = nx, ny, f
+        if self.bm.mode() != self._mode:
+            self._load_behavior()
+            return False
+        self._show_frame()
+        self._park()
+        return False
+
+    def _step_seconds(self):
+        return self.bm.get_move_interval() / 1000.0 / self.speed
+
+    def _refresh_ms(self, fps):
+        return int(1000 / fps * (2 if self.quality >= 1 else 1))
+
+    def _tick_interval(self):
+        tick = self.tick_ms or self.bm.get_move_interval() / self.speed
+        if self.quality >= 2:
+            tick *= 2
+        return max(MIN_TICK_MS, int(tick))
+
+    def set_quality(self, level):
+        if level == self.quality:
+            return
+        self.quality = level
+        self.cache.set_tint(self.tint if level < 3 else None)
+        self.cache.set_interp(GdkPixbuf.InterpType.NEAREST if level >= 4 else self.interp)
+        if not self._dying:
+            self._load_behavior()
+
+    def _show_frame(self, resize=False):
+        tex = self.cache.texture(self._asset, self.sprite.index, self.facing)
+        if tex is self._shown and not resize:
+            return
+        self._shown = tex
+        self.frames_shown += 1
+        sw, sh = tex.get_width(), tex.get_height()
+        ox, oy, full = self.cache.placement(self._asset, self.facing, sw)
+        if resize:
+            self.set_default_size(sw, sh)
+            self.picture.set_size_request(sw, sh)
+            full = full or (sw, sh)
+            if full != self._sprite_size:
+                self._sprite_size = full
+                self._apply_area()
+        if (ox, oy) != self._offset:
+            self._offset = (ox, oy)
+            self._place(self.pos_x, self.pos_y)
+        self.picture.set_paintable(tex)
+        self._mask = self.cache.mask(self._asset, self.sprite.index, self.facing)
+        if self.overlay:
+            self.overlay.show(self, tex, self._mask)
+        self._apply_input_region()
+
+    def _place(self, x, y):
+        if self.overlay:
+            self.overlay.move(self, x + self._offset[0], y + self._offset[1])
+            return
         try:
-            self.pos.set_position(nx, ny)
+            self.pos.set_position(x + self._offset[0], y + self._offset[1])
         except Exception:
             pass
-        self.queue_resize()
-        if self.bm.mode() != self._mode:
+
+    def _on_workarea(self, rect):
+        self._work = rect
+        self._apply_area()
+
+    def _apply_area(self):
+        x, y, w, h = self._work
+        sw, sh = self._sprite_size
+        self.bm.set_area(x, y, x + w - sw, y + h - sh)
+        self.pos_x, self.pos_y = self.bm.clamp(self.pos_x, self.pos_y)
+
+    def _apply_input_region(self):
+        if self._mask is None or self._mask is self._input_mask:
+            return
+        region = self._mask.region()
+        surf = self.get_surface()
+        if region is None or surf is None:
+            return
+        try:
+            surf.set_input_region(region)
+            self._input_mask = self._mask
+        except Exception as e:
+            debug_print(f"[mask] set_input_region failed: {e!r}")
+            self._mask = None
+
+    def _refresh(self):
+        t0 = time.perf_counter()
+        if self.quality >= 1:
+            self.sprite.catch_up()
+        self._show_frame()
+        if self.trace:
+            self.trace.phase("render", time.perf_counter() - t0)
+        return True
+
+    def start_trace(self, path):
+        self.stop_trace()
+        header = {
+            "width":  self.bm.width,
+            "area":   list(self.bm.area),
+            "height": self.bm.height,
+            "scale":  self.scale,
+            "speed":  self.speed,
+            "tint":   list(self.tint) if self.tint else None,
+            "pos":    [self.pos_x, self.pos_y],
+            "facing": self.facing,
+            "bm":     self.bm.state(),
+        }
+        self.trace = TraceRecorder(path, header)
+        if hasattr(self.bm.rng, "sink"):
+            self.bm.rng.sink = self.trace.rng
+        self.bm.on_switch = self.trace.mode
+        pointer.set_observer(self.trace.pointer)
+        debug_print(f"[trace] recording to {path}")
+
+    def stop_trace(self):
+        if self.trace is None:
+            return
+        if hasattr(self.bm.rng, "sink"):
+            self.bm.rng.sink = None
+        self.bm.on_switch = None
+        pointer.set_observer(None)
+        self.trace.close()
+        debug_print(f"[trace] {self.trace.count} records -> {self.trace.path}")
+        self.trace = None
+
+    def apply_setting(self, name, value):
+        if name == "speed":
+            speed = float(value)
+            if speed <= 0:
+                raise ValueError("speed must be positive")
+            self.speed = max(0.01, speed)
+            self._clock.set_dt(self._step_seconds())
+            if self._move_id:
+                GLib.source_remove(self._move_id)
+                self._move_id = GLib.timeout_add(self._tick_interval(), self._move)
+        elif name == "scale":
+            scale = float(value)
+            if scale <= 0:
+                raise ValueError("scale must be positive")
+            self.scale = max(0.01, scale)
+            self.bm.set_scale(self.scale)
+            self.cache.set_scale(self.scale)
+            self._show_frame(resize=True)
+            self.queue_resize()
+        elif name == "color":
+            color = None if value.lower() in ("none", "off", "") else value
+            self.tint  = parse_color(color) if color else None
+            self.color = color
+            self.cache.set_tint(self.tint if self.quality < 3 else None)
+            self._show_frame()
+        else:
+            raise ValueError(f"unknown setting {name!r}")
+        debug_print(f"[ctl] {name} -> {value}")
+
+    def control_command(self, words):
+        if self._dying:
+            return "error shutting down"
+        cmd, args = words[0], words[1:]
+        if cmd == "set" and len(args) == 2:
+            try:
+                self.apply_setting(*args)
+            except ValueError as e:
+                return f"error {e}"
+            return "ok"
+        if cmd == "get" and len(args) == 1 and args[0] in SETTINGS:
+            value = getattr(self, args[0])
+            return f"ok {value if value is not None else 'none'}"
+        if cmd == "mode" and len(args) == 1 and args[0] in ("walk", "run", "sit", "idle"):
+            self.bm.switch(args[0])
             self._load_behavior()
+            return "ok"
+        if cmd == "trace" and args[:1] == ["start"] and len(args) == 2:
+            try:
+                self.start_trace(args[1])
+            except OSError as e:
+                return f"error {e}"
+            return "ok"
+        if cmd == "trace" and args == ["stop"]:
+            self.stop_trace()
+            return "ok"
+        return f"error unknown command {' '.join(words)!r}"
+
+    def _move(self):
+        self.frame += 1
+        now = time.monotonic()
+        if self._last_tick is not None:
+            self._intervals.append(now - self._last_tick)
+        self._last_tick = now
+        if self.bm.tracks_pointer():
+            pointer.tick()
+        steps = self._clock.advance()
+        tr = self.trace
+        t0 = time.perf_counter()
+        for i in range(steps):
+            if tr:
+                tr.step(self.pos_x, self.pos_y)
+            prev_x, prev_y = self.pos_x, self.pos_y
+            nx, ny, f = self.bm.update(self.pos_x, self.pos_y)
+            moved = math.hypot(nx - prev_x, ny - prev_y)
+            self.total_steps += int(moved)
+            self._prev_x, self._prev_y = prev_x, prev_y
+            self.pos_x, self.pos_y = nx, ny
+            self.facing = f
+            if self.bm.mode() != self._mode:
+                self._clock.refund(steps - i - 1)
+                break
+        if tr and steps:
+            t1 = time.perf_counter()
+            tr.phase("update", t1 - t0)
+            t0 = t1
+        if steps or self.interpolate:
+            x, y = self.pos_x, self.pos_y
+            if self.interpolate:
+                a = self._clock.alpha
+                x = self._prev_x + (self.pos_x - self._prev_x) * a
+                y = self._prev_y + (self.pos_y - self._prev_y) * a
+            self._place(x, y)
+            self.queue_resize()
+            if tr:
+                tr.phase("position", time.perf_counter() - t0)
+        if self.bm.mode() != self._mode:
+            self._load_behavior(carry=True)
         return True
 
+    def stats(self):
+        iv = sorted(self._intervals)
+        pick = lambda q: iv[min(len(iv) - 1, int(len(iv) * q))] * 1000 if iv else 0.0
+        return {
+            "mode":     self.bm.mode(),
+            "pos":      [self.pos_x, self.pos_y],
+            "size":     list(self._sprite_size),
+            "quality":  self.quality,
+            "ticks":    len(iv),
+            "frames":   self.frames_shown,
+            "interval_ms": {"p50": pick(0.5), "p95": pick(0.95), "p99": pick(0.99), "max": iv[-1] * 1000 if iv else 0.0},
+        }
+
+    def reset_stats(self):
+        self._intervals.clear()
+        self._last_tick = None
+        self.frames_shown = 0
+        self.cache.buffers.reset()
+
+    def _queue_input(self):
+        if not self._input_id and not self._dying:
+            self._input_id = self._tick_widget().add_tick_callback(self._flush_input)
+
+    def _tick_widget(self):
+        return self.overlay.tick_widget() if self.overlay else self
+
     def _trigger_run(self):
-        if self._dying or self.bm.mode() == "run":
-            return
-        self.bm.switch("run")
-        self._load_behavior()
+        if self.trace:
+            self.trace.click()
+        self._pending_click = True
+        self._queue_input()
 
     def _trigger_attack(self, *_):
-        if self._dying or self.bm.mode() == "attack":
-            return
-        self.bm.switch("attack")
-        self._load_behavior()
+        self._pending_motion = None
+        self._pending_attack = True
+        self._queue_input()
 
     def _on_motion(self, controller, x, y):
-        if self._dying or self.bm.mode() in ("run", "happy"):
-            return
-        w = self.picture.get_allocated_width()
-        h = self.picture.get_allocated_height()
-        if w <= 0 or h <= 0:
-            return
-        cx, cy = w / 2, h / 2
-        dx, dy = x - cx, y - cy
-        dist   = math.hypot(dx, dy)
-        threshold = ATTACK_THRESHOLD * self.scale
-        deadzone  = 15 * self.scale
-        mode = self.bm.mode()
-        if mode not in ("attack", "run", "happy") and dist <= threshold:
-            if dx >=  deadzone:
-                self.facing = 1
-            elif dx <= -deadzone:
-                self.facing = -1
-            self.bm.switch("attack"); self._load_behavior()
-        elif mode == "attack" and dist > threshold:
-            self.bm.switch("walk"); self._load_behavior()
+        if self.trace:
+            self.trace.motion(x, y)
+        self._pending_motion = (x, y)
+        self._pending_leave = False
+        self._queue_input()
 
     def _on_pointer_leave(self, *_):
-        if self._dying or self.bm.mode() != "attack":
-            return
-        self.bm.switch("walk"); self._load_behavior()
+        if self.trace:
+            self.trace.leave()
+        self._pending_motion = None
+        self._pending_leave = True
+        self._queue_input()
 
     def _on_scroll(self, controller, dx, dy):
-        if self._dying or abs(dy) < 0.1:
-            return True
-        happy = self.bm._behaviors["happy"]
-        if self.bm.mode() == "happy":
-            if self._happy_timeout:
-                GLib.source_remove(self._happy_timeout)
-            self._happy_timeout = GLib.timeout_add(happy.duration_ms, self._end_happy)
-            return True
-        self._happy_timeout = GLib.timeout_add(happy.duration_ms, self._end_happy)
-        self.bm.switch("happy"); self._load_behavior()
+        if self.trace:
+            self.trace.scroll(dy)
+        if abs(dy) >= 0.1:
+            self._pending_scroll = True
+            self._queue_input()
         return True
 
+    def _hover_target(self, mode, x, y):
+        tex = self._shown
+        w, h = (tex.get_width(), tex.get_height()) if tex is not None else (0, 0)
+        if w <= 0 or h <= 0:
+            return mode
+        fw, fh = self._sprite_size
+        if fw and fh:
+            w, h = fw - 2 * self._offset[0], fh - 2 * self._offset[1]
+        dx, dy = x - w / 2, y - h / 2
+        dist = math.hypot(dx, dy)
+        threshold = ATTACK_THRESHOLD * self.scale
+        if mode == "attack":
+            return "walk" if dist > threshold * ATTACK_RELEASE else mode
+        if self._mask is not None and not self._mask.hit(int(x), int(y)):
+            return mode
+        if dist > threshold:
+            return mode
+        deadzone = 15 * self.scale
+        if dx >= deadzone:
+            self.facing = 1
+        elif dx <= -deadzone:
+            self.facing = -1
+        return "attack"
+
+    def _flush_input(self, *_):
+        self._input_id = 0
+        motion, leave = self._pending_motion, self._pending_leave
+        click, scroll, attack = self._pending_click, self._pending_scroll, self._pending_attack
+        self._pending_motion = None
+        self._pending_leave = self._pending_click = self._pending_scroll = self._pending_attack = False
+        if self._dying:
+            return False
+        mode = target = self.bm.mode()
+        now = time.monotonic()
+        if click:
+            target = "run"
+        elif scroll:
+            target = "happy"
+        elif mode not in ("run", "happy"):
+            if attack:
+                target = "attack"
+            elif motion is not None:
+                target = self._hover_target(mode, *motion)
+            elif leave and mode == "attack":
+                target = "walk"
+            if target != mode and (now - self._mode_since) * 1000.0 < MIN_DWELL_MS:
+                self._pending_motion, self._pending_leave, self._pending_attack = motion, leave, attack
+                self._queue_input()
+                return False
+        if scroll:
+            self._extend_happy()
+        if target != mode:
+            self.bm.switch(target)
+            self._load_behavior()
+        return False
+
+    def _extend_happy(self):
+        self.timers.schedule((self, "happy"), self.bm._behaviors["happy"].duration_ms / 1000.0, self._end_happy)
+
     def _end_happy(self):
         if self.bm.mode() == "happy":
             self.bm.switch("walk"); self._load_behavior()
-        self._happy_timeout = None
-        return False
 
     def _request_quit(self):
         GLib.idle_add(self._on_close_request)
 
     def _on_close_request(self, *args):
+        self.shutdown(animate=self._app.args.get("exit_animation", "interactive") != "never")
+        return True
+
+    def _on_signal(self, *args):
+        self.shutdown(animate=self._app.args.get("exit_animation", "interactive") == "always")
+        return False
+
+    def shutdown(self, animate=True):
         if self._dying:
+            if not animate and self.timers.cancel((self, "quit")):
+                self._finish()
             return False
+        app = self._app
+        if getattr(app, "snapshot_enabled", False) and not any(w._dying for w in getattr(app, "pets", [self])):
+            try:
+                snapshot.save(app)
+            except Exception as e:
+                debug_print(f"[snapshot] save failed: {e!r}")
         self._dying = True
-        for tid in ("_move_id","_refresh_id"):
-            if hasattr(self,tid):
-                GLib.source_remove(getattr(self,tid))
-        dead = resolve_asset_path("assets/dead.gif")
-        self.sprite = AnimatedSprite(dead, fps=12)
+        self._cancel_timers()
+        for name in ("happy", "topmost"):
+            self.timers.cancel((self, name))
+        if self._input_id:
+            self._tick_widget().remove_tick_callback(self._input_id)
+            self._input_id = 0
+        self.stop_trace()
+        self.bm.detach()
+        self.workarea.listeners.remove(self._on_workarea)
+        ctl = getattr(self._app, "ctl", None)
+        if ctl:
+            ctl.stop()
+        if self.sprite:
+            self.sprite.stop()
+        if not animate:
+            app.quit()
+            return True
+        self._asset = resolve_asset_path(DEAD_ASSET)
+        self.sprite = AnimatedSprite(self._asset, fps=12, frames=self.cache.frames(self._asset))
+        self._show_frame()
         self._refresh_id = GLib.timeout_add(int(1000/12), self._refresh)
-        GLib.timeout_add(DEATH_DURATION_MS, lambda: (self.get_application().quit(), False))
+        self.timers.schedule((self, "quit"), DEATH_DURATION_MS / 1000.0, self._finish)
         return True
 
+    def _finish(self):
+        self._cancel_timers()
+        if self.sprite:
+            self.sprite.stop()
+        self._app.quit()
+
 def assert_top_tick(app):
     try:
+        if getattr(app, "overlay", None):
+            app.overlay.assert_topmost()
+            return 1.0
         if not getattr(app, "win", None):
-            return True
+            return 1.0
         pos = getattr(app.win, "pos", None)
         if not pos or not hasattr(pos, "assert_topmost"):
-            return True
+            return 1.0
         ok = pos.assert_topmost()
         keep = False
         try:
@@ -306,18 +767,176 @@ def assert_top_tick(app):
         debug_print(f"[top] tick asserted topmost: pos={bool(ok)} keep_above={keep} {pos.debug_report()}")
     except Exception as e:
         debug_print(f"[top] tick error: {e!r}")
-    return True
+    return 1.0
+
+def cleanup(app):
+    timers = getattr(app, "timers", None)
+    if timers:
+        timers.clear()
+    for name in ("governor", "lag", "ctl", "tray"):
+        obj = getattr(app, name, None)
+        if obj:
+            try:
+                obj.stop()
+            except Exception as e:
+                debug_print(f"[app] {name} stop failed: {e!r}")
+    pool = getattr(app, "pool", None)
+    if pool:
+        pool.shutdown(wait=True)
+    pre = getattr(app, "prerender", None)
+    if pre:
+        pre.shutdown()
+    shared = getattr(app, "shared_cache", None)
+    if shared:
+        shared.close()
+    overlay = getattr(app, "overlay", None)
+    for win in getattr(app, "pets", None) or []:
+        win._cancel_timers()
+        win.pos.close()
+        if overlay:
+            overlay.remove(win)
+    if overlay:
+        try:
+            overlay.close()
+        except Exception as e:
+            debug_print(f"[app] overlay close failed: {e!r}")
+    win = getattr(app, "win", None)
+    if win:
+        win.workarea.stop()
+
+def start_prerender(app, cfg):
+    win = app.win
+    tints = [win.tint]
+    for c in (cfg.get("prerender_colors") or "").split(","):
+        if c.strip():
+            t = parse_color(c.strip())
+            if t not in tints:
+                tints.append(t)
+    assets = [resolve_asset_path(b.asset) for b in win.bm._behaviors.values()]
+    app.prerender = Prerenderer(win.cache, workers=cfg.get("prerender_workers"),
+                                progress=lambda done, total: debug_print(f"[prerender] {done}/{total}"))
+    app.prerender.run(assets, [win.scale], tints, first=(win._asset, win.facing))
+
+def control_all(app, words):
+    lag = getattr(app, "lag", None)
+    if words[:1] == ["stats"] and lag is not None and not debug.DEBUG:
+        lag.start(hold=LAG_HOLD_S)
+    if words == ["stats"]:
+        return "ok " + json.dumps({
+            "pets":  [w.stats() for w in app.pets],
+            "cache": app.win.cache.stats(),
+            "timers": app.timers.stats(),
+            "profile": app.profiler.summary() if getattr(app, "profiler", None) else None,
+            "lag":   lag.snapshot() if lag and lag.samples else None,
+        })
+    if words == ["stats", "reset"]:
+        for w in app.pets:
+            w.reset_stats()
+        if lag is not None:
+            lag.reset()
+        return "ok"
+    reply = app.win.control_command(words)
+    if words[:1] in (["set"], ["mode"]) and reply == "ok":
+        for win in app.pets[1:]:
+            win.control_command(words)
+    return reply
+
+def watch_startup(app, budget):
+    state = {"hid": 0, "clock": None, "finished": False}
+    app.startup_ok = False
+
+    def done(age):
+        if state["finished"]:
+            return
+        state["finished"] = True
+        ok = age is not None and age <= budget
+        app.startup_ok = ok
+        shown = f"{age:.3f}s" if age is not None else "never"
+        print(f"pixie: first frame after {shown} (budget {budget:.3f}s) {'ok' if ok else 'TOO SLOW'}", flush=True)
+        if state["hid"]:
+            state["clock"].disconnect(state["hid"])
+            state["hid"] = 0
+        GLib.idle_add(lambda: (app.quit(), False)[1])
+
+    def painted(*_):
+        if state["hid"]:
+            done(process_age())
+
+    def mapped(win):
+        clock = win.get_frame_clock()
+        if clock is not None:
+            state["clock"] = clock
+            state["hid"] = clock.connect("after-paint", painted)
+
+    first = app.overlay.windows[0] if getattr(app, "overlay", None) else app.win
+    first.connect("map", mapped)
+    GLib.timeout_add_seconds(max(5, int(budget * 10)), lambda: (done(None), False)[1])
 
 def on_activate(app):
     cfg = getattr(app, "args", {})
+    if not hasattr(app, "pool"):
+        app.pool = WorkerPool()
+        app.timers = TimerService()
+        tick_s = (cfg.get("tick_ms") or 0) / 1000.0
+        pointer.install_sampler(pointer.PointerSampler(app.pool, max_age=max(0.3, 2 * tick_s)))
+        app.lag = LagMonitor()
+        if debug.DEBUG:
+            app.lag.start()
+    if cfg.get("shared_cache") and SharedFrameCache.available() and not hasattr(app, "shared_cache"):
+        app.shared_cache = SharedFrameCache()
+    if cfg.get("overlay") and not hasattr(app, "overlay"):
+        app.overlay = None
+        try:
+            from . import overlay
+            if overlay.available():
+                app.overlay = overlay.OverlayHost(app)
+            else:
+                debug_print("[overlay] needs a composited X11 display; using one window per pet")
+        except Exception as e:
+            debug_print("[overlay] unavailable:", repr(e))
     if not hasattr(app, "win"):
-        app.win = CatWindow(
-            app,
-            speed=cfg.get("speed", 1.0),
-            scale=cfg.get("scale", 1.0),
-            color=cfg.get("color", None),
-        )
-    app.win.present()
+        app.snapshot_enabled = not cfg.get("no_snapshot")
+        snap = snapshot.load() if app.snapshot_enabled else None
+        restore = snap["pets"] if snap else []
+        if snap:
+            tint = parse_color(cfg["color"]) if cfg.get("color") else None
+            interp = render.INTERP.get(cfg.get("interp", "bilinear"), GdkPixbuf.InterpType.BILINEAR)
+            if not snapshot.matches(snap, max(0.01, cfg.get("scale", 1.0)), tint, interp):
+                for pet in restore:
+                    pet.pop("raw", None)
+        app.pets = []
+        n = max(1, cfg.get("pets") or 1)
+        app.world = PetWorld() if n > 1 else None
+        for i in range(n):
+            start = None
+            if i:
+                left, top, right, bottom = app.win.bm.area
+                start = (random.uniform(left, right), random.uniform(top, bottom))
+            win = CatWindow(
+                app,
+                speed=cfg.get("speed", 1.0),
+                scale=cfg.get("scale", 1.0),
+                color=cfg.get("color", None),
+                tick_ms=cfg.get("tick_ms", None),
+                interpolate=cfg.get("interpolate", False),
+                interp=cfg.get("interp", "bilinear"),
+                cache=app.win.cache if i else None,
+                world=app.world,
+                overlay=getattr(app, "overlay", None),
+                start_pos=start,
+                workarea=app.win.workarea if i else None,
+                restore=restore[i] if i < len(restore) else None,
+            )
+            app.pets.append(win)
+            if not i:
+                app.win = win
+    if cfg.get("startup_check") is not None and not hasattr(app, "startup_ok"):
+        watch_startup(app, cfg["startup_check"])
+    if getattr(app, "overlay", None):
+        app.overlay.present()
+    else:
+        for win in app.pets:
+            win.present()
     try:
         app.hold()
         debug_print("[app] application hold")
@@ -326,26 +945,87 @@ def on_activate(app):
     try:
         icon_path = resolve_tray_icon()
         def quit_app():
-            GLib.idle_add(app.win._on_close_request)
+            for win in app.pets:
+                GLib.idle_add(win._on_close_request)
+        try:
+            app.set_property("register-session", True)
+            app.connect("query-end", lambda *_: [w.shutdown(animate=False) for w in app.pets])
+        except TypeError:
+            pass
         app.tray = Tray("Pixie", icon_path, on_quit=quit_app)
         ok = app.tray.start()
         debug_print(f"[app] tray started = {bool(ok)}")
     except Exception as e:
         debug_print("[app] tray init failed:", repr(e))
 
+    if cfg.get("cpu_budget") and not hasattr(app, "governor"):
+        app.governor = Governor(cfg["cpu_budget"], lambda level: [w.set_quality(level) for w in app.pets])
+        app.governor.start()
+
+    if (cfg.get("prerender") or cfg.get("prerender_colors")) and not hasattr(app, "prerender"):
+        try:
+            start_prerender(app, cfg)
+        except Exception as e:
+            debug_print("[app] prerender failed:", repr(e))
+
+    if cfg.get("trace") and app.win.trace is None:
+        try:
+            app.win.start_trace(cfg["trace"])
+        except OSError as e:
+            debug_print("[app] trace failed:", repr(e))
+
+    if not hasattr(app, "ctl"):
+        app.ctl = ControlServer(lambda words: control_all(app, words))
+        debug_print(f"[app] control socket = {bool(app.ctl.start())}")
+
     debug_print("[pos]", app.win.pos.debug_report())
-    GLib.timeout_add(1000, lambda: assert_top_tick(app))
+    if "top-tick" not in app.timers:
+        app.timers.schedule("top-tick", 1.0, lambda: assert_top_tick(app))
 
 def main(argv=None):
     p = argparse.ArgumentParser()
     p.add_argument("--speed", type=float, default=1.0)
     p.add_argument("--scale", type=float, default=1.0)
     p.add_argument("--color", type=str, default=None)
+    p.add_argument("--tick-ms", type=int, default=None, help="main-loop tick in ms; movement speed does not depend on it")
+    p.add_argument("--interp", choices=sorted(render.INTERP), default="bilinear",
+                   help="filter for non-integer --scale factors; integer factors always use crisp pixel replication")
+    p.add_argument("--interpolate", action="store_true", help="interpolate the drawn position between simulation steps")
+    p.add_argument("--prerender", action="store_true", help="render every sprite variant up front on all cores")
+    p.add_argument("--prerender-colors", type=str, default=None, help="extra comma-separated #RRGGBB tints to pre-render")
+    p.add_argument("--prerender-workers", type=int, default=None)
+    p.add_argument("--cpu-budget", type=float, default=None, help="max share of one core (e.g. 0.05); quality degrades to stay under it")
+    p.add_argument("--shared-cache", action="store_true", help="share rendered frames with other pixie processes")
+    p.add_argument("--pets", type=int, default=1, help="number of pets; they avoid, chase and play with each other")
+    p.add_argument("--no-snapshot", action="store_true", help="start fresh and do not save state on exit")
+    p.add_argument("--trace", type=str, default=None, help="record input, randomness and frame timings to a trace file")
+    p.add_argument("--overlay", action="store_true",
+                   help="X11: draw every pet in one transparent override-redirect window per monitor")
+    p.add_argument("--exit-animation", choices=("always", "interactive", "never"), default="interactive",
+                   help="play the death animation on quit; 'interactive' skips it on SIGTERM/SIGINT and logout")
+    p.add_argument("--profile-sample", type=str, default=None, metavar="FILE",
+                   help="sample the main thread's stack while running; writes speedscope JSON (.json) or collapsed stacks")
+    p.add_argument("--profile-interval", type=float, default=10.0, metavar="MS", help="CPU time between profile samples")
+    p.add_argument("--startup-check", type=float, default=None, metavar="SECONDS",
+                   help="exit after the first frame is painted; status 1 if that took longer than SECONDS")
     args = p.parse_args(argv)
+    if args.startup_check is not None:
+        args.no_snapshot = True
     app = Gtk.Application()
     app.args = vars(args)
     app.connect("activate", on_activate)
+    if args.profile_sample:
+        app.profiler = SamplingProfiler(os.path.abspath(args.profile_sample), max(0.001, args.profile_interval / 1000.0)).start()
     app.run(None)
+    cleanup(app)
+    if getattr(app, "profiler", None):
+        app.profiler.stop()
+        try:
+            app.profiler.write()
+        except OSError as e:
+            print(f"pixie: profile not written: {e}", file=sys.stderr)
+    if args.startup_check is not None:
+        sys.exit(0 if getattr(app, "startup_ok", False) else 1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,4 @@
-import random
-import gi
-gi.require_version("GLib", "2.0")
-from gi.repository import GLib
+import time
 
 from .behaviors.walk   import Walk
 from .behaviors.sit    import Sit
@@ -9,12 +6,20 @@ from .behaviors.run    import Run
 from .behaviors.idle   import Idle
 from .behaviors.attack import Attack
 from .behaviors.happy  import Happy
+from .trace import TracedRandom
+
+TRANSIENT = ("attack", "happy")
 
 class BehaviorManager:
-    def __init__(self, width: int, height: int, scale: float = 1.0):
+    def __init__(self, width: int, height: int, scale: float = 1.0, clock=time.monotonic, rng=None):
         self.width  = width
         self.height = height
         self.scale  = float(scale) if scale else 1.0
+        self.clock  = clock
+        self.area   = (0, 0, width, height)
+        self.on_switch = None
+        self.world  = None
+        self.pet_id = None
 
         self._behaviors = {
             "walk":   Walk(width, height),
@@ -24,18 +29,22 @@ class BehaviorManager:
             "attack": Attack(width, height, scale=self.scale),
             "happy":  Happy(width, height, scale=self.scale),
         }
+        self.set_rng(rng if rng is not None else TracedRandom())
         self.current = self._behaviors["walk"]
         self.current.start()
 
-        self._sit_timer  = None
-        self._idle_timer = None
+        self._sit_deadline  = None
+        self._idle_deadline = None
 
     def update(self, x: float, y: float):
+        self.expire()
         res = self.current.update(x, y)
         if isinstance(self.current, Attack) and res is None:
             self.switch("walk")
             res = self.current.update(x, y)
         nx, ny, facing = res
+        if self.world is not None:
+            nx, ny = self.world.interact(self, nx, ny)
 
         if isinstance(self.current, Walk) and self.current.steps >= self.current.step_limit:
             self.switch("sit")
@@ -43,26 +52,33 @@ class BehaviorManager:
         if isinstance(self.current, Run) and self.current.steps >= self.current.step_limit:
             self.switch("walk")
 
-        if isinstance(self.current, Sit) and self._sit_timer is None:
-            delay = int(random.uniform(7, 15) * 1000)
-            self._sit_timer = GLib.timeout_add(delay, self._on_sit_timeout)
+        if isinstance(self.current, Sit) and self._sit_deadline is None:
+            self._sit_deadline = self.clock() + self.rng.uniform(7, 15)
 
-        if isinstance(self.current, Idle) is False and isinstance(self.current, Walk) and self._idle_timer is None:
-            if random.random() < 0.002:
+        if isinstance(self.current, Idle) is False and isinstance(self.current, Walk) and self._idle_deadline is None:
+            if self.rng.random() < 0.002:
                 self.switch("idle")
-                self._idle_timer = GLib.timeout_add(5000, self._on_idle_timeout)
+                self._idle_deadline = self.clock() + 5.0
 
         return nx, ny, facing
 
-    def _on_sit_timeout(self):
-        self.switch("walk")
-        self._sit_timer = None
+    def expire(self, now=None) -> bool:
+        now = self.clock() if now is None else now
+        for deadline in (self._sit_deadline, self._idle_deadline):
+            if deadline is not None and now >= deadline:
+                self.switch("walk")
+                return True
         return False
 
-    def _on_idle_timeout(self):
-        self.switch("walk")
-        self._idle_timer = None
-        return False
+    def next_deadline(self):
+        pending = [d for d in (self._sit_deadline, self._idle_deadline) if d is not None]
+        return min(pending) if pending else None
+
+    def is_static(self) -> bool:
+        return getattr(self.current, "static", False)
+
+    def tracks_pointer(self) -> bool:
+        return getattr(self.current, "tracks_pointer", False)
 
     def switch(self, mode_name: str):
         if mode_name not in self._behaviors:
@@ -71,23 +87,73 @@ class BehaviorManager:
         if new is self.current:
             return
 
-        if self._sit_timer:
-            GLib.source_remove(self._sit_timer); self._sit_timer = None
-        if self._idle_timer:
-            GLib.source_remove(self._idle_timer); self._idle_timer = None
+        self._sit_deadline = self._idle_deadline = None
         leaving_walk_for_soft = isinstance(self.current, Walk) and mode_name in ("idle", "attack", "happy")
         if not leaving_walk_for_soft:
             self.current.stop()
 
         if mode_name == "walk" and isinstance(self.current, (Idle, Attack, Happy)):
             self.current = new
-            return
-
-        if mode_name == "attack":
+        elif mode_name == "attack":
             self.current = new
         else:
             self.current = new
             self.current.start()
+        if self.on_switch:
+            self.on_switch(mode_name)
+
+    def attach(self, world, x: float, y: float):
+        self.detach()
+        self.world = world
+        self.pet_id = world.join(self, x, y)
+
+    def detach(self):
+        if self.world is not None:
+            self.world.leave(self.pet_id)
+        self.world = self.pet_id = None
+
+    def set_rng(self, rng):
+        self.rng = rng
+        for b in self._behaviors.values():
+            b.rng = rng
+
+    def set_area(self, left: float, top: float, right: float, bottom: float):
+        self.area = (left, top, max(left, right), max(top, bottom))
+        for b in self._behaviors.values():
+            b.set_area(*self.area)
+
+    def clamp(self, x: float, y: float):
+        left, top, right, bottom = self.area
+        return max(left, min(x, right)), max(top, min(y, bottom))
+
+    def set_scale(self, scale: float):
+        self.scale = float(scale) if scale else 1.0
+        for b in self._behaviors.values():
+            if hasattr(b, "scale"):
+                b.scale = self.scale
+
+    def state(self) -> dict:
+        now = self.clock()
+        return {
+            "mode":      self.mode(),
+            "behaviors": {name: b.state() for name, b in self._behaviors.items()},
+            "sit_left":  None if self._sit_deadline  is None else max(0.0, self._sit_deadline  - now),
+            "idle_left": None if self._idle_deadline is None else max(0.0, self._idle_deadline - now),
+        }
+
+    def restore(self, state: dict):
+        for name, st in state.get("behaviors", {}).items():
+            if name in self._behaviors:
+                self._behaviors[name].restore(st)
+        mode = state.get("mode")
+        if mode in TRANSIENT:
+            mode = "walk"
+        if mode in self._behaviors:
+            self.current = self._behaviors[mode]
+        now = self.clock()
+        sit, idle = state.get("sit_left"), state.get("idle_left")
+        self._sit_deadline  = None if sit  is None else now + sit
+        self._idle_deadline = None if idle is None else now + idle
 
     def mode(self) -> str:
         return type(self.current).__name__.lower()
@@ -7,6 +7,8 @@ class Attack(Behavior):
     move_interval = 100
     fps           = 12
     duration_ms   = 1000
+    tracks_pointer = True
+    state_fields  = ("previous_facing",)
 
     def __init__(self, width, height, scale=1.0):
         super().__init__(width, height)
@@ -1,14 +1,31 @@
-import abc
+import abc, random
 
 class Behavior(abc.ABC):
     asset: str
     step: int
     move_interval: int
     fps: int
+    static: bool = False
+    tracks_pointer: bool = False
+    state_fields: tuple = ()
+    rng = random
 
     def __init__(self, width: int, height: int):
         self.w = width
         self.h = height
+        self.set_area(0, 0, width, height)
+
+    def set_area(self, left: float, top: float, right: float, bottom: float):
+        self.left, self.top = left, top
+        self.right, self.bottom = max(left, right), max(top, bottom)
+
+    def state(self) -> dict:
+        return {k: getattr(self, k) for k in self.state_fields}
+
+    def restore(self, state: dict):
+        for k in self.state_fields:
+            if k in state:
+                setattr(self, k, state[k])
 
     def start(self):
         pass
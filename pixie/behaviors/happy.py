@@ -7,6 +7,7 @@ class Happy(Behavior):
     move_interval = 100
     fps           = 12
     duration_ms   = 1000
+    tracks_pointer = True
 
     def __init__(self, width, height, scale=1.0):
         super().__init__(width, height)
@@ -5,6 +5,7 @@ class Idle(Behavior):
     step          = 0
     move_interval = 1000
     fps           = 1
+    static        = True
 
     def start(self):
         pass
@@ -1,4 +1,4 @@
-import random, math
+import math
 from .base import Behavior
 
 class Run(Behavior):
@@ -7,6 +7,7 @@ class Run(Behavior):
     move_interval = 24
     fps           = 24
     step_limit    = 3000
+    state_fields  = ("tx", "ty", "steps")
 
     def __init__(self, width, height):
         super().__init__(width, height)
@@ -14,8 +15,8 @@ class Run(Behavior):
         self._pick_target()
 
     def _pick_target(self):
-        self.tx = random.uniform(0, self.w)
-        self.ty = random.uniform(0, self.h)
+        self.tx = self.rng.uniform(self.left, self.right)
+        self.ty = self.rng.uniform(self.top, self.bottom)
 
     def start(self):
         self.steps = 0
@@ -27,7 +28,7 @@ class Run(Behavior):
     def update(self, x, y):
         dx, dy = self.tx - x, self.ty - y
         dist   = math.hypot(dx, dy)
-        if dist < self.step or random.random() < 0.05:
+        if dist < self.step or self.rng.random() < 0.05:
             self._pick_target()
             dx, dy = self.tx - x, self.ty - y
             dist   = math.hypot(dx, dy)
@@ -37,11 +38,11 @@ class Run(Behavior):
 
         nx = x + dx/dist * self.step
         ny = y + dy/dist * self.step
-        nx = max(0, min(nx, self.w))
-        ny = max(0, min(ny, self.h))
+        nx = max(self.left, min(nx, self.right))
+        ny = max(self.top, min(ny, self.bottom))
         self.steps += self.step
 
-        if nx in (0, self.w) or ny in (0, self.h):
+        if nx in (self.left, self.right) or ny in (self.top, self.bottom):
             self._pick_target()
 
         facing = 1 if dx >= 0 else -1
@@ -0,0 +1,53 @@
+import threading, time
+
+MIN_BUCKET = 4096
+
+def bucket(size: int) -> int:
+    return max(MIN_BUCKET, 1 << (size - 1).bit_length())
+
+class BufferPool:
+    def __init__(self, per_bucket: int = 4, clock=time.monotonic):
+        self.per_bucket = per_bucket
+        self.clock = clock
+        self._free = {}
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.allocs = 0
+        self.reuses = 0
+        self.frames = 0
+        self._since = self.clock()
+
+    def take(self, size: int) -> bytearray:
+        b = bucket(size)
+        with self._lock:
+            free = self._free.get(b)
+            if free:
+                self.reuses += 1
+                return free.pop()
+            self.allocs += 1
+        return bytearray(b)
+
+    def give(self, *bufs):
+        with self._lock:
+            for buf in bufs:
+                free = self._free.setdefault(len(buf), [])
+                if len(free) < self.per_bucket:
+                    free.append(buf)
+
+    def frame(self):
+        self.frames += 1
+
+    def stats(self):
+        wall = max(1e-9, self.clock() - self._since)
+        with self._lock:
+            pooled = sum(len(b) for free in self._free.values() for b in free)
+        return {
+            "allocs":        self.allocs,
+            "reuses":        self.reuses,
+            "frames":        self.frames,
+            "allocs_per_s":  self.allocs / wall,
+            "frames_per_s":  self.frames / wall,
+            "pooled_bytes":  pooled,
+        }
@@ -0,0 +1,209 @@
+import os, sys, time, socket, tempfile
+from pixie.debug import debug_print
+
+SETTINGS = ("speed", "scale", "color")
+
+def socket_path():
+    p = os.environ.get("PIXIE_CONTROL_SOCKET")
+    if p:
+        return p
+    run = os.environ.get("XDG_RUNTIME_DIR")
+    if run and os.path.isdir(run):
+        return os.path.join(run, "pixie.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"pixie-{uid}.sock")
+
+def send_command(words, path=None, timeout=2.0) -> str:
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("control socket not supported on this platform")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(path or socket_path())
+        s.sendall((" ".join(words) + "\n").encode("utf-8"))
+        buf = b""
+        while not buf.endswith(b"\n"):
+            chunk = s.recv(4096)
+            if not chunk:
+                break
+            buf += chunk
+    return buf.decode("utf-8").strip()
+
+def _alive(path) -> bool:
+    try:
+        send_command(["ping"], path, timeout=0.5)
+        return True
+    except OSError:
+        return False
+
+MAX_CLIENTS      = 8
+CLIENT_TIMEOUT_S = 5.0
+MAX_REQUEST      = 4096
+
+def _glib_watch(fd, writable, fn):
+    from gi.repository import GLib
+    cond = GLib.IOCondition.OUT if writable else GLib.IOCondition.IN
+    return GLib.io_add_watch(fd, GLib.PRIORITY_DEFAULT, cond | GLib.IOCondition.HUP | GLib.IOCondition.ERR,
+                             lambda *_: fn())
+
+def _glib_unwatch(source):
+    from gi.repository import GLib
+    GLib.source_remove(source)
+
+class _Client:
+    def __init__(self, conn, since):
+        self.conn = conn
+        self.since = since
+        self.buf = b""
+        self.out = b""
+        self.watch = 0
+
+class ControlServer:
+    def __init__(self, handler, path=None, watch=_glib_watch, unwatch=_glib_unwatch, clock=time.monotonic):
+        self.handler = handler
+        self.path = path or socket_path()
+        self.clock = clock
+        self._add_watch = watch
+        self._remove_watch = unwatch
+        self._sock = None
+        self._watch = 0
+        self._clients = []
+
+    def bind(self) -> bool:
+        if not hasattr(socket, "AF_UNIX"):
+            return False
+        if _alive(self.path):
+            debug_print(f"[ctl] another instance owns {self.path}")
+            return False
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            debug_print(f"[ctl] cannot remove stale socket: {e!r}")
+            return False
+        try:
+            s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            s.bind(self.path)
+            os.chmod(self.path, 0o600)
+            s.listen(4)
+            s.setblocking(False)
+        except OSError as e:
+            debug_print(f"[ctl] bind failed: {e!r}")
+            return False
+        self._sock = s
+        return True
+
+    def start(self) -> bool:
+        if not self.bind():
+            return False
+        self._watch = self._add_watch(self._sock.fileno(), False, self._on_ready)
+        debug_print(f"[ctl] listening on {self.path}")
+        return True
+
+    def _on_ready(self):
+        self.poll()
+        return True
+
+    def poll(self):
+        now = self.clock()
+        for c in [c for c in self._clients if now - c.since > CLIENT_TIMEOUT_S]:
+            self._close(c)
+        while self._sock:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            if len(self._clients) >= MAX_CLIENTS:
+                conn.close()
+                continue
+            conn.setblocking(False)
+            c = _Client(conn, now)
+            self._clients.append(c)
+            c.watch = self._add_watch(conn.fileno(), False, lambda c=c: self._on_read(c))
+
+    def _on_read(self, c):
+        done = False
+        try:
+            while True:
+                chunk = c.conn.recv(4096)
+                c.buf += chunk
+                if not chunk or b"\n" in chunk or len(c.buf) >= MAX_REQUEST:
+                    done = True
+                    break
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            c.watch = 0
+            self._close(c)
+            return False
+        if not done:
+            return True
+        c.watch = 0
+        c.out = (self.respond(c.buf.split(b"\n", 1)[0]) + "\n").encode("utf-8")
+        if self._on_write(c):
+            c.watch = self._add_watch(c.conn.fileno(), True, lambda c=c: self._on_write(c))
+        return False
+
+    def _on_write(self, c):
+        try:
+            while c.out:
+                c.out = c.out[c.conn.send(c.out):]
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            pass
+        c.watch = 0
+        self._close(c)
+        return False
+
+    def respond(self, line: bytes) -> str:
+        words = line.decode("utf-8", "replace").split()
+        if not words:
+            return "error empty command"
+        if words == ["ping"]:
+            return "ok pong"
+        try:
+            return self.handler(words)
+        except Exception as e:
+            return f"error {e}"
+
+    def _close(self, c):
+        if c in self._clients:
+            self._clients.remove(c)
+        if c.watch:
+            self._remove_watch(c.watch)
+            c.watch = 0
+        try:
+            c.conn.close()
+        except OSError:
+            pass
+
+    def stop(self):
+        for c in list(self._clients):
+            self._close(c)
+        if self._watch:
+            self._remove_watch(self._watch)
+            self._watch = 0
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+def main(argv=None) -> int:
+    import argparse
+    p = argparse.ArgumentParser(prog="pixie ctl")
+    p.add_argument("--socket", default=None)
+    p.add_argument("command", nargs="+", help="e.g. 'set scale 2', 'get color', 'ping'")
+    args = p.parse_args(argv)
+    if args.command[:2] == ["trace", "start"] and len(args.command) == 3:
+        args.command[2] = os.path.abspath(args.command[2])
+    try:
+        reply = send_command(args.command, args.socket)
+    except OSError as e:
+        print(f"pixie ctl: no running pixie ({e})", file=sys.stderr)
+        return 1
+    print(reply)
+    return 0 if reply.startswith("ok") else 1
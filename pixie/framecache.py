@@ -0,0 +1,196 @@
+import gi
+gi.require_version("Gdk", "4.0")
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import Gdk, GdkPixbuf, GLib
+
+from . import render
+from collections import OrderedDict
+from .sprite import open_frames, is_streamed
+from .mask import AlphaMask
+from .bufpool import BufferPool
+
+STREAM_VARIANTS = 16
+LOOKS = 4
+
+def _gbytes(data):
+    return data if isinstance(data, GLib.Bytes) else GLib.Bytes.new(data)
+
+def texture_from_raw(raw):
+    w, h, stride, has_alpha, data = raw
+    fmt = Gdk.MemoryFormat.R8G8B8A8 if has_alpha else Gdk.MemoryFormat.R8G8B8
+    return Gdk.MemoryTexture.new(w, h, fmt, _gbytes(data), stride)
+
+class FrameCache:
+    def __init__(self, scale: float = 1.0, tint=None, shared=None):
+        self.scale = scale
+        self.tint  = tint
+        self.shared = shared
+        self.interp = GdkPixbuf.InterpType.BILINEAR
+        self.pool = None
+        self.buffers = BufferPool()
+        self._frames   = {}
+        self._scaled   = {}
+        self._textures = {}
+        self._masks    = {}
+        self._streamed = OrderedDict()
+        self._looks    = OrderedDict()
+        self._look()
+
+    def frames(self, asset):
+        frames = self._frames.get(asset)
+        if frames is None:
+            frames = self._frames[asset] = open_frames(asset, pool=self.pool)
+        return frames
+
+    def is_streamed(self, asset) -> bool:
+        return is_streamed(self.frames(asset))
+
+    def prefetch(self, assets, pool):
+        for asset in assets:
+            if asset not in self._frames:
+                pool.submit(open_frames, asset, pool, key=("decode", asset),
+                            callback=lambda frames, a=asset: self._frames.setdefault(a, frames))
+
+    def scaled(self, asset, index, scale=None):
+        scale = self.scale if scale is None else scale
+        key = (asset, index, scale, int(self.interp))
+        pix = self._scaled.get(key)
+        if pix is None:
+            pix = self._scaled[key] = render.scale(self.frames(asset)[index][0], scale, self.interp)
+        return pix
+
+    def _stream_variant(self, key, build):
+        hit = self._streamed.get(key)
+        if hit is None:
+            hit = self._streamed[key] = build()
+            while len(self._streamed) > STREAM_VARIANTS:
+                self._streamed.popitem(last=False)
+        else:
+            self._streamed.move_to_end(key)
+        return hit
+
+    def _render_one(self, asset, index, scale, tint, facing):
+        pix = render.tint_and_scale(self.frames(asset)[index][0], scale, tint, self.interp)
+        return pix.flip(True) if facing < 0 else pix
+
+    def _render_raw(self, asset, index, scale, tint, facing):
+        return render.render_raw(self.frames(asset)[index][0], scale, tint, self.interp, facing, self.buffers)
+
+    def texture(self, asset, index, facing):
+        key = (asset, index, self.scale, self.tint, facing, int(self.interp))
+        if self.is_streamed(asset):
+            return self._stream_variant(("tex",) + key, lambda: texture_from_raw(
+                self._render_raw(asset, index, self.scale, self.tint, facing)))
+        tex = self._textures.get(key)
+        if tex is None:
+            self._fill(asset, self.scale, self.tint, facing)
+            tex = self._textures[key]
+        return tex
+
+    def _fill(self, asset, scale, tint, facing):
+        shared_key = None
+        if self.shared:
+            shared_key = self.shared.key(asset, scale, tint, facing, (int(self.interp),))
+            raws = self.shared.load(shared_key)
+            if raws and len(raws) == len(self.frames(asset)):
+                for i, raw in enumerate(raws):
+                    self._textures[(asset, i, scale, tint, facing, int(self.interp))] = texture_from_raw(raw)
+                return
+        raws = []
+        for i in range(len(self.frames(asset))):
+            if render.integer_factor(scale):
+                raws.append(self._render_raw(asset, i, scale, tint, facing))
+            else:
+                raws.append(render.render_raw(self.scaled(asset, i, scale), 1.0, tint, self.interp, facing, self.buffers))
+        self.put_variant(asset, scale, tint, facing, raws, shared_key)
+
+    def has(self, asset, index, scale, tint, facing, interp=None) -> bool:
+        interp = int(self.interp if interp is None else interp)
+        return (asset, index, scale, tint, facing, interp) in self._textures
+
+    def put_variant(self, asset, scale, tint, facing, raws, shared_key=None, interp=None):
+        interp = int(self.interp if interp is None else interp)
+        if self.shared:
+            raws = [(w, h, stride, alpha, _gbytes(data)) for w, h, stride, alpha, data in raws]
+        for i, raw in enumerate(raws):
+            self._textures.setdefault((asset, i, scale, tint, facing, interp), texture_from_raw(raw))
+        if self.shared:
+            self.shared.publish(shared_key or self.shared.key(asset, scale, tint, facing, (interp,)), raws)
+
+    def raw(self, asset, index, facing):
+        return self._render_raw(asset, index, self.scale, self.tint, facing)
+
+    def placement(self, asset, facing, width):
+        frames = self.frames(asset)
+        full = getattr(frames, "full", None)
+        if not full:
+            return 0, 0, None
+        ox, oy = frames.offset
+        fw, fh = full
+        k = render.integer_factor(self.scale)
+        if k:
+            fw, fh, ox, oy = fw * k, fh * k, ox * k, oy * k
+        elif self.scale != 1.0:
+            fw, fh = max(1, int(fw * self.scale)), max(1, int(fh * self.scale))
+            ox, oy = round(ox * self.scale), round(oy * self.scale)
+        if facing < 0:
+            ox = fw - ox - width
+        return ox, oy, (fw, fh)
+
+    def variants(self):
+        return sorted({(k[0], k[4]) for k in self._textures
+                       if k[2] == self.scale and k[3] == self.tint and k[5] == int(self.interp)})
+
+    def mask(self, asset, index, facing):
+        key = (asset, index, self.scale, facing, int(self.interp))
+        if self.is_streamed(asset):
+            return self._stream_variant(("mask",) + key, lambda: AlphaMask.from_pixbuf(
+                self._render_one(asset, index, self.scale, None, facing)))
+        m = self._masks.get(key)
+        if m is None:
+            pix = self.scaled(asset, index)
+            if facing < 0:
+                pix = pix.flip(True)
+            m = self._masks[key] = AlphaMask.from_pixbuf(pix)
+        return m
+
+    def set_scale(self, scale: float):
+        if scale == self.scale:
+            return
+        old, self.scale = self.scale, scale
+        self._scaled   = {k: v for k, v in self._scaled.items()   if k[2] != old}
+        self._textures = {k: v for k, v in self._textures.items() if k[2] != old}
+        self._masks    = {k: v for k, v in self._masks.items()    if k[2] != old}
+        self._streamed.clear()
+
+    def set_interp(self, interp):
+        if interp == self.interp:
+            return
+        self.interp = interp
+        self._look()
+
+    def set_tint(self, tint):
+        if tint == self.tint:
+            return
+        self.tint = tint
+        self._look()
+
+    def _look(self):
+        self._looks[(self.tint, int(self.interp))] = True
+        self._looks.move_to_end((self.tint, int(self.interp)))
+        while len(self._looks) > LOOKS:
+            self._looks.popitem(last=False)
+        interps = {i for _t, i in self._looks}
+        self._textures = {k: v for k, v in self._textures.items() if (k[3], k[5]) in self._looks}
+        self._scaled   = {k: v for k, v in self._scaled.items()   if k[3] in interps}
+        self._masks    = {k: v for k, v in self._masks.items()    if k[4] in interps}
+
+    def stats(self):
+        return {
+            "assets":   len(self._frames),
+            "scaled":   len(self._scaled),
+            "textures": len(self._textures),
+            "masks":    len(self._masks),
+            "streamed": len(self._streamed),
+            "buffers":  self.buffers.stats(),
+        }
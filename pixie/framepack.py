@@ -0,0 +1,105 @@
+import os, sys, json, struct
+from pixie.debug import debug_print
+
+MAGIC     = b"PXPACK1\0"
+PACK_NAME = "frames.pack"
+
+_loaded = None
+
+def default_path():
+    import pixie
+    return os.path.join(os.path.dirname(pixie.__file__), "assets", PACK_NAME)
+
+def build(assets, out):
+    from .sprite import decode_frames, crop_frames
+    from .prerender import to_raw
+    index, blobs = {}, []
+    off = 0
+    for asset in assets:
+        entries = []
+        frames = crop_frames(decode_frames(asset))
+        for pix, delay in frames:
+            w, h, stride, alpha, data = to_raw(pix)
+            entries.append([w, h, stride, bool(alpha), delay, off, len(data)])
+            blobs.append(data)
+            off += len(data)
+        index[os.path.basename(asset)] = {"source_size": os.path.getsize(asset), "frames": entries,
+                                          "offset": list(frames.offset), "full": list(frames.full) if frames.full else None}
+    blob = json.dumps(index).encode("utf-8")
+    tmp = out + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp, out)
+    return index
+
+def load(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path}: not a frame pack")
+    pos = len(MAGIC)
+    (n,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    index = json.loads(data[pos:pos + n].decode("utf-8"))
+    base = pos + n
+    view = memoryview(data)
+    packs = {}
+    for name, entry in index.items():
+        raws = [((w, h, stride, alpha, view[base + off:base + off + length]), delay)
+                for w, h, stride, alpha, delay, off, length in entry["frames"]]
+        packs[name] = (entry.get("source_size"), raws, entry.get("offset"), entry.get("full"))
+    return packs
+
+def _packs():
+    global _loaded
+    if _loaded is None:
+        path = os.environ.get("PIXIE_FRAME_PACK") or default_path()
+        try:
+            _loaded = load(path)
+            debug_print(f"[pack] {len(_loaded)} assets from {path}")
+        except (OSError, ValueError, struct.error) as e:
+            if not isinstance(e, FileNotFoundError):
+                debug_print(f"[pack] ignoring {path}: {e!r}")
+            _loaded = {}
+    return _loaded
+
+def stamp(filename):
+    hit = _packs().get(os.path.basename(filename))
+    return None if hit is None else (os.path.basename(filename), hit[0])
+
+def lookup(filename):
+    hit = _packs().get(os.path.basename(filename))
+    if hit is None:
+        return None
+    source_size, raws, offset, full = hit
+    try:
+        if os.path.getsize(filename) != source_size:
+            return None
+    except OSError:
+        pass
+    from .prerender import from_raw
+    from .sprite import Frames
+    frames = Frames((from_raw((w, h, stride, alpha, bytes(data))), delay) for (w, h, stride, alpha, data), delay in raws)
+    if offset:
+        frames.offset = tuple(offset)
+    if full:
+        frames.full = tuple(full)
+    return frames
+
+def main(argv=None) -> int:
+    import argparse, glob
+    p = argparse.ArgumentParser(prog="python -m pixie.framepack")
+    p.add_argument("-o", "--output", default=None, help=f"pack file to write (default: pixie/assets/{PACK_NAME})")
+    p.add_argument("assets", nargs="*", help="GIFs to pack (default: every GIF in pixie/assets)")
+    args = p.parse_args(argv)
+    assets = args.assets or sorted(glob.glob(os.path.join(os.path.dirname(default_path()), "*.gif")))
+    out = args.output or default_path()
+    index = build(assets, out)
+    frames = sum(len(e["frames"]) for e in index.values())
+    print(f"{out}: {len(index)} assets, {frames} frames, {os.path.getsize(out)} bytes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
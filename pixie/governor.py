@@ -0,0 +1,85 @@
+import time
+from collections import deque
+from pixie.debug import debug_print
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+LEVELS = ("full", "low-fps", "slow-tick", "no-tint", "nearest")
+HISTORY = 64
+
+def cpu_seconds() -> float:
+    if resource is not None:
+        ru = resource.getrusage(resource.RUSAGE_SELF)
+        return ru.ru_utime + ru.ru_stime
+    return time.process_time()
+
+class Governor:
+    def __init__(self, budget: float, on_level, interval_ms: int = 1000, down_after: int = 2,
+                 up_after: int = 5, headroom: float = 0.6, clock=time.monotonic, cpu=cpu_seconds):
+        self.budget = budget
+        self.on_level = on_level
+        self.interval_ms = interval_ms
+        self.down_after = down_after
+        self.up_after = up_after
+        self.headroom = headroom
+        self.clock = clock
+        self.cpu = cpu
+        self.level = 0
+        self.usage = 0.0
+        self.transitions = deque(maxlen=HISTORY)
+        self._over = 0
+        self._under = 0
+        self._id = 0
+        self._last = None
+
+    def start(self):
+        if self._id:
+            return
+        from gi.repository import GLib
+        self._last = (self.clock(), self.cpu())
+        self._id = GLib.timeout_add(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._id:
+            from gi.repository import GLib
+            GLib.source_remove(self._id)
+            self._id = 0
+
+    def sample(self) -> float:
+        now, cpu = self.clock(), self.cpu()
+        if self._last is None:
+            self._last = (now, cpu)
+            return 0.0
+        wall = now - self._last[0]
+        used = cpu - self._last[1]
+        self._last = (now, cpu)
+        return used / wall if wall > 0 else 0.0
+
+    def _tick(self):
+        self.observe(self.sample())
+        return True
+
+    def observe(self, usage: float):
+        self.usage = usage
+        if usage > self.budget:
+            self._over += 1
+            self._under = 0
+            if self._over >= self.down_after and self.level < len(LEVELS) - 1:
+                self._set_level(self.level + 1)
+        elif usage < self.budget * self.headroom:
+            self._under += 1
+            self._over = 0
+            if self._under >= self.up_after and self.level > 0:
+                self._set_level(self.level - 1)
+        else:
+            self._over = self._under = 0
+
+    def _set_level(self, level: int):
+        old, self.level = self.level, level
+        self._over = self._under = 0
+        self.transitions.append((time.time(), old, level, self.usage))
+        debug_print(f"[gov] cpu {self.usage:.1%} of budget {self.budget:.1%}: {LEVELS[old]} -> {LEVELS[level]}")
+        self.on_level(level)
@@ -0,0 +1,70 @@
+import math
+from .spatial import SpatialHash
+
+class PetWorld:
+    def __init__(self, personal: float = 48.0, chase: float = 240.0, play: float = 64.0,
+                 chase_chance: float = 0.02, play_chance: float = 0.002):
+        self.personal = personal
+        self.chase = chase
+        self.play = play
+        self.chase_chance = chase_chance
+        self.play_chance = play_chance
+        self.grid = SpatialHash(cell=max(personal, play))
+        self.pets = {}
+        self._next = 0
+
+    def join(self, bm, x: float, y: float) -> int:
+        pid = self._next
+        self._next += 1
+        self.pets[pid] = bm
+        self.grid.update(pid, x, y)
+        return pid
+
+    def leave(self, pid):
+        self.pets.pop(pid, None)
+        self.grid.remove(pid)
+
+    def neighbours(self, pid, radius: float):
+        x, y = self.grid.pos[pid]
+        return self.grid.query(x, y, radius, exclude=pid)
+
+    def interact(self, bm, x: float, y: float):
+        pid = bm.pet_id
+        mode = bm.mode()
+        if mode in ("walk", "run"):
+            x, y = self._separate(bm, pid, x, y)
+        if mode == "walk":
+            self._chase_or_play(bm, pid, x, y)
+        self.grid.update(pid, x, y)
+        return x, y
+
+    def _separate(self, bm, pid, x, y):
+        personal = self.personal * bm.scale
+        px, py = 0.0, 0.0
+        for other, d2 in self.grid.query(x, y, personal, exclude=pid):
+            ox, oy = self.grid.pos[other]
+            d = math.sqrt(d2)
+            if d == 0:
+                px += bm.rng.uniform(-1, 1)
+                continue
+            push = (personal - d) / personal
+            px += (x - ox) / d * push
+            py += (y - oy) / d * push
+        step = bm.current.step
+        return bm.clamp(x + px * step, y + py * step)
+
+    def _chase_or_play(self, bm, pid, x, y):
+        roll = bm.rng.random()
+        if roll >= max(self.chase_chance, self.play_chance):
+            return
+        play = self.play * bm.scale
+        for other, d2 in self.grid.query(x, y, self.chase * bm.scale, exclude=pid):
+            peer = self.pets[other]
+            peer_mode = peer.mode()
+            if peer_mode == "run" and roll < self.chase_chance:
+                bm.current.tx, bm.current.ty = self.grid.pos[other]
+                return
+            if peer_mode == "walk" and d2 <= play * play and roll < self.play_chance:
+                bm.switch("run")
+                peer.switch("run")
+                return
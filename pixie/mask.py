@@ -0,0 +1,75 @@
+try:
+    import cairo
+except ImportError:
+    cairo = None
+
+ALPHA_THRESHOLD = 16
+
+def _alpha_table(threshold):
+    return bytes(1 if a >= threshold else 0 for a in range(256))
+
+_TABLE = _alpha_table(ALPHA_THRESHOLD)
+
+def _spans(bits):
+    out = []
+    i = bits.find(1)
+    while i >= 0:
+        j = bits.find(0, i)
+        if j < 0:
+            j = len(bits)
+        out.append((i, j))
+        i = bits.find(1, j)
+    return tuple(out)
+
+class AlphaMask:
+    def __init__(self, width: int, height: int, bits: bytes):
+        self.width = width
+        self.height = height
+        self.bits = bits
+        self._rects = None
+        self._region = None
+
+    @classmethod
+    def from_pixbuf(cls, pixbuf, threshold: int = ALPHA_THRESHOLD):
+        w, h = pixbuf.get_width(), pixbuf.get_height()
+        if not pixbuf.get_has_alpha():
+            return cls(w, h, b"\x01" * (w * h))
+        table = _TABLE if threshold == ALPHA_THRESHOLD else _alpha_table(threshold)
+        data   = pixbuf.get_pixels()
+        stride = pixbuf.get_rowstride()
+        nch    = pixbuf.get_n_channels()
+        rows = []
+        for y in range(h):
+            start = y * stride + nch - 1
+            rows.append(bytes(data[start:start + w * nch:nch]).translate(table))
+        return cls(w, h, b"".join(rows))
+
+    def hit(self, x: int, y: int) -> bool:
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return False
+        return self.bits[y * self.width + x] == 1
+
+    def rects(self):
+        if self._rects is None:
+            rects, open_ = [], {}
+            prev = ()
+            w = self.width
+            for y in range(self.height + 1):
+                spans = _spans(self.bits[y * w:(y + 1) * w]) if y < self.height else ()
+                if spans != prev:
+                    for x0, x1 in prev:
+                        rects.append((x0, open_[(x0, x1)], x1 - x0, y - open_[(x0, x1)]))
+                    open_ = {s: y for s in spans}
+                    prev = spans
+            self._rects = rects
+        return self._rects
+
+    def region(self):
+        if cairo is None:
+            return None
+        if self._region is None:
+            region = cairo.Region()
+            for x, y, w, h in self.rects():
+                region.union(cairo.RectangleInt(x, y, w, h))
+            self._region = region
+        return self._region
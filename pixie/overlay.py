@@ -0,0 +1,257 @@
+import ctypes
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Gdk", "4.0")
+gi.require_version("Graphene", "1.0")
+from gi.repository import Gtk, Gdk, Graphene
+from pixie.debug import debug_print
+from .positioner import _gdk_xdisplay
+
+try:
+    import cairo
+except ImportError:
+    cairo = None
+
+CWOverrideRedirect = 1 << 9
+
+class XSetWindowAttributes(ctypes.Structure):
+    _fields_ = [
+        ("background_pixmap", ctypes.c_ulong),
+        ("background_pixel", ctypes.c_ulong),
+        ("border_pixmap", ctypes.c_ulong),
+        ("border_pixel", ctypes.c_ulong),
+        ("bit_gravity", ctypes.c_int),
+        ("win_gravity", ctypes.c_int),
+        ("backing_store", ctypes.c_int),
+        ("backing_planes", ctypes.c_ulong),
+        ("backing_pixel", ctypes.c_ulong),
+        ("save_under", ctypes.c_int),
+        ("event_mask", ctypes.c_long),
+        ("do_not_propagate_mask", ctypes.c_long),
+        ("override_redirect", ctypes.c_int),
+        ("colormap", ctypes.c_ulong),
+        ("cursor", ctypes.c_ulong),
+    ]
+
+_x11 = None
+
+def _libx11():
+    global _x11
+    if _x11 is None:
+        lib = ctypes.CDLL("libX11.so.6")
+        lib.XChangeWindowAttributes.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_void_p]
+        lib.XMoveResizeWindow.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int, ctypes.c_uint, ctypes.c_uint]
+        lib.XRaiseWindow.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        lib.XFlush.argtypes = [ctypes.c_void_p]
+        _x11 = lib
+    return _x11
+
+def available(display=None) -> bool:
+    display = display or Gdk.Display.get_default()
+    if display is None or cairo is None or "x11" not in type(display).__name__.lower():
+        return False
+    try:
+        gi.require_version("GdkX11", "4.0")
+        from gi.repository import GdkX11
+        _libx11()
+    except (ValueError, ImportError, OSError):
+        return False
+    return bool(display.is_composited() and display.is_rgba())
+
+class OverlayCanvas(Gtk.Widget):
+    def __init__(self, origin):
+        super().__init__()
+        self.origin = origin
+        self.pets = {}
+        self._hover = None
+        self._region_id = 0
+
+        click = Gtk.GestureClick.new()
+        click.set_button(1)
+        click.connect("pressed", self._on_click)
+        self.add_controller(click)
+
+        motion = Gtk.EventControllerMotion.new()
+        motion.connect("motion", self._on_motion)
+        motion.connect("leave",  self._on_leave)
+        self.add_controller(motion)
+
+        scroll = Gtk.EventControllerScroll.new(Gtk.EventControllerScrollFlags.VERTICAL)
+        scroll.connect("scroll", self._on_scroll)
+        self.add_controller(scroll)
+
+    def do_snapshot(self, snapshot):
+        for tex, x, y, _mask in self.pets.values():
+            snapshot.append_texture(tex, Graphene.Rect().init(x, y, tex.get_width(), tex.get_height()))
+
+    def put(self, pet, tex, x, y, mask):
+        self.pets[pet] = [tex, x - self.origin[0], y - self.origin[1], mask]
+        self._changed()
+
+    def take(self, pet):
+        state = self.pets.pop(pet, None)
+        if pet is self._hover:
+            self._hover = None
+        if state is not None:
+            self._changed()
+        return state
+
+    def _changed(self):
+        self.queue_draw()
+        if not self._region_id:
+            self._region_id = self.add_tick_callback(self._apply_region)
+
+    def _apply_region(self, *_):
+        self._region_id = 0
+        surf = self.get_native().get_surface() if self.get_native() else None
+        if surf is None:
+            return False
+        region = cairo.Region()
+        for tex, x, y, mask in self.pets.values():
+            ix, iy = int(round(x)), int(round(y))
+            if mask is None:
+                region.union(cairo.RectangleInt(ix, iy, tex.get_width(), tex.get_height()))
+                continue
+            for rx, ry, rw, rh in mask.rects():
+                region.union(cairo.RectangleInt(ix + rx, iy + ry, rw, rh))
+        try:
+            surf.set_input_region(region)
+        except Exception as e:
+            debug_print(f"[overlay] set_input_region failed: {e!r}")
+        return False
+
+    def _pet_at(self, x, y):
+        for pet, (tex, px, py, mask) in reversed(list(self.pets.items())):
+            lx, ly = x - px, y - py
+            if not (0 <= lx < tex.get_width() and 0 <= ly < tex.get_height()):
+                continue
+            if mask is None or mask.hit(int(lx), int(ly)):
+                return pet, lx, ly
+        return None, 0.0, 0.0
+
+    def _on_motion(self, _controller, x, y):
+        pet, lx, ly = self._pet_at(x, y)
+        if self._hover is not None and pet is not self._hover:
+            self._hover._on_pointer_leave()
+        self._hover = pet
+        if pet is not None:
+            pet._on_motion(None, lx, ly)
+
+    def _on_leave(self, *_):
+        if self._hover is not None:
+            self._hover._on_pointer_leave()
+            self._hover = None
+
+    def _on_scroll(self, _controller, dx, dy):
+        if self._hover is None:
+            return False
+        return self._hover._on_scroll(None, dx, dy)
+
+    def _on_click(self, _gesture, _n, x, y):
+        pet, _lx, _ly = self._pet_at(x, y)
+        if pet is not None:
+            pet._trigger_run()
+
+class OverlayWindow(Gtk.ApplicationWindow):
+    def __init__(self, app, geom):
+        super().__init__(application=app, title="Pixie")
+        self.geom = geom
+        x, y, w, h = geom
+        self.add_css_class("transparent")
+        self.set_decorated(False)
+        self.set_resizable(False)
+        self.set_default_size(w, h)
+        self.canvas = OverlayCanvas((x, y))
+        self.canvas.set_size_request(w, h)
+        self.set_child(self.canvas)
+        self.connect("realize", self._on_realize)
+        self.connect("map", lambda *_: self.raise_to_top())
+
+    def _x11(self):
+        from gi.repository import GdkX11
+        surf = self.get_surface()
+        if surf is None:
+            return None, 0
+        return _gdk_xdisplay(self.get_display()), int(GdkX11.X11Surface.get_xid(surf))
+
+    def _on_realize(self, *_):
+        self.get_surface().set_input_region(cairo.Region())
+        dpy, xid = self._x11()
+        if not dpy or not xid:
+            debug_print("[overlay] no X11 surface; window stays managed")
+            return
+        attrs = XSetWindowAttributes()
+        attrs.override_redirect = 1
+        _libx11().XChangeWindowAttributes(dpy, xid, CWOverrideRedirect, ctypes.byref(attrs))
+        debug_print(f"[overlay] override-redirect 0x{xid:X} at {self.geom}")
+
+    def raise_to_top(self):
+        dpy, xid = self._x11()
+        if not dpy or not xid:
+            return False
+        x, y, w, h = self.geom
+        lib = _libx11()
+        lib.XMoveResizeWindow(dpy, xid, x, y, w, h)
+        lib.XRaiseWindow(dpy, xid)
+        lib.XFlush(dpy)
+        return True
+
+class OverlayHost:
+    def __init__(self, app, display=None):
+        display = display or Gdk.Display.get_default()
+        monitors = display.get_monitors()
+        self.windows = []
+        for i in range(monitors.get_n_items()):
+            g = monitors.get_item(i).get_geometry()
+            self.windows.append(OverlayWindow(app, (g.x, g.y, g.width, g.height)))
+        self._where = {}
+        self._pos = {}
+
+    def _route(self, pet, tex, x, y):
+        w, h = tex.get_width(), tex.get_height()
+        cx, cy = x + w / 2, y + h / 2
+        for win in self.windows:
+            gx, gy, gw, gh = win.geom
+            if gx <= cx < gx + gw and gy <= cy < gy + gh:
+                return win
+        return self._where.get(pet) or self.windows[0]
+
+    def show(self, pet, tex, mask):
+        x, y = self._pos.get(pet) or (pet.pos_x + pet._offset[0], pet.pos_y + pet._offset[1])
+        self._pos[pet] = (x, y)
+        win = self._where.get(pet) or self._route(pet, tex, x, y)
+        self._where[pet] = win
+        win.canvas.put(pet, tex, x, y, mask)
+
+    def move(self, pet, x, y):
+        self._pos[pet] = (x, y)
+        old = self._where.get(pet)
+        if old is None:
+            return
+        state = old.canvas.pets.get(pet)
+        win = self._route(pet, state[0], x, y)
+        if win is not old:
+            old.canvas.take(pet)
+            self._where[pet] = win
+        win.canvas.put(pet, state[0], x, y, state[3])
+
+    def remove(self, pet):
+        win = self._where.pop(pet, None)
+        self._pos.pop(pet, None)
+        if win is not None:
+            win.canvas.take(pet)
+
+    def tick_widget(self):
+        return self.windows[0].canvas
+
+    def present(self):
+        for win in self.windows:
+            win.present()
+
+    def assert_topmost(self) -> bool:
+        return all([win.raise_to_top() for win in self.windows])
+
+    def close(self):
+        for win in self.windows:
+            win.destroy()
+        self.windows = []
@@ -1,7 +1,8 @@
 from __future__ import annotations
+import threading, time
 from typing import Optional, Tuple
 
-__all__ = ["get_mouse_position"]
+__all__ = ["get_mouse_position", "PointerSampler", "install_sampler", "set_observer", "tick", "x11_display"]
 
 _POS_TYPE = Tuple[int, int]
 
@@ -47,6 +48,15 @@ def _win_backend() -> Optional[_POS_TYPE]:
         return pt.x, pt.y
     return None
 
+_xlocal = threading.local()
+
+def x11_display():
+    dsp = getattr(_xlocal, "display", None)
+    if dsp is None:
+        from Xlib import display
+        dsp = _xlocal.display = display.Display()
+    return dsp
+
 def _x11_backend() -> Optional[_POS_TYPE]:
     try:
         import os
@@ -55,16 +65,72 @@ def _x11_backend() -> Optional[_POS_TYPE]:
         from Xlib import display
     except Exception:
         return None
-    dsp = display.Display()
+    dsp = x11_display()
     root = dsp.screen().root
     data = root.query_pointer()._data
     return data["root_x"], data["root_y"]
 
 _backends = (_gtk_backend, _win_backend, _x11_backend)
+_blocking = (_x11_backend,)
+_sampler = None
+_observer = None
 
-def get_mouse_position() -> Optional[_POS_TYPE]:
+def _blocking_position() -> Optional[_POS_TYPE]:
+    for backend in _blocking:
+        try:
+            pos = backend()
+        except Exception:
+            pos = None
+        if pos is not None:
+            return pos
+    return None
+
+class PointerSampler:
+    def __init__(self, pool, max_age: float = 0.3, clock=time.monotonic):
+        self.pool = pool
+        self.max_age = max_age
+        self.clock = clock
+        self._sample = None
+        self._job = None
+
+    def tick(self):
+        if self._job is None or self._job.done():
+            asked = self.clock()
+            self._job = self.pool.submit(_blocking_position, key="pointer",
+                                         callback=lambda pos, t=asked: self._store(t, pos))
+
+    def _store(self, asked, pos):
+        if self._sample is None or asked >= self._sample[0]:
+            self._sample = (asked, pos)
+
+    def latest(self) -> Optional[_POS_TYPE]:
+        if self._sample is None or self.clock() - self._sample[0] > self.max_age:
+            return None
+        return self._sample[1]
+
+def install_sampler(sampler: Optional[PointerSampler]):
+    global _sampler
+    _sampler = sampler
+
+def set_observer(fn):
+    global _observer
+    _observer = fn
+
+def tick():
+    if _sampler is not None:
+        _sampler.tick()
+
+def _query() -> Optional[_POS_TYPE]:
     for backend in _backends:
+        if _sampler is not None and backend in _blocking:
+            return _sampler.latest()
         pos = backend()
         if pos is not None:
             return pos
-    return None
\ No newline at end of file
+    return None
+
+def get_mouse_position() -> Optional[_POS_TYPE]:
+    pos = _query()
+    if _observer is not None:
+        _observer(pos)
+    return pos
@@ -7,6 +7,65 @@ if os.name == "nt":
     gi.require_version("GdkWin32", "4.0")
     from gi.repository import GdkWin32
 
+class XClientMessageEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("window", ctypes.c_ulong),
+        ("message_type", ctypes.c_ulong),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_long * 5),
+    ]
+
+_ClientMessage = 33
+_SubstructureMask = 0x00100000 | 0x00080000
+
+_batch = []
+_batch_id = 0
+
+def _gdk_xdisplay(disp):
+    if "x11" not in type(disp).__name__.lower():
+        return None
+    try:
+        lib = ctypes.CDLL("libgtk-4.so.1")
+        fn = lib.gdk_x11_display_get_xdisplay
+        fn.restype = ctypes.c_void_p
+        fn.argtypes = [ctypes.c_void_p]
+        unwrap = ctypes.pythonapi.PyCapsule_GetPointer
+        unwrap.restype = ctypes.c_void_p
+        unwrap.argtypes = [ctypes.py_object, ctypes.c_char_p]
+        return fn(unwrap(disp.__gpointer__, None)) or None
+    except Exception as e:
+        debug_print(f"[pos] gdk xdisplay unavailable: {e!r}")
+        return None
+
+def _queue(pos):
+    global _batch_id
+    if pos not in _batch:
+        _batch.append(pos)
+    if not _batch_id:
+        from gi.repository import GLib
+        _batch_id = GLib.idle_add(_flush_batch, priority=GLib.PRIORITY_HIGH_IDLE)
+
+def _flush_batch():
+    global _batch_id
+    _batch_id = 0
+    pending = _batch[:]
+    del _batch[:]
+    flush = {}
+    for pos in pending:
+        ptr = pos._x11_commit()
+        if ptr:
+            flush[ptr] = pos._libX11
+    for ptr, lib in flush.items():
+        try:
+            lib.XFlush(ctypes.c_void_p(ptr))
+        except Exception:
+            pass
+    return False
+
 class Positioner:
     GWL_EXSTYLE = -20
     WS_EX_TOOLWINDOW = 0x00000080
@@ -29,9 +88,12 @@ class Positioner:
         self._x11_ready = False
         self._xid = 0
         self._xdisplay_ptr = None
+        self._own_display = False
+        self._x11_ops = {}
         self._libX11 = None
         self._atoms = {}
         self._x11_state_applied = False
+        self._pool = None
 
         if os.name == "nt":
             self.hwnd = None
@@ -133,6 +195,7 @@ class Positioner:
                 self._libX11.XChangeProperty.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
                 self._libX11.XSendEvent.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_bool, ctypes.c_long, ctypes.c_void_p]
                 self._libX11.XSendEvent.restype = ctypes.c_int
+                self._libX11.XCloseDisplay.argtypes = [ctypes.c_void_p]
             except Exception:
                 self._libX11 = None
 
@@ -156,8 +219,11 @@ class Positioner:
                 xid = 0
         if not xid:
             return
-        xdisp = None
-        if self._libX11:
+        if not self._libX11:
+            return
+        xdisp = _gdk_xdisplay(self._disp_obj) if self._disp_obj is not None else None
+        own = not xdisp
+        if own:
             try:
                 xdisp = self._libX11.XOpenDisplay(None)
             except Exception:
@@ -167,11 +233,57 @@ class Positioner:
         try:
             self._xid = xid
             self._xdisplay_ptr = ctypes.c_void_p(int(xdisp))
+            self._own_display = own
             self._x11_ready = True
-            debug_print(f"[pos] x11 ready xid=0x{int(self._xid):X}")
+            debug_print(f"[pos] x11 ready xid=0x{int(self._xid):X} conn={'own' if own else 'gdk'}")
         except Exception:
             self._x11_ready = False
 
+    def close(self):
+        ptr, self._xdisplay_ptr = self._xdisplay_ptr, None
+        self._x11_ready = False
+        self._x11_ops = {}
+        if self in _batch:
+            _batch.remove(self)
+        if ptr and self._own_display and self._libX11:
+            try:
+                self._libX11.XCloseDisplay(ptr)
+                debug_print("[pos] x11 display closed")
+            except Exception:
+                pass
+
+    def use_worker(self, pool):
+        self._pool = pool
+
+    def _x11_queue(self, op, *args):
+        self._x11_ops[op] = args
+        _queue(self)
+        return True
+
+    def _x11_commit(self):
+        ops, self._x11_ops = self._x11_ops, {}
+        if not ops or not self._x11_ready:
+            return None
+        if self._own_display and self._pool is not None:
+            self._pool.submit(self._x11_apply, ops, True, lane="x11")
+            return None
+        self._x11_apply(ops, False)
+        return self._xdisplay_ptr.value
+
+    def _x11_apply(self, ops, flush):
+        try:
+            if "move" in ops:
+                x, y = ops["move"]
+                self._libX11.XMoveWindow(self._xdisplay_ptr, self._xid, x, y)
+            if "top" in ops:
+                self._libX11.XRaiseWindow(self._xdisplay_ptr, self._xid)
+                if not self._x11_state_applied:
+                    self._x11_state_applied = self._x11_apply_above()
+            if flush:
+                self._libX11.XFlush(self._xdisplay_ptr)
+        except Exception:
+            pass
+
     def _atom(self, name):
         if not self._libX11 or not self._xdisplay_ptr:
             return 0
@@ -193,37 +305,16 @@ class Positioner:
         arr[0] = s_above
         self._libX11.XChangeProperty(self._xdisplay_ptr, ctypes.c_ulong(self._xid), nstate, self._atom("ATOM"), 32, 0, ctypes.cast(ctypes.pointer(arr), ctypes.c_void_p), 1)
         root = self._libX11.XDefaultRootWindow(self._xdisplay_ptr)
-        data = (ctypes.c_long * 5)()
-        data[0] = 1
-        data[1] = ctypes.c_long(s_above).value
-        data[2] = 0
-        data[3] = 0
-        data[4] = 0
-        class XClientMessageEvent(ctypes.Structure):
-            _fields_ = [
-                ("type", ctypes.c_int),
-                ("serial", ctypes.c_ulong),
-                ("send_event", ctypes.c_int),
-                ("display", ctypes.c_void_p),
-                ("window", ctypes.c_ulong),
-                ("message_type", ctypes.c_ulong),
-                ("format", ctypes.c_int),
-                ("data", ctypes.c_long * 5),
-            ]
         ev = XClientMessageEvent()
-        ev.type = 33
-        ev.serial = 0
+        ev.type = _ClientMessage
         ev.send_event = 1
         ev.display = self._xdisplay_ptr
-        ev.window = ctypes.c_ulong(self._xid).value
-        ev.message_type = ctypes.c_ulong(nstate).value
+        ev.window = self._xid
+        ev.message_type = nstate
         ev.format = 32
-        ev.data = data
-        SubstructureRedirectMask = 0x00100000
-        SubstructureNotifyMask = 0x00080000
-        mask = SubstructureRedirectMask | SubstructureNotifyMask
-        self._libX11.XSendEvent(self._xdisplay_ptr, ctypes.c_ulong(root), False, ctypes.c_long(mask), ctypes.byref(ev))
-        self._libX11.XFlush(self._xdisplay_ptr)
+        ev.data[0] = 1
+        ev.data[1] = ctypes.c_long(s_above).value
+        self._libX11.XSendEvent(self._xdisplay_ptr, root, False, _SubstructureMask, ctypes.byref(ev))
         return True
 
     def _get_hwnd(self):
@@ -326,11 +417,8 @@ class Positioner:
             return
         self._ensure_x11_bound()
         if self._x11_ready and self._libX11:
-            try:
-                self._libX11.XMoveWindow(self._xdisplay_ptr, ctypes.c_ulong(self._xid), int(x), int(y))
-                self._libX11.XFlush(self._xdisplay_ptr)
-            except Exception:
-                pass
+            x, y = int(x), int(y)
+            self._x11_queue("move", x, y)
 
     def hide_from_taskbar(self):
         if os.name == "nt":
@@ -352,14 +440,7 @@ class Positioner:
             return True
         self._ensure_x11_bound()
         if self._x11_ready and self._libX11:
-            try:
-                self._libX11.XRaiseWindow(self._xdisplay_ptr, ctypes.c_ulong(self._xid))
-                if not self._x11_state_applied:
-                    self._x11_state_applied = self._x11_apply_above()
-                self._libX11.XFlush(self._xdisplay_ptr)
-                return True
-            except Exception:
-                return False
+            return self._x11_queue("top")
         return False
 
     def assert_topmost(self):
@@ -374,14 +455,7 @@ class Positioner:
             return True
         self._ensure_x11_bound()
         if self._x11_ready and self._libX11:
-            try:
-                self._libX11.XRaiseWindow(self._xdisplay_ptr, ctypes.c_ulong(self._xid))
-                if not self._x11_state_applied:
-                    self._x11_state_applied = self._x11_apply_above()
-                self._libX11.XFlush(self._xdisplay_ptr)
-                return True
-            except Exception:
-                return False
+            return self._x11_queue("top")
         return False
 
     def debug_report(self):
@@ -393,5 +467,5 @@ class Positioner:
         if self._backend == "wayland" and not self._wl_active:
             return "backend=wayland layer-shell=OFF"
         if self._x11_ready:
-            return f"backend=x11 xid=0x{int(self._xid):X}"
+            return f"backend=x11 xid=0x{int(self._xid):X} conn={'own' if self._own_display else 'gdk'}"
         return f"backend={self._backend}"
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pixie.debug import debug_print
+
+def to_raw(pixbuf):
+    return (pixbuf.get_width(), pixbuf.get_height(), pixbuf.get_rowstride(),
+            pixbuf.get_has_alpha(), bytes(pixbuf.get_pixels()))
+
+def from_raw(raw):
+    import gi
+    gi.require_version("GdkPixbuf", "2.0")
+    from gi.repository import GdkPixbuf, GLib
+    w, h, stride, has_alpha, data = raw
+    return GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(data), GdkPixbuf.Colorspace.RGB, has_alpha, 8, w, h, stride)
+
+def render_job(raws, scale, tint, facing, interp):
+    from . import render
+    interp = render.GdkPixbuf.InterpType(interp)
+    return [render.render_raw(from_raw(raw), scale, tint, interp, facing) for raw in raws]
+
+def _once(fn):
+    fn()
+    return False
+
+class Prerenderer:
+    def __init__(self, cache, workers=None, progress=None, deliver=None):
+        self.cache = cache
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress
+        self._deliver = deliver
+        self._pool = None
+        self.total = 0
+        self.done = 0
+
+    def _executor(self):
+        if self._pool is None:
+            ctx = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+        return self._pool
+
+    def _post(self, fn):
+        if self._deliver:
+            self._deliver(fn)
+            return
+        from gi.repository import GLib
+        GLib.idle_add(_once, fn)
+
+    def jobs(self, assets, scales, tints, facings=(1, -1)):
+        for asset in assets:
+            if self.cache.is_streamed(asset):
+                continue
+            n = len(self.cache.frames(asset))
+            for scale in scales:
+                for tint in tints:
+                    for facing in facings:
+                        if all(self.cache.has(asset, i, scale, tint, facing) for i in range(n)):
+                            continue
+                        yield asset, scale, tint, facing
+
+    def run(self, assets, scales, tints, facings=(1, -1), first=None):
+        if first is not None:
+            asset, facing = first
+            self.cache.texture(asset, 0, facing)
+        todo = list(self.jobs(assets, scales, tints, facings))
+        self.total += len(todo)
+        if not todo:
+            self._report()
+            return []
+        ex = self._executor()
+        interp = int(self.cache.interp)
+        futures = []
+        for asset, scale, tint, facing in todo:
+            raws = [to_raw(pix) for pix, _ in self.cache.frames(asset)]
+            fut = ex.submit(render_job, raws, scale, tint, facing, interp)
+            fut.add_done_callback(lambda f, k=(asset, scale, tint, facing, interp): self._post(lambda: self._store(k, f)))
+            futures.append(fut)
+        debug_print(f"[prerender] {len(todo)} jobs on {self.workers} workers")
+        return futures
+
+    def _store(self, key, fut):
+        asset, scale, tint, facing, interp = key
+        if fut.cancelled():
+            return
+        err = fut.exception()
+        if err is not None:
+            debug_print(f"[prerender] {asset} x{scale} failed: {err!r}")
+        else:
+            self.cache.put_variant(asset, scale, tint, facing, fut.result(), interp=interp)
+        self.done += 1
+        self._report()
+
+    def _report(self):
+        if self.progress:
+            self.progress(self.done, self.total)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,145 @@
+import os, sys, json, signal, time
+from collections import Counter
+from pixie.debug import debug_print
+
+SUBSYSTEMS = {
+    "sprite.py":           "sprite",
+    "framepack.py":        "sprite",
+    "render.py":           "render",
+    "bufpool.py":          "render",
+    "framecache.py":       "render",
+    "prerender.py":        "render",
+    "shmcache.py":         "render",
+    "mask.py":             "render",
+    "overlay.py":          "render",
+    "positioner.py":       "positioner",
+    "workarea.py":         "positioner",
+    "pointer.py":          "pointer",
+    "behavior_manager.py": "behavior",
+    "interactions.py":     "behavior",
+    "spatial.py":          "behavior",
+    "timestep.py":         "behavior",
+    "tray.py":             "tray",
+}
+
+_PKG = os.path.dirname(os.path.abspath(__file__))
+
+def subsystem(filename):
+    if not filename.startswith(_PKG):
+        return None
+    rel = os.path.relpath(filename, _PKG)
+    if rel.startswith("behaviors" + os.sep):
+        return "behavior"
+    return SUBSYSTEMS.get(rel, "app")
+
+def _name(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    def __init__(self, path, interval=0.01, max_depth=64, clock=time.monotonic):
+        self.path = path
+        self.interval = interval
+        self.max_depth = max_depth
+        self.clock = clock
+        self.stacks = Counter()
+        self.samples = 0
+        self._labels = {}
+        self._cpu = 0.0
+        self._prev = None
+        self._started = None
+        self._elapsed = 0.0
+
+    def start(self):
+        self._prev = signal.signal(signal.SIGPROF, self._sample)
+        signal.siginterrupt(signal.SIGPROF, False)
+        self._cpu = time.thread_time()
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        self._started = self.clock()
+        debug_print(f"[profile] sampling every {self.interval * 1000:.1f} ms CPU -> {self.path}")
+        return self
+
+    def _sample(self, signum, frame):
+        cpu = time.thread_time()
+        ran, self._cpu = cpu - self._cpu, cpu
+        self.samples += 1
+        if ran < self.interval / 2:
+            self.stacks[("idle", ())] += 1
+            return
+        stack = []
+        label = None
+        labels = self._labels
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            stack.append(code)
+            if label is None:
+                label = labels.get(code, False)
+                if label is False:
+                    label = labels[code] = subsystem(code.co_filename)
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[(label or "other", tuple(stack))] += 1
+
+    def stop(self):
+        if self._started is None:
+            return
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._prev or signal.SIG_DFL)
+        self._elapsed = self.clock() - self._started
+        self._started = None
+
+    def summary(self):
+        by = Counter()
+        for (label, _stack), n in self.stacks.items():
+            by[label] += n
+        return dict(by.most_common())
+
+    def collapsed(self):
+        lines = []
+        for (label, stack), n in self.stacks.most_common():
+            lines.append(";".join([f"[{label}]"] + [_name(c) for c in stack]) + f" {n}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self):
+        frames, index = [], {}
+        def fid(key, entry):
+            i = index.get(key)
+            if i is None:
+                i = index[key] = len(frames)
+                frames.append(entry)
+            return i
+        samples, weights = [], []
+        for (label, stack), n in self.stacks.most_common():
+            ids = [fid(("label", label), {"name": f"[{label}]"})]
+            ids += [fid(c, {"name": c.co_name, "file": c.co_filename, "line": c.co_firstlineno}) for c in stack]
+            samples.append(ids)
+            weights.append(n * self.interval)
+        return {
+            "$schema":  "https://www.speedscope.app/file-format-schema.json",
+            "name":     "pixie",
+            "exporter": "pixie --profile-sample",
+            "shared":   {"frames": frames},
+            "profiles": [{
+                "type":       "sampled",
+                "name":       f"pixie main thread ({self.samples} samples, {self._elapsed:.1f}s wall)",
+                "unit":       "seconds",
+                "startValue": 0,
+                "endValue":   sum(weights),
+                "samples":    samples,
+                "weights":    weights,
+            }],
+        }
+
+    def write(self, path=None):
+        path = path or self.path
+        if path.endswith(".json"):
+            data = json.dumps(self.speedscope())
+        else:
+            data = self.collapsed()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        total = max(1, self.samples)
+        parts = ", ".join(f"{k} {100.0 * v / total:.1f}%" for k, v in self.summary().items())
+        print(f"pixie: {self.samples} profile samples -> {path} ({parts or 'no CPU time sampled'})", file=sys.stderr)
+        return path
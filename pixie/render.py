@@ -0,0 +1,137 @@
+import gi
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf, GLib
+
+from functools import lru_cache
+from .bufpool import BufferPool
+
+BUFFERS = BufferPool()
+
+INTERP = {
+    "nearest":  GdkPixbuf.InterpType.NEAREST,
+    "tiles":    GdkPixbuf.InterpType.TILES,
+    "bilinear": GdkPixbuf.InterpType.BILINEAR,
+    "hyper":    GdkPixbuf.InterpType.HYPER,
+}
+
+def integer_factor(factor: float) -> int:
+    k = round(factor)
+    return k if k >= 2 and abs(factor - k) < 1e-6 else 0
+
+def replicate(pixbuf: GdkPixbuf.Pixbuf, k: int) -> GdkPixbuf.Pixbuf:
+    w, h    = pixbuf.get_width(), pixbuf.get_height()
+    nch     = pixbuf.get_n_channels()
+    stride  = pixbuf.get_rowstride()
+    row_len = w * nch
+    data    = pixbuf.get_pixels()
+    if stride != row_len:
+        data = b"".join(data[y*stride:y*stride + row_len] for y in range(h))
+    wide = bytearray(len(data) * k)
+    step = nch * k
+    for r in range(k):
+        for c in range(nch):
+            wide[r*nch + c::step] = data[c::nch]
+    out_row = row_len * k
+    mv = memoryview(wide)
+    out = b"".join(mv[y*out_row:(y+1)*out_row] for y in range(h) for _ in range(k))
+    return GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(out), pixbuf.get_colorspace(),
+                                           pixbuf.get_has_alpha(), 8, w * k, h * k, out_row)
+
+def scale(pixbuf: GdkPixbuf.Pixbuf, factor: float, interp=GdkPixbuf.InterpType.BILINEAR) -> GdkPixbuf.Pixbuf:
+    if factor == 1.0:
+        return pixbuf
+    k = integer_factor(factor)
+    if k:
+        return replicate(pixbuf, k)
+    new_w = max(1, int(pixbuf.get_width()  * factor))
+    new_h = max(1, int(pixbuf.get_height() * factor))
+    return pixbuf.scale_simple(new_w, new_h, interp)
+
+def tint(pixbuf: GdkPixbuf.Pixbuf, rgb) -> GdkPixbuf.Pixbuf:
+    if not rgb:
+        return pixbuf
+    r_t, g_t, b_t = rgb
+    w, h      = pixbuf.get_width(), pixbuf.get_height()
+    stride    = pixbuf.get_rowstride()
+    nch       = pixbuf.get_n_channels()
+    bps       = pixbuf.get_bits_per_sample()
+    has_alpha = pixbuf.get_has_alpha()
+    cs        = pixbuf.get_colorspace()
+    data = bytearray(pixbuf.get_pixels())
+    for yy in range(h):
+        row_start = yy * stride
+        for xx in range(w):
+            idx = row_start + xx * nch
+            data[idx+0] = int(data[idx+0] * r_t)
+            data[idx+1] = int(data[idx+1] * g_t)
+            data[idx+2] = int(data[idx+2] * b_t)
+    return GdkPixbuf.Pixbuf.new_from_data(bytes(data), cs, has_alpha, bps, w, h, stride)
+
+def tint_and_scale(pixbuf: GdkPixbuf.Pixbuf, factor: float = 1.0, rgb=None,
+                   interp=GdkPixbuf.InterpType.BILINEAR) -> GdkPixbuf.Pixbuf:
+    if integer_factor(factor):
+        return scale(tint(pixbuf, rgb), factor)
+    return tint(scale(pixbuf, factor, interp), rgb)
+
+@lru_cache(maxsize=64)
+def _tint_table(f: float) -> bytes:
+    return bytes(int(i * f) for i in range(256))
+
+def _packed(pixbuf):
+    w, h    = pixbuf.get_width(), pixbuf.get_height()
+    nch     = pixbuf.get_n_channels()
+    stride  = pixbuf.get_rowstride()
+    row_len = w * nch
+    data    = pixbuf.get_pixels()
+    if stride != row_len:
+        mv = memoryview(data)
+        data = b"".join(mv[y*stride:y*stride + row_len] for y in range(h))
+    return data, w, h, nch
+
+def render_raw(pixbuf: GdkPixbuf.Pixbuf, factor: float = 1.0, rgb=None,
+               interp=GdkPixbuf.InterpType.BILINEAR, facing: int = 1, pool: BufferPool = None):
+    pool = pool or BUFFERS
+    k = integer_factor(factor)
+    if not k and factor != 1.0:
+        pixbuf = scale(pixbuf, factor, interp)
+    k = k or 1
+    data, w, h, nch = _packed(pixbuf)
+    n = len(data)
+    row_len = w * nch
+    taken = []
+    if rgb:
+        buf = pool.take(n)
+        taken.append(buf)
+        for c, f in enumerate(rgb):
+            buf[c:n:nch] = data[c:n:nch].translate(_tint_table(f))
+        if nch == 4:
+            buf[3:n:4] = data[3:n:4]
+        data = buf
+    rows = range(h)
+    if facing < 0:
+        buf = pool.take(n)
+        taken.append(buf)
+        rev = data[n-1::-1]
+        for c in range(nch):
+            buf[c:n:nch] = rev[nch-1-c::nch]
+        data = buf
+        rows = range(h - 1, -1, -1)
+    out_row = row_len * k
+    if k > 1:
+        wide = pool.take(n * k)
+        taken.append(wide)
+        step = nch * k
+        for c in range(nch):
+            col = data[c:n:nch]
+            for r in range(k):
+                wide[r*nch + c:n*k:step] = col
+        data = wide
+    if k > 1 or taken:
+        mv = memoryview(data)
+        out = b"".join(mv[y*out_row:(y+1)*out_row] for y in rows for _ in range(k))
+        mv.release()
+    else:
+        out = data
+    pool.give(*taken)
+    pool.frame()
+    return (w * k, h * k, out_row, pixbuf.get_has_alpha(), out)
@@ -0,0 +1,161 @@
+import os, struct, hashlib, atexit, tempfile
+from pixie.debug import debug_print
+from pixie import framepack
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAGIC   = b"PXSEG1\0\0"
+_HEADER = struct.Struct("<8sI")
+_RECORD = struct.Struct("<IIIIQQ")
+
+def shm_dir():
+    for d in ("/dev/shm", os.environ.get("XDG_RUNTIME_DIR")):
+        if d and os.path.isdir(d) and os.access(d, os.W_OK):
+            return d
+    return tempfile.gettempdir()
+
+def _glib_segment(path):
+    from gi.repository import GLib
+    whole = GLib.MappedFile.new(path, False).get_bytes()
+    return lambda off, length: GLib.Bytes.new_from_bytes(whole, off, length)
+
+def _size(data):
+    return data.get_size() if hasattr(data, "get_size") else len(data)
+
+def _buffer(data):
+    return data.get_data() if hasattr(data, "get_data") else data
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class SharedFrameCache:
+    def __init__(self, directory=None, prefix="pixie-frames", segment=_glib_segment):
+        self.dir = directory or shm_dir()
+        self.prefix = prefix
+        self._segment = segment
+        self._attached = {}
+        self._pid = os.getpid()
+        atexit.register(self.close)
+
+    @staticmethod
+    def available() -> bool:
+        return fcntl is not None
+
+    def key(self, asset, scale, tint, facing, extra=()):
+        try:
+            st = os.stat(asset)
+            stamp = (st.st_size, int(st.st_mtime))
+        except OSError:
+            stamp = framepack.stamp(asset) or (0, 0)
+        raw = repr((os.path.abspath(asset), stamp, float(scale), tint, int(facing), tuple(extra)))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+    def _path(self, key):
+        return os.path.join(self.dir, f"{self.prefix}-{key}.seg")
+
+    def _refs(self, key, update):
+        path = self._path(key) + ".refs"
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            data = os.read(fd, 65536).decode("ascii", "ignore")
+            pids = {int(p) for p in data.split() if p.isdigit()}
+            pids = {p for p in pids if _pid_alive(p)}
+            pids = update(pids)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, " ".join(str(p) for p in sorted(pids)).encode("ascii"))
+            if not pids:
+                for p in (self._path(key), path):
+                    try:
+                        os.unlink(p)
+                    except OSError:
+                        pass
+            return pids
+        finally:
+            os.close(fd)
+
+    def load(self, key):
+        if key in self._attached:
+            return self._attached[key]
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                table = self._table(f, os.fstat(f.fileno()).st_size)
+            if table is None:
+                return None
+            segment = self._segment(path)
+        except Exception as e:
+            debug_print(f"[shm] attach {key} failed: {e!r}")
+            return None
+        frames = [(w, h, stride, alpha, segment(off, length)) for w, h, stride, alpha, off, length in table]
+        try:
+            self._refs(key, lambda pids: pids | {self._pid})
+        except OSError:
+            return None
+        self._attached[key] = frames
+        debug_print(f"[shm] attached {key} ({len(frames)} frames)")
+        return frames
+
+    def _table(self, f, size):
+        head = f.read(_HEADER.size)
+        if len(head) < _HEADER.size:
+            return None
+        magic, count = _HEADER.unpack(head)
+        if magic != MAGIC:
+            return None
+        recs = f.read(_RECORD.size * count)
+        if len(recs) < _RECORD.size * count:
+            return None
+        table = []
+        for w, h, stride, alpha, off, length in _RECORD.iter_unpack(recs):
+            if off + length > size:
+                return None
+            table.append((w, h, stride, bool(alpha), off, length))
+        return table
+
+    def publish(self, key, raws):
+        if key in self._attached:
+            return
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        table = _HEADER.size + _RECORD.size * len(raws)
+        header = bytearray(_HEADER.pack(MAGIC, len(raws)))
+        off = table
+        for w, h, stride, alpha, data in raws:
+            header += _RECORD.pack(w, h, stride, int(alpha), off, _size(data))
+            off += _size(data)
+        tmp = f"{path}.{self._pid}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(header)
+                for raw in raws:
+                    f.write(_buffer(raw[4]))
+            os.replace(tmp, path)
+            self._refs(key, lambda pids: pids | {self._pid})
+        except OSError as e:
+            debug_print(f"[shm] publish {key} failed: {e!r}")
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+        self._attached[key] = list(raws)
+
+    def close(self):
+        for key in list(self._attached):
+            try:
+                self._refs(key, lambda pids: pids - {self._pid})
+            except OSError:
+                pass
+        self._attached.clear()
@@ -0,0 +1,114 @@
+import os, json, struct, time
+from pixie.debug import debug_print
+
+MAGIC   = b"PXSNAP1\0"
+VERSION = 1
+MAX_AGE_S = 7 * 24 * 3600
+
+def snapshot_path():
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(base, "pixie", "snapshot.bin")
+
+def _rng_state(rng):
+    version, internal, gauss = rng.getstate()
+    return [version, list(internal), gauss]
+
+def pet_state(win):
+    raw = None
+    asset = getattr(win, "_asset", None)
+    index = win.sprite.index if win.sprite else 0
+    if asset and win.sprite:
+        try:
+            raw = win.cache.raw(asset, index, win.facing)
+        except Exception as e:
+            debug_print(f"[snapshot] no frame for {asset}: {e!r}")
+    return {
+        "pos":    [win.pos_x, win.pos_y],
+        "facing": win.facing,
+        "bm":     win.bm.state(),
+        "rng":    _rng_state(win.bm.rng),
+        "asset":  asset,
+        "index":  index,
+        "place":  [win._offset[0], win._offset[1], win._sprite_size[0], win._sprite_size[1]],
+        "variants": [[a, f] for a, f in win.variants_in_use()],
+    }, raw
+
+def save(app, path=None):
+    path = path or snapshot_path()
+    pets, blobs = [], []
+    off = 0
+    for win in getattr(app, "pets", None) or [app.win]:
+        state, raw = pet_state(win)
+        if raw is not None:
+            w, h, stride, alpha, data = raw
+            state["frame"] = [w, h, stride, bool(alpha), off, len(data)]
+            blobs.append(bytes(data))
+            off += len(data)
+        pets.append(state)
+    win = app.win
+    header = {
+        "version":  VERSION,
+        "saved_at": time.time(),
+        "settings": {"scale": win.scale, "tint": list(win.tint) if win.tint else None, "interp": int(win.interp)},
+        "pets":     pets,
+    }
+    blob = json.dumps(header).encode("utf-8")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+            for data in blobs:
+                f.write(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        debug_print(f"[snapshot] save failed: {e!r}")
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        return False
+    debug_print(f"[snapshot] saved {len(pets)} pet(s) to {path}")
+    return True
+
+def load(path=None):
+    path = path or snapshot_path()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:len(MAGIC)] != MAGIC:
+            return None
+        pos = len(MAGIC)
+        (n,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        header = json.loads(data[pos:pos + n].decode("utf-8"))
+        pos += n
+    except (OSError, ValueError, struct.error) as e:
+        if not isinstance(e, FileNotFoundError):
+            debug_print(f"[snapshot] load failed: {e!r}")
+        return None
+    if header.get("version") != VERSION or time.time() - header.get("saved_at", 0) > MAX_AGE_S:
+        return None
+    for pet in header.get("pets", []):
+        frame = pet.pop("frame", None)
+        if frame:
+            w, h, stride, alpha, off, length = frame
+            pixels = data[pos + off:pos + off + length]
+            if len(pixels) == length:
+                pet["raw"] = (w, h, stride, alpha, pixels)
+    return header
+
+def matches(header, scale, tint, interp) -> bool:
+    s = header.get("settings", {})
+    return (s.get("scale") == scale and s.get("interp") == int(interp)
+            and (tuple(s["tint"]) if s.get("tint") else None) == tint)
+
+def restore_rng(rng, state):
+    try:
+        version, internal, gauss = state
+        rng.setstate((version, tuple(internal), gauss))
+    except (TypeError, ValueError):
+        pass
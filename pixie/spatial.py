@@ -0,0 +1,90 @@
+import math
+from collections import defaultdict
+
+class SpatialHash:
+    def __init__(self, cell: float = 96.0):
+        self.cell = float(cell)
+        self.pos = {}
+        self._where = {}
+        self._cells = defaultdict(set)
+
+    def __len__(self):
+        return len(self.pos)
+
+    def _key(self, x, y):
+        return int(x // self.cell), int(y // self.cell)
+
+    def update(self, item, x: float, y: float):
+        self.pos[item] = (x, y)
+        key = self._key(x, y)
+        old = self._where.get(item)
+        if old == key:
+            return
+        if old is not None:
+            bucket = self._cells[old]
+            bucket.discard(item)
+            if not bucket:
+                del self._cells[old]
+        self._cells[key].add(item)
+        self._where[item] = key
+
+    def remove(self, item):
+        key = self._where.pop(item, None)
+        self.pos.pop(item, None)
+        if key is not None:
+            bucket = self._cells.get(key)
+            if bucket is not None:
+                bucket.discard(item)
+                if not bucket:
+                    del self._cells[key]
+
+    def query(self, x: float, y: float, radius: float, exclude=None):
+        r2 = radius * radius
+        reach = int(math.ceil(radius / self.cell))
+        cx, cy = self._key(x, y)
+        out = []
+        for gx in range(cx - reach, cx + reach + 1):
+            for gy in range(cy - reach, cy + reach + 1):
+                bucket = self._cells.get((gx, gy))
+                if not bucket:
+                    continue
+                for item in bucket:
+                    if item == exclude:
+                        continue
+                    ox, oy = self.pos[item]
+                    d2 = (ox - x) ** 2 + (oy - y) ** 2
+                    if d2 <= r2:
+                        out.append((item, d2))
+        return out
+
+    def pairs(self, radius: float):
+        r2 = radius * radius
+        reach = int(math.ceil(radius / self.cell))
+        out = []
+        for (cx, cy), bucket in self._cells.items():
+            for gx in range(cx - reach, cx + reach + 1):
+                for gy in range(cy - reach, cy + reach + 1):
+                    if (gx, gy) < (cx, cy):
+                        continue
+                    other = bucket if (gx, gy) == (cx, cy) else self._cells.get((gx, gy))
+                    if not other:
+                        continue
+                    for a in bucket:
+                        ax, ay = self.pos[a]
+                        for b in other:
+                            if other is bucket and id(b) <= id(a):
+                                continue
+                            bx, by = self.pos[b]
+                            if (bx - ax) ** 2 + (by - ay) ** 2 <= r2:
+                                out.append((a, b))
+        return out
+
+def naive_pairs(pos: dict, radius: float):
+    r2 = radius * radius
+    items = list(pos.items())
+    out = []
+    for i, (a, (ax, ay)) in enumerate(items):
+        for b, (bx, by) in items[i + 1:]:
+            if (bx - ax) ** 2 + (by - ay) ** 2 <= r2:
+                out.append((a, b))
+    return out
@@ -1,9 +1,10 @@
-import os
+import os, time, threading
+from collections import OrderedDict
 from importlib import resources
 import gi
-gi.require_version("Gdk", "4.0")
 gi.require_version("GdkPixbuf", "2.0")
-from gi.repository import GdkPixbuf, Gdk, GLib
+from gi.repository import GdkPixbuf, GLib
+from . import framepack
 
 def _resolve_asset(path):
     if os.path.isabs(path) and os.path.exists(path):
@@ -46,58 +47,311 @@ def _resolve_asset(path):
         pass
     return path
 
+def gif_frame_delays(filename):
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    if data[:6] not in (b"GIF87a", b"GIF89a"):
+        return []
+    delays = []
+    try:
+        flags = data[10]
+        pos = 13
+        if flags & 0x80:
+            pos += 3 * (2 << (flags & 7))
+        delay = 0
+        while pos < len(data):
+            block = data[pos]
+            if block == 0x3B:
+                break
+            if block == 0x21:
+                label = data[pos + 1]
+                pos += 2
+                if label == 0xF9 and data[pos] == 4:
+                    delay = (data[pos + 2] | data[pos + 3] << 8) * 10
+                while data[pos]:
+                    pos += data[pos] + 1
+                pos += 1
+            elif block == 0x2C:
+                flags = data[pos + 9]
+                pos += 10
+                if flags & 0x80:
+                    pos += 3 * (2 << (flags & 7))
+                pos += 1
+                while data[pos]:
+                    pos += data[pos] + 1
+                pos += 1
+                delays.append(delay)
+                delay = 0
+            else:
+                break
+    except IndexError:
+        pass
+    return delays
+
+def decode_frames(filename):
+    filename = _resolve_asset(filename)
+    if not str(filename).lower().endswith(".gif"):
+        return [(GdkPixbuf.Pixbuf.new_from_file(filename), 0)]
+    anim = GdkPixbuf.PixbufAnimation.new_from_file(filename)
+    if anim.is_static_image():
+        return [(anim.get_static_image(), 0)]
+    count = len(gif_frame_delays(filename)) or 1
+    tv = GLib.TimeVal()
+    tv.tv_sec, tv.tv_usec = 0, 0
+    it = anim.get_iter(tv)
+    frames = []
+    for _ in range(count):
+        delay = it.get_delay_time()
+        frames.append((it.get_pixbuf().copy(), delay if delay > 0 else 80))
+        if delay < 0:
+            break
+        tv.add(delay * 1000)
+        it.advance(tv)
+    return frames
+
+class Frames(list):
+    offset = (0, 0)
+    full   = None
+
+def content_box(pixbuf):
+    w, h = pixbuf.get_width(), pixbuf.get_height()
+    if not pixbuf.get_has_alpha():
+        return (0, 0, w, h)
+    stride = pixbuf.get_rowstride()
+    nch    = pixbuf.get_n_channels()
+    data   = pixbuf.get_pixels()
+    x0, y0, x1, y1 = w, h, 0, 0
+    for y in range(h):
+        start = y * stride + nch - 1
+        alpha = data[start:start + w * nch:nch]
+        left = w - len(alpha.lstrip(b"\0"))
+        if left == w:
+            continue
+        x0, x1 = min(x0, left), max(x1, len(alpha.rstrip(b"\0")))
+        y0, y1 = min(y0, y), y + 1
+    return (x0, y0, x1, y1) if x1 > x0 else None
+
+def _sub(pixbuf, x, y, w, h):
+    nch    = pixbuf.get_n_channels()
+    stride = pixbuf.get_rowstride()
+    mv     = memoryview(pixbuf.get_pixels())
+    rows   = b"".join(mv[(y + r) * stride + x * nch:(y + r) * stride + (x + w) * nch] for r in range(h))
+    return GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(rows), pixbuf.get_colorspace(),
+                                           pixbuf.get_has_alpha(), 8, w, h, w * nch)
+
+def crop_frames(frames):
+    out = Frames(frames)
+    if not frames:
+        return out
+    w, h = frames[0][0].get_width(), frames[0][0].get_height()
+    out.full = (w, h)
+    box = None
+    for pix, _ in frames:
+        if (pix.get_width(), pix.get_height()) != (w, h):
+            return out
+        b = content_box(pix)
+        if b is not None:
+            box = b if box is None else (min(box[0], b[0]), min(box[1], b[1]), max(box[2], b[2]), max(box[3], b[3]))
+    if box is None or box == (0, 0, w, h):
+        return out
+    x0, y0, x1, y1 = box
+    out[:] = [(_sub(pix, x0, y0, x1 - x0, y1 - y0), delay) for pix, delay in frames]
+    out.offset = (x0, y0)
+    return out
+
+STREAM_MIN_FRAMES = 48
+STREAM_MIN_BYTES  = 8 << 20
+STREAM_BUDGET     = 4 << 20
+STREAM_LOOKAHEAD  = 4
+
+def gif_size(filename):
+    try:
+        with open(filename, "rb") as f:
+            head = f.read(10)
+    except OSError:
+        return 0, 0
+    if len(head) < 10:
+        return 0, 0
+    return head[6] | head[7] << 8, head[8] | head[9] << 8
+
+class StreamingFrames:
+    offset = (0, 0)
+
+    def __init__(self, filename, delays, budget=STREAM_BUDGET, lookahead=STREAM_LOOKAHEAD, pool=None):
+        self.filename = filename
+        self.delays = [d if d >= 20 else 100 for d in delays]
+        self.budget = budget
+        self.lookahead = lookahead
+        self.pool = pool
+        self._anim = GdkPixbuf.PixbufAnimation.new_from_file(filename)
+        self.full = (self._anim.get_width(), self._anim.get_height())
+        self._lock = threading.Lock()
+        self._frames = OrderedDict()
+        self._pending = set()
+        self._bytes = 0
+        self._starts = []
+        t = 0
+        for d in self.delays:
+            self._starts.append(t)
+            t += d
+        self._it = None
+        self._tv = None
+        self._cursor = -1
+
+    def __len__(self):
+        return len(self.delays)
+
+    def __getitem__(self, index):
+        pix = self._frames.get(index)
+        if pix is None:
+            pix = self._store(index, self._decode(index))
+        else:
+            self._frames.move_to_end(index)
+        self._prefetch(index)
+        self._evict(index)
+        return pix, self.delays[index]
+
+    def _decode(self, index):
+        with self._lock:
+            target = self._starts[index] + self.delays[index] // 2
+            if self._it is None or index < self._cursor:
+                self._tv = GLib.TimeVal()
+                self._tv.tv_sec, self._tv.tv_usec = 0, 0
+                self._it = self._anim.get_iter(self._tv)
+                elapsed = 0
+            else:
+                elapsed = self._starts[self._cursor] + self.delays[self._cursor] // 2
+            self._tv.add((target - elapsed) * 1000)
+            self._it.advance(self._tv)
+            self._cursor = index
+            return self._it.get_pixbuf().copy()
+
+    def _store(self, index, pix):
+        self._pending.discard(index)
+        if index in self._frames:
+            return self._frames[index]
+        self._frames[index] = pix
+        self._bytes += pix.get_rowstride() * pix.get_height()
+        return pix
+
+    def _prefetch(self, index):
+        if self.pool is None:
+            return
+        for k in range(1, self.lookahead + 1):
+            j = (index + k) % len(self)
+            if j in self._frames or j in self._pending:
+                continue
+            self._pending.add(j)
+            self.pool.submit(self._decode, j, key=("stream", self.filename, j), lane="stream",
+                             callback=lambda pix, j=j: self._store(j, pix))
+
+    def _evict(self, current):
+        keep = {(current + k) % len(self) for k in range(self.lookahead + 1)}
+        for index in list(self._frames):
+            if self._bytes <= self.budget:
+                break
+            if index in keep:
+                continue
+            pix = self._frames.pop(index)
+            self._bytes -= pix.get_rowstride() * pix.get_height()
+
+def open_frames(filename, pool=None):
+    filename = _resolve_asset(filename)
+    packed = framepack.lookup(filename)
+    if packed is not None:
+        return packed
+    if str(filename).lower().endswith(".gif"):
+        delays = gif_frame_delays(filename)
+        w, h = gif_size(filename)
+        if len(delays) >= STREAM_MIN_FRAMES or len(delays) * w * h * 4 >= STREAM_MIN_BYTES:
+            return StreamingFrames(filename, delays, pool=pool)
+    return crop_frames(decode_frames(filename))
+
+def is_streamed(frames) -> bool:
+    return isinstance(frames, StreamingFrames)
+
+def _frame_delay(frames, index):
+    delays = getattr(frames, "delays", None)
+    return delays[index] if delays is not None else frames[index][1]
+
 class AnimatedSprite:
-    def __init__(self, filename, fps=12):
+    def __init__(self, filename, fps=12, frames=None, autoplay=True, clock=time.monotonic):
         self._stopped = False
         self._tick = 0
-        filename = _resolve_asset(filename)
-        self._is_gif = str(filename).lower().endswith(".gif")
-        if self._is_gif:
-            self._anim = GdkPixbuf.PixbufAnimation.new_from_file(filename)
-            self._iter = self._anim.get_iter(None)
-            self._paint = Gdk.Texture.new_for_pixbuf(self._iter.get_pixbuf())
+        self.index = 0
+        self.min_delay = 1000.0 / fps if fps else 0.0
+        self.clock = clock
+        self._frames = frames if frames is not None else open_frames(filename)
+        self._since = clock()
+        if autoplay:
             self._schedule_next()
-        else:
-            pix = GdkPixbuf.Pixbuf.new_from_file(filename)
-            self._pixframes = [pix]
-            self._index = 0
-            self._paint = Gdk.Texture.new_for_pixbuf(self._pixframes[0])
 
-    def _schedule_next(self):
-        if self._stopped or not self._is_gif:
-            return
-        delay = self._iter.get_delay_time()
+    def delay(self) -> int:
+        delay = _frame_delay(self._frames, self.index)
         if delay <= 0:
             delay = 80
+        return int(max(delay, self.min_delay))
+
+    def _schedule_next(self):
+        if self._stopped or len(self._frames) < 2:
+            return
         if self._tick:
             try:
                 GLib.source_remove(self._tick)
             except Exception:
                 pass
             self._tick = 0
-        self._tick = GLib.timeout_add(delay, self._advance)
+        self._tick = GLib.timeout_add(self.delay(), self._advance)
 
     def _advance(self):
-        if self._stopped or not self._is_gif:
+        self._tick = 0
+        if self._stopped:
             return False
-        try:
-            self._iter.advance(None)
-        except Exception:
-            pass
+        self.index = (self.index + 1) % len(self._frames)
+        self._since = self.clock()
         self._schedule_next()
         return False
 
-    def get_pixbuf(self):
-        if self._is_gif:
-            return self._iter.get_pixbuf()
-        return self._pixframes[self._index]
+    def time_to_next(self, now=None):
+        if len(self._frames) < 2:
+            return None
+        now = self.clock() if now is None else now
+        return max(0.0, self.delay() - (now - self._since) * 1000.0)
 
-    def stop(self):
-        self._stopped = True
-        tid = getattr(self, "_tick", 0)
-        if tid:
+    def catch_up(self, now=None) -> bool:
+        if len(self._frames) < 2:
+            return False
+        now = self.clock() if now is None else now
+        if now - self._since > 60.0:
+            self._since = now
+            self.index = (self.index + 1) % len(self._frames)
+            return True
+        moved = False
+        while (now - self._since) * 1000.0 >= self.delay():
+            self._since += self.delay() / 1000.0
+            self.index = (self.index + 1) % len(self._frames)
+            moved = True
+        return moved
+
+    def play(self):
+        self._stopped = False
+        self._since = self.clock()
+        self._schedule_next()
+
+    def pause(self):
+        if self._tick:
             try:
-                GLib.source_remove(tid)
+                GLib.source_remove(self._tick)
             except Exception:
                 pass
-            self._tick = 0
\ No newline at end of file
+            self._tick = 0
+
+    def get_pixbuf(self):
+        return self._frames[self.index][0]
+
+    def stop(self):
+        self._stopped = True
+        self.pause()
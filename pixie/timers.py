@@ -0,0 +1,142 @@
+import heapq, itertools, math, time
+from pixie.debug import debug_print
+
+COARSE_EARLY_S = 0.25
+COARSE_LATE_S  = 0.75
+
+def _glib_arm(ms, fn, coarse=False):
+    from gi.repository import GLib
+    if coarse:
+        return GLib.timeout_add_seconds(ms // 1000, fn)
+    return GLib.timeout_add(ms, fn)
+
+def _glib_disarm(source):
+    from gi.repository import GLib
+    GLib.source_remove(source)
+
+class TimerService:
+    def __init__(self, clock=time.monotonic, arm=_glib_arm, disarm=_glib_disarm):
+        self.clock = clock
+        self._arm = arm
+        self._disarm = disarm
+        self._heap = []
+        self._timers = {}
+        self._seq = itertools.count()
+        self._source = 0
+        self._armed_at = None
+        self._coarse = False
+        self.wakeups = 0
+        self.fired = 0
+
+    def schedule(self, key, delay, fn, slack=0.0):
+        return self.schedule_at(key, self.clock() + delay, fn, slack)
+
+    def schedule_at(self, key, when, fn, slack=0.0):
+        entry = self._timers.get(key)
+        if entry is not None and when >= entry[0] and when + slack >= entry[0] + entry[4]:
+            entry[0], entry[3], entry[4] = when, fn, slack
+            return when
+        self._drop(key)
+        entry = [when, next(self._seq), key, fn, slack]
+        self._timers[key] = entry
+        heapq.heappush(self._heap, (when + slack, entry[1], entry))
+        self._rearm()
+        return when
+
+    def reschedule(self, key, delay) -> bool:
+        entry = self._timers.get(key)
+        if entry is None:
+            return False
+        self.schedule_at(key, self.clock() + delay, entry[3], entry[4])
+        return True
+
+    def cancel(self, key) -> bool:
+        if not self._drop(key):
+            return False
+        self._rearm()
+        return True
+
+    def clear(self):
+        for key in list(self._timers):
+            self._drop(key)
+        self._rearm()
+
+    def deadline(self, key):
+        entry = self._timers.get(key)
+        return entry[0] if entry else None
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def __len__(self):
+        return len(self._timers)
+
+    def _drop(self, key) -> bool:
+        entry = self._timers.pop(key, None)
+        if entry is None:
+            return False
+        entry[3] = None
+        return True
+
+    def _settle(self):
+        while self._heap:
+            due, seq, entry = self._heap[0]
+            if entry[3] is None:
+                heapq.heappop(self._heap)
+            elif due != entry[0] + entry[4]:
+                heapq.heapreplace(self._heap, (entry[0] + entry[4], seq, entry))
+            else:
+                return entry
+        return None
+
+    def _rearm(self):
+        top = self._settle()
+        target = self._heap[0][0] if top else None
+        if target == self._armed_at and (self._source or target is None):
+            return
+        if self._source:
+            self._disarm(self._source)
+            self._source = 0
+        self._armed_at = target
+        if target is not None:
+            now = self.clock()
+            secs = max(1, math.ceil(top[0] - now + COARSE_EARLY_S - 1e-6))
+            self._coarse = secs + COARSE_LATE_S <= target - now
+            if self._coarse:
+                ms = secs * 1000
+            else:
+                ms = max(0, math.ceil((target - now) * 1000.0 - 1e-6))
+            self._source = self._arm(ms, self._fire, self._coarse)
+
+    def _fire(self):
+        self._source = 0
+        self._armed_at = None
+        self.wakeups += 1
+        now = self.clock()
+        last = next(self._seq)
+        while True:
+            entry = self._settle()
+            if entry is None or entry[0] > now or entry[1] > last:
+                break
+            heapq.heappop(self._heap)
+            when, _, key, fn, slack = entry
+            del self._timers[key]
+            self.fired += 1
+            try:
+                again = fn()
+            except Exception as e:
+                debug_print(f"[timers] {key!r} failed: {e!r}")
+                again = None
+            if isinstance(again, (int, float)) and not isinstance(again, bool) and key not in self._timers:
+                self.schedule_at(key, now + again, fn, slack)
+        self._rearm()
+        return False
+
+    def stats(self):
+        return {
+            "live":    len(self._timers),
+            "armed":   bool(self._source),
+            "coarse":  bool(self._source) and self._coarse,
+            "wakeups": self.wakeups,
+            "fired":   self.fired,
+        }
@@ -0,0 +1,42 @@
+import time
+
+class FixedStep:
+    def __init__(self, dt: float, max_steps: int = 32, slack: float = 0.001, clock=time.monotonic):
+        self.dt = dt
+        self.max_steps = max_steps
+        self.slack = slack
+        self.clock = clock
+        self._last = None
+        self._acc = 0.0
+
+    def reset(self):
+        self._last = self.clock()
+        self._acc = 0.0
+
+    def set_dt(self, dt: float):
+        self.dt = dt
+        self._acc = min(self._acc, dt)
+
+    def retime(self, dt: float):
+        self.dt = dt
+        self._acc = min(self._acc, self.max_steps * dt)
+
+    def refund(self, steps: int):
+        self._acc += steps * self.dt
+
+    def advance(self) -> int:
+        now = self.clock()
+        if self._last is None:
+            self._last = now
+        self._acc += max(0.0, now - self._last)
+        self._last = now
+        steps = int((self._acc + self.slack) // self.dt)
+        if steps > self.max_steps:
+            self._acc = 0.0
+            return self.max_steps
+        self._acc -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        return max(0.0, min(1.0, self._acc / self.dt))
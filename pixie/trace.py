@@ -0,0 +1,226 @@
+import sys, json, time, random, struct
+from collections import defaultdict, deque
+
+MAGIC = b"PXTRACE1"
+MODES  = ("walk", "sit", "run", "idle", "attack", "happy")
+PHASES = ("update", "position", "render", "input")
+
+EV_MOTION, EV_LEAVE, EV_SCROLL, EV_CLICK, EV_RNG, EV_MODE, EV_STEP, EV_POINTER, EV_PHASE = range(1, 10)
+
+_REC = struct.Struct("<BI")
+_PAYLOAD = {
+    EV_MOTION:  struct.Struct("<ff"),
+    EV_LEAVE:   struct.Struct("<"),
+    EV_SCROLL:  struct.Struct("<f"),
+    EV_CLICK:   struct.Struct("<"),
+    EV_RNG:     struct.Struct("<d"),
+    EV_MODE:    struct.Struct("<B"),
+    EV_STEP:    struct.Struct("<ff"),
+    EV_POINTER: struct.Struct("<Bii"),
+    EV_PHASE:   struct.Struct("<BI"),
+}
+_NAMES = {EV_MOTION: "motion", EV_LEAVE: "leave", EV_SCROLL: "scroll", EV_CLICK: "click"}
+
+class TracedRandom(random.Random):
+    sink = None
+
+    def random(self):
+        v = super().random()
+        if self.sink is not None:
+            self.sink(v)
+        return v
+
+class ReplayRandom(random.Random):
+    def __init__(self, draws):
+        super().__init__(0)
+        self._draws = deque(draws)
+        self.misses = 0
+
+    def random(self):
+        if self._draws:
+            return self._draws.popleft()
+        self.misses += 1
+        return super().random()
+
+class TraceRecorder:
+    def __init__(self, path, header: dict, clock=time.perf_counter):
+        self.path = path
+        self.clock = clock
+        self._f = open(path, "wb", buffering=1 << 16)
+        blob = json.dumps(header).encode("utf-8")
+        self._f.write(MAGIC + struct.pack("<I", len(blob)) + blob)
+        self._start = clock()
+        self._last_us = 0
+        self.count = 0
+
+    def _emit(self, kind, *values):
+        if self._f is None:
+            return
+        t_us = round((self.clock() - self._start) * 1e6)
+        dt = max(0, min(0xFFFFFFFF, t_us - self._last_us))
+        self._last_us += dt
+        self._f.write(_REC.pack(kind, dt) + _PAYLOAD[kind].pack(*values))
+        self.count += 1
+
+    def motion(self, x, y):
+        self._emit(EV_MOTION, x, y)
+
+    def leave(self):
+        self._emit(EV_LEAVE)
+
+    def scroll(self, dy):
+        self._emit(EV_SCROLL, dy)
+
+    def click(self):
+        self._emit(EV_CLICK)
+
+    def rng(self, value):
+        self._emit(EV_RNG, value)
+
+    def mode(self, name):
+        self._emit(EV_MODE, MODES.index(name))
+
+    def step(self, x, y):
+        self._emit(EV_STEP, x, y)
+
+    def pointer(self, pos):
+        if pos is None:
+            self._emit(EV_POINTER, 0, 0, 0)
+        else:
+            self._emit(EV_POINTER, 1, int(pos[0]), int(pos[1]))
+
+    def phase(self, name, seconds):
+        self._emit(EV_PHASE, PHASES.index(name), max(0, int(seconds * 1e6)))
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+def read_trace(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path}: not a pixie trace")
+    pos = len(MAGIC)
+    (n,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    header = json.loads(data[pos:pos + n].decode("utf-8"))
+    pos += n
+    records = []
+    t_us = 0
+    while pos + _REC.size <= len(data):
+        kind, dt = _REC.unpack_from(data, pos)
+        pos += _REC.size
+        payload = _PAYLOAD.get(kind)
+        if payload is None or pos + payload.size > len(data):
+            break
+        values = payload.unpack_from(data, pos)
+        pos += payload.size
+        t_us += dt
+        records.append((t_us, kind, values))
+    return header, records
+
+def _stats(samples):
+    if not samples:
+        return None
+    s = sorted(samples)
+    return {
+        "count":   len(s),
+        "mean_us": sum(s) / len(s),
+        "p95_us":  s[min(len(s) - 1, int(len(s) * 0.95))],
+        "max_us":  s[-1],
+    }
+
+def replay(path, render=True):
+    from . import pointer
+    from .behavior_manager import BehaviorManager
+
+    header, records = read_trace(path)
+    now = [0.0]
+    rng = ReplayRandom(v[0] for _, k, v in records if k == EV_RNG)
+    samples = deque((v[1], v[2]) if v[0] else None for _, k, v in records if k == EV_POINTER)
+    pointer._backends = (lambda: samples.popleft() if samples else None,)
+    pointer.install_sampler(None)
+
+    bm = BehaviorManager(header["width"], header["height"], scale=header.get("scale", 1.0),
+                         clock=lambda: now[0], rng=random.Random(0))
+    if header.get("area"):
+        bm.set_area(*header["area"])
+    bm.restore(header.get("bm", {}))
+    bm.set_rng(rng)
+    x, y = header.get("pos", (0.0, 0.0))
+    facing = header.get("facing", 1)
+
+    cache = None
+    if render:
+        try:
+            from .framecache import FrameCache
+            from .sprite import _resolve_asset
+            tint = header.get("tint")
+            cache = FrameCache(header.get("scale", 1.0), tuple(tint) if tint else None)
+        except Exception as e:
+            print(f"replay: render phase disabled ({e!r})", file=sys.stderr)
+
+    replayed, recorded = defaultdict(list), defaultdict(list)
+    events = defaultdict(int)
+    divergences = forced = 0
+    frame = 0
+    for t_us, kind, values in records:
+        now[0] = t_us / 1e6
+        if kind == EV_STEP:
+            sx, sy = values
+            if abs(sx - x) > 0.5 or abs(sy - y) > 0.5:
+                divergences += 1
+                x, y = sx, sy
+            t0 = time.perf_counter()
+            x, y, facing = bm.update(x, y)
+            replayed["update"].append((time.perf_counter() - t0) * 1e6)
+        elif kind == EV_MODE:
+            if bm.mode() != MODES[values[0]]:
+                bm.switch(MODES[values[0]])
+                forced += 1
+        elif kind == EV_PHASE:
+            name = PHASES[values[0]]
+            recorded[name].append(values[1])
+            if name == "render" and cache is not None:
+                asset = _resolve_asset(bm.get_asset())
+                t0 = time.perf_counter()
+                cache.texture(asset, frame % len(cache.frames(asset)), facing)
+                replayed["render"].append((time.perf_counter() - t0) * 1e6)
+                frame += 1
+        elif kind in _NAMES:
+            events[_NAMES[kind]] += 1
+
+    return {
+        "trace":       path,
+        "duration_s":  records[-1][0] / 1e6 if records else 0.0,
+        "records":     len(records),
+        "events":      dict(events),
+        "divergences": divergences,
+        "mode_switches_from_input": forced,
+        "rng_misses":  rng.misses,
+        "recorded":    {k: _stats(v) for k, v in recorded.items()},
+        "replayed":    {k: _stats(v) for k, v in replayed.items()},
+    }
+
+def main(argv=None) -> int:
+    import argparse
+    p = argparse.ArgumentParser(prog="pixie replay")
+    p.add_argument("trace")
+    p.add_argument("--headless", action="store_true", help="replay without a display (the only mode supported)")
+    p.add_argument("--no-render", action="store_true", help="skip the render phase")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = p.parse_args(argv)
+    report = replay(args.trace, render=not args.no_render)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{report['trace']}: {report['records']} records over {report['duration_s']:.1f}s")
+    print(f"events: {report['events']}  divergences: {report['divergences']}  rng misses: {report['rng_misses']}")
+    for phase in PHASES:
+        for label in ("recorded", "replayed"):
+            st = report[label].get(phase)
+            if st:
+                print(f"  {phase:<9} {label:<9} n={st['count']:<7} mean={st['mean_us']:.1f}us p95={st['p95_us']:.1f}us max={st['max_us']:.1f}us")
+    return 0
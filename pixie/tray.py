@@ -31,7 +31,7 @@ class Tray:
             debug_print(f"[tray] start failed: {e!r}")
             return False
 
-    def stop(self):
+    def stop(self, timeout=1.0):
         try:
             if os.name != "nt":
                 return
@@ -42,6 +42,8 @@ class Tray:
             else:
                 if hasattr(self, "_hwnd") and self._hwnd:
                     ctypes.windll.user32.PostMessageW(self._hwnd, 0x0010, 0, 0)
+            if self._thread and self._thread is not threading.current_thread():
+                self._thread.join(timeout)
         except Exception as e:
             debug_print(f"[tray] stop error: {e!r}")
 
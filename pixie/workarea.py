@@ -0,0 +1,165 @@
+import os, ctypes
+from pixie.debug import debug_print
+
+SPI_GETWORKAREA = 0x0030
+_X11_WATCHED = ("_NET_WORKAREA", "_NET_CURRENT_DESKTOP", "_NET_CLIENT_LIST")
+
+def intersect(a, b):
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return (x0, y0, x1 - x0, y1 - y0)
+
+def _win_workarea():
+    if os.name != "nt":
+        return None
+    from ctypes import wintypes
+    rc = wintypes.RECT()
+    if not ctypes.windll.user32.SystemParametersInfoW(SPI_GETWORKAREA, 0, ctypes.byref(rc), 0):
+        return None
+    return (rc.left, rc.top, rc.right - rc.left, rc.bottom - rc.top)
+
+def _x11_property(dsp, win, name):
+    from Xlib import X
+    prop = win.get_full_property(dsp.intern_atom(name), X.AnyPropertyType)
+    return list(prop.value) if prop is not None else None
+
+def _x11_struts(dsp, root, monitor):
+    x, y, w, h = monitor
+    sw, sh = dsp.screen().width_in_pixels, dsp.screen().height_in_pixels
+    left = top = 0
+    right, bottom = sw, sh
+    for xid in _x11_property(dsp, root, "_NET_CLIENT_LIST") or ():
+        try:
+            win = dsp.create_resource_object("window", xid)
+            strut = _x11_property(dsp, win, "_NET_WM_STRUT_PARTIAL") or _x11_property(dsp, win, "_NET_WM_STRUT")
+        except Exception:
+            continue
+        if not strut or len(strut) < 4:
+            continue
+        left   = max(left, strut[0])
+        right  = min(right, sw - strut[1])
+        top    = max(top, strut[2])
+        bottom = min(bottom, sh - strut[3])
+    return intersect(monitor, (left, top, right - left, bottom - top))
+
+def _x11_workarea(dsp, monitor):
+    root = dsp.screen().root
+    area = _x11_property(dsp, root, "_NET_WORKAREA")
+    if area and len(area) >= 4:
+        desk = (_x11_property(dsp, root, "_NET_CURRENT_DESKTOP") or [0])[0]
+        i = 4 * desk if 4 * desk + 3 < len(area) else 0
+        return intersect(monitor, tuple(area[i:i + 4]))
+    return _x11_struts(dsp, root, monitor)
+
+class WorkArea:
+    def __init__(self, monitor, display=None):
+        self.monitor = tuple(monitor)
+        self.rect = self.monitor
+        self.listeners = []
+        self._display = display
+        self._xdpy = None
+        self._watch = 0
+        self._monitors_id = 0
+        self._atoms = set()
+        self.refreshes = 0
+
+    def subscribe(self, fn):
+        self.listeners.append(fn)
+        fn(self.rect)
+
+    def start(self):
+        if os.name != "nt" and not os.environ.get("WAYLAND_DISPLAY"):
+            self._start_x11()
+        if self._display is not None and not self._monitors_id:
+            try:
+                self._monitors_id = self._display.get_monitors().connect("items-changed", self._on_monitors)
+            except Exception:
+                pass
+        self.refresh()
+        return self
+
+    def _start_x11(self):
+        try:
+            from Xlib import X
+            from gi.repository import GLib
+            from pixie import pointer
+            self._xdpy = pointer.x11_display()
+            root = self._xdpy.screen().root
+            root.change_attributes(event_mask=X.PropertyChangeMask)
+            self._atoms = {self._xdpy.intern_atom(a) for a in _X11_WATCHED}
+            self._xdpy.flush()
+            self._watch = GLib.io_add_watch(self._xdpy.fileno(), GLib.PRIORITY_LOW, GLib.IO_IN, self._on_x11)
+        except Exception as e:
+            debug_print(f"[workarea] x11 watch unavailable: {e!r}")
+            self._xdpy = None
+
+    def _on_x11(self, *_):
+        from Xlib import X
+        changed = False
+        try:
+            while self._xdpy.pending_events():
+                ev = self._xdpy.next_event()
+                if ev.type == X.PropertyNotify and ev.atom in self._atoms:
+                    changed = True
+        except Exception as e:
+            debug_print(f"[workarea] x11 watch lost: {e!r}")
+            self._watch = 0
+            return False
+        if changed:
+            self.refresh()
+        return True
+
+    def _on_monitors(self, *_):
+        try:
+            mons = self._display.get_monitors()
+            g = mons.get_item(0).get_geometry()
+            self.monitor = (g.x, g.y, g.width, g.height)
+        except Exception:
+            pass
+        self.refresh()
+
+    def read(self):
+        area = None
+        try:
+            if self._xdpy is not None:
+                area = _x11_workarea(self._xdpy, self.monitor)
+            else:
+                area = _win_workarea()
+                if area is not None:
+                    area = intersect(self.monitor, area)
+        except Exception as e:
+            debug_print(f"[workarea] read failed: {e!r}")
+        return area or self.monitor
+
+    def refresh(self) -> bool:
+        rect = self.read()
+        self.refreshes += 1
+        if rect == self.rect:
+            return False
+        self.rect = rect
+        debug_print(f"[workarea] {rect}")
+        for fn in self.listeners:
+            fn(rect)
+        return True
+
+    def stop(self):
+        if self._watch:
+            from gi.repository import GLib
+            GLib.source_remove(self._watch)
+            self._watch = 0
+        if self._monitors_id:
+            try:
+                self._display.get_monitors().disconnect(self._monitors_id)
+            except Exception:
+                pass
+            self._monitors_id = 0
+        if self._xdpy is not None:
+            try:
+                from Xlib import X
+                self._xdpy.screen().root.change_attributes(event_mask=X.NoEventMask)
+                self._xdpy.flush()
+            except Exception:
+                pass
+            self._xdpy = None
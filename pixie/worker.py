@@ -0,0 +1,146 @@
+import threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pixie.debug import debug_print
+
+def _idle_deliver(fn):
+    from gi.repository import GLib
+    GLib.idle_add(fn)
+
+class Job:
+    def __init__(self, key=None, callback=None):
+        self.key = key
+        self.callback = callback
+        self.cancelled = False
+        self.future = None
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self) -> bool:
+        return self.cancelled or (self.future is not None and self.future.done())
+
+class WorkerPool:
+    def __init__(self, workers: int = 2, deliver=_idle_deliver):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pixie-io")
+        self._lanes = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._deliver = deliver
+        self._closed = False
+
+    def _lane(self, name):
+        ex = self._lanes.get(name)
+        if ex is None:
+            ex = self._lanes[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"pixie-{name}")
+        return ex
+
+    def submit(self, fn, *args, callback=None, key=None, lane=None) -> Job:
+        job = Job(key, callback)
+        if self._closed:
+            job.cancelled = True
+            return job
+        if key is not None:
+            with self._lock:
+                prev = self._pending.get(key)
+                self._pending[key] = job
+            if prev is not None:
+                prev.cancel()
+        executor = self._lane(lane) if lane else self._pool
+        job.future = executor.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job, fn, args):
+        if job.cancelled:
+            return
+        try:
+            result, err = fn(*args), None
+        except Exception as e:
+            result, err = None, e
+        if job.cancelled or self._closed:
+            return
+        self._deliver(lambda: self._finish(job, result, err))
+
+    def _finish(self, job, result, err):
+        if job.key is not None:
+            with self._lock:
+                if self._pending.get(job.key) is job:
+                    del self._pending[job.key]
+        if job.cancelled or self._closed:
+            return False
+        if err is not None:
+            debug_print(f"[worker] job {job.key or '?'} failed: {err!r}")
+            return False
+        if job.callback is not None:
+            job.callback(result)
+        return False
+
+    def shutdown(self, wait=False):
+        self._closed = True
+        for ex in (self._pool, *self._lanes.values()):
+            ex.shutdown(wait=wait, cancel_futures=True)
+
+class LagMonitor:
+    def __init__(self, interval_ms: int = 100, report_every: float = 10.0, clock=time.monotonic):
+        self.interval_ms = interval_ms
+        self.report_every = report_every
+        self.clock = clock
+        self._id = 0
+        self._until = None
+        self._expected = 0.0
+        self._last_report = 0.0
+        self.reset()
+
+    def reset(self):
+        self.samples = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def start(self, hold=None):
+        now = self.clock()
+        self._until = None if hold is None else max(self._until or 0.0, now + hold)
+        if self._id:
+            return
+        from gi.repository import GLib
+        self._expected = now + self.interval_ms / 1000.0
+        self._last_report = now
+        self._id = GLib.timeout_add(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._id:
+            from gi.repository import GLib
+            GLib.source_remove(self._id)
+            self._id = 0
+
+    def running(self) -> bool:
+        return bool(self._id)
+
+    def record(self, now):
+        lag = max(0.0, (now - self._expected) * 1000.0)
+        self.samples += 1
+        self.total_ms += lag
+        self.max_ms = max(self.max_ms, lag)
+        self.last_ms = lag
+        self._expected = now + self.interval_ms / 1000.0
+        return lag
+
+    def _tick(self):
+        now = self.clock()
+        self.record(now)
+        if now - self._last_report >= self.report_every:
+            debug_print(f"[lag] {self.report()}")
+            self._last_report = now
+        if self._until is not None and now >= self._until:
+            self._id = 0
+            return False
+        return True
+
+    def snapshot(self):
+        avg = self.total_ms / self.samples if self.samples else 0.0
+        return {"samples": self.samples, "avg_ms": avg, "max_ms": self.max_ms, "last_ms": self.last_ms}
+
+    def report(self):
+        s = self.snapshot()
+        return f"samples={s['samples']} avg={s['avg_ms']:.1f}ms max={s['max_ms']:.1f}ms last={s['last_ms']:.1f}ms"
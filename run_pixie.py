@@ -1,4 +1,6 @@
-from pixie.__main__ import main
+import multiprocessing
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    multiprocessing.freeze_support()
+    from pixie.__main__ import main
+    main()
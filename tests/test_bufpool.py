@@ -0,0 +1,49 @@
+from pixie.bufpool import BufferPool, bucket, MIN_BUCKET
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_bucket_sizes():
+    assert bucket(1) == MIN_BUCKET
+    assert bucket(MIN_BUCKET) == MIN_BUCKET
+    assert bucket(MIN_BUCKET + 1) == 2 * MIN_BUCKET
+    assert bucket(100_000) == 131072
+
+def test_given_buffers_are_reused():
+    pool = BufferPool()
+    a = pool.take(5000)
+    assert len(a) == 8192
+    pool.give(a)
+    assert pool.take(6000) is a
+    assert (pool.allocs, pool.reuses) == (1, 1)
+
+def test_per_bucket_limit():
+    pool = BufferPool(per_bucket=2)
+    bufs = [pool.take(10) for _ in range(3)]
+    pool.give(*bufs)
+    assert pool.stats()["pooled_bytes"] == 2 * MIN_BUCKET
+    pool.take(10)
+    pool.take(10)
+    assert (pool.allocs, pool.reuses) == (3, 2)
+    pool.take(10)
+    assert pool.allocs == 4
+
+def test_stats_rate_and_reset():
+    clock = Clock()
+    pool = BufferPool(clock=clock)
+    pool.take(10)
+    pool.frame()
+    pool.frame()
+    clock.now = 2.0
+    stats = pool.stats()
+    assert stats["allocs"] == 1 and stats["frames"] == 2
+    assert stats["allocs_per_s"] == 0.5
+    assert stats["frames_per_s"] == 1.0
+    pool.reset()
+    clock.now = 3.0
+    assert pool.stats()["allocs_per_s"] == 0.0
+    assert pool.stats()["frames_per_s"] == 0.0
@@ -0,0 +1,119 @@
+import os, select, socket, threading, time
+import pytest
+from pixie import control
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs unix sockets")
+
+class Loop:
+    def __init__(self):
+        self.watches = {}
+        self._next = 1
+
+    def watch(self, fd, writable, fn):
+        sid, self._next = self._next, self._next + 1
+        self.watches[sid] = (fd, writable, fn)
+        return sid
+
+    def unwatch(self, sid):
+        del self.watches[sid]
+
+    def pump(self, timeout=0.0):
+        readers = {fd: sid for sid, (fd, w, _fn) in self.watches.items() if not w}
+        writers = {fd: sid for sid, (fd, w, _fn) in self.watches.items() if w}
+        r, w, _ = select.select(list(readers), list(writers), [], timeout)
+        for fd in r + w:
+            sid = readers.get(fd) if fd in r else writers.get(fd)
+            if sid in self.watches and not self.watches[sid][2]():
+                self.watches.pop(sid, None)
+
+@pytest.fixture
+def server(tmp_path):
+    loop = Loop()
+    t = [0.0]
+    calls = []
+    def handler(words):
+        calls.append(words)
+        if words == ["boom"]:
+            raise ValueError("bad")
+        return "ok " + " ".join(words)
+    srv = control.ControlServer(handler, str(tmp_path / "ctl.sock"), watch=loop.watch, unwatch=loop.unwatch,
+                                clock=lambda: t[0])
+    assert srv.start()
+    yield srv, loop, calls, t
+    srv.stop()
+
+def connect(srv):
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.connect(srv.path)
+    s.settimeout(2.0)
+    return s
+
+def test_round_trip_through_send_command(server):
+    srv, loop, calls, _t = server
+    result = []
+    th = threading.Thread(target=lambda: result.append(control.send_command(["get", "color"], srv.path)))
+    th.start()
+    deadline = time.monotonic() + 2.0
+    while th.is_alive() and time.monotonic() < deadline:
+        loop.pump(0.01)
+    th.join(1.0)
+    assert result == ["ok get color"]
+    assert calls == [["get", "color"]]
+    assert not srv._clients
+
+def test_silent_client_does_not_block_the_loop(server):
+    srv, loop, calls, _t = server
+    idle = connect(srv)
+    t0 = time.monotonic()
+    loop.pump(0.1)
+    loop.pump(0.0)
+    assert time.monotonic() - t0 < 0.5
+    assert len(srv._clients) == 1
+
+    busy = connect(srv)
+    busy.sendall(b"ping\n")
+    for _ in range(5):
+        loop.pump(0.05)
+    assert busy.recv(100) == b"ok pong\n"
+    idle.sendall(b"set ")
+    loop.pump(0.05)
+    assert calls == []
+    idle.sendall(b"speed 2\n")
+    for _ in range(5):
+        loop.pump(0.05)
+    assert idle.recv(100) == b"ok set speed 2\n"
+    idle.close()
+    busy.close()
+
+def test_errors_are_replied(server):
+    srv, loop, calls, _t = server
+    for line, reply in ((b"boom\n", b"error bad\n"), (b"\n", b"error empty command\n")):
+        s = connect(srv)
+        s.sendall(line)
+        for _ in range(5):
+            loop.pump(0.05)
+        assert s.recv(100) == reply
+        s.close()
+
+def test_stale_and_excess_clients_are_dropped(server):
+    srv, loop, calls, t = server
+    socks = []
+    for _ in range(control.MAX_CLIENTS + 2):
+        socks.append(connect(srv))
+        loop.pump(0.05)
+    assert len(srv._clients) == control.MAX_CLIENTS
+    t[0] = control.CLIENT_TIMEOUT_S + 1.0
+    late = connect(srv)
+    loop.pump(0.05)
+    assert len(srv._clients) == 1
+    assert socks[0].recv(10) == b""
+    for s in socks + [late]:
+        s.close()
+
+def test_stop_removes_the_socket(server):
+    srv, loop, _calls, _t = server
+    connect(srv)
+    loop.pump(0.05)
+    srv.stop()
+    assert not os.path.exists(srv.path)
+    assert loop.watches == {}
@@ -0,0 +1,58 @@
+import pytest
+
+try:
+    from gi.repository import GdkPixbuf, GLib
+    from pixie import framecache, render
+    from pixie.sprite import Frames
+except (ImportError, ValueError):
+    pytest.skip("needs PyGObject with Gdk 4", allow_module_level=True)
+
+def make_cache(monkeypatch):
+    pix = GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(bytes(4 * 4 * 4)), GdkPixbuf.Colorspace.RGB,
+                                          True, 8, 4, 4, 16)
+    cache = framecache.FrameCache(1.0)
+    cache._frames["cat.gif"] = [(pix, 100)]
+    calls = []
+    real = render.render_raw
+    monkeypatch.setattr(render, "render_raw", lambda *a, **kw: calls.append(a[2:4]) or real(*a, **kw))
+    return cache, calls
+
+def test_quality_ladder_reuses_cached_variants(monkeypatch):
+    cache, calls = make_cache(monkeypatch)
+    tinted = (1.0, 0.5, 0.5)
+    cache.set_tint(tinted)
+    first = cache.texture("cat.gif", 0, 1)
+    cache.set_tint(None)
+    cache.set_interp(GdkPixbuf.InterpType.NEAREST)
+    plain = cache.texture("cat.gif", 0, 1)
+    built = len(calls)
+    cache.set_interp(GdkPixbuf.InterpType.BILINEAR)
+    cache.set_tint(tinted)
+    assert cache.texture("cat.gif", 0, 1) is first
+    cache.set_tint(None)
+    cache.set_interp(GdkPixbuf.InterpType.NEAREST)
+    assert cache.texture("cat.gif", 0, 1) is plain
+    assert len(calls) == built == 2
+
+def test_old_looks_are_evicted(monkeypatch):
+    cache, calls = make_cache(monkeypatch)
+    for i in range(framecache.LOOKS + 2):
+        cache.set_tint((1.0, 1.0, i / 10))
+        cache.texture("cat.gif", 0, 1)
+    assert cache.stats()["textures"] == framecache.LOOKS
+
+@pytest.mark.parametrize("scale, facing, want", [
+    (1.0, 1, (2, 1, (10, 8))),
+    (1.0, -1, (3, 1, (10, 8))),
+    (2.0, 1, (4, 2, (20, 16))),
+    (2.0, -1, (6, 2, (20, 16))),
+    (1.5, 1, (3, 2, (15, 12))),
+])
+def test_placement_restores_crop_offsets(monkeypatch, scale, facing, want):
+    cache, _calls = make_cache(monkeypatch)
+    frames = Frames(cache._frames["cat.gif"])
+    frames.offset, frames.full = (2, 1), (10, 8)
+    cache._frames["cat.gif"] = frames
+    cache.set_scale(scale)
+    width = round(5 * scale)
+    assert cache.placement("cat.gif", facing, width) == want
@@ -0,0 +1,51 @@
+import json, struct
+import pytest
+from pixie import framepack
+from pixie.shmcache import SharedFrameCache
+
+def write_pack(path, entries):
+    index, blobs, off = {}, [], 0
+    for name, (source_size, frames) in entries.items():
+        rows = []
+        for w, h, data in frames:
+            rows.append([w, h, w * 4, True, 100, off, len(data)])
+            blobs.append(data)
+            off += len(data)
+        index[name] = {"source_size": source_size, "frames": rows, "offset": [1, 2], "full": [8, 8]}
+    blob = json.dumps(index).encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(framepack.MAGIC + struct.pack("<I", len(blob)) + blob + b"".join(blobs))
+
+@pytest.fixture
+def pack(tmp_path, monkeypatch):
+    path = tmp_path / "frames.pack"
+    write_pack(path, {"cat.gif": (1234, [(1, 1, b"\1\2\3\4"), (1, 2, b"\5" * 8)])})
+    monkeypatch.setenv("PIXIE_FRAME_PACK", str(path))
+    monkeypatch.setattr(framepack, "_loaded", None)
+    return path
+
+def test_load_slices_frames_in_order(pack):
+    packs = framepack.load(pack)
+    source_size, raws, offset, full = packs["cat.gif"]
+    assert source_size == 1234 and offset == [1, 2] and full == [8, 8]
+    assert [bytes(raw[4]) for raw, _delay in raws] == [b"\1\2\3\4", b"\5" * 8]
+    assert [raw[:4] for raw, _delay in raws] == [(1, 1, 4, True), (1, 2, 4, True)]
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "frames.pack"
+    path.write_bytes(b"GIF89a" + bytes(16))
+    with pytest.raises(ValueError):
+        framepack.load(path)
+
+def test_stamp_by_basename_without_source(pack, tmp_path):
+    assert framepack.stamp(str(tmp_path / "missing" / "cat.gif")) == ("cat.gif", 1234)
+    assert framepack.stamp("dog.gif") is None
+
+def test_shm_key_follows_pack_when_gif_is_absent(pack, tmp_path, monkeypatch):
+    shm = SharedFrameCache(str(tmp_path))
+    asset = str(tmp_path / "missing" / "cat.gif")
+    key = shm.key(asset, 2.0, None, 1)
+    assert key == shm.key(asset, 2.0, None, 1)
+    write_pack(pack, {"cat.gif": (4321, [(1, 1, b"\0" * 4)])})
+    monkeypatch.setattr(framepack, "_loaded", None)
+    assert shm.key(asset, 2.0, None, 1) != key
@@ -0,0 +1,45 @@
+from pixie import governor
+from pixie.governor import Governor, LEVELS
+
+def make(**kw):
+    levels = []
+    return Governor(0.1, levels.append, **kw), levels
+
+def test_steps_down_after_sustained_overload():
+    gov, levels = make(down_after=2)
+    gov.observe(0.2)
+    assert levels == []
+    gov.observe(0.2)
+    assert levels == [1] and gov.level == 1
+
+def test_steps_up_only_with_headroom():
+    gov, levels = make(down_after=1, up_after=2, headroom=0.5)
+    gov.observe(0.2)
+    gov.observe(0.08)
+    gov.observe(0.08)
+    assert gov.level == 1
+    gov.observe(0.04)
+    gov.observe(0.04)
+    assert levels == [1, 0]
+
+def test_level_is_clamped():
+    gov, levels = make(down_after=1)
+    for _ in range(len(LEVELS) + 3):
+        gov.observe(1.0)
+    assert gov.level == len(LEVELS) - 1
+    assert levels == list(range(1, len(LEVELS)))
+
+def test_transition_history_is_bounded():
+    gov, _ = make(down_after=1, up_after=1)
+    for _ in range(governor.HISTORY * 2):
+        gov.observe(1.0)
+        gov.observe(0.0)
+    assert len(gov.transitions) == governor.HISTORY
+    assert gov.transitions[-1][1:3] == (1, 0)
+
+def test_sample_is_cpu_share_of_wall_time():
+    t = [0.0, 0.0]
+    gov = Governor(0.1, lambda level: None, clock=lambda: t[0], cpu=lambda: t[1])
+    assert gov.sample() == 0.0
+    t[:] = [2.0, 0.5]
+    assert gov.sample() == 0.25
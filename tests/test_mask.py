@@ -0,0 +1,37 @@
+import random
+from pixie.mask import AlphaMask
+
+def covered(rects):
+    cells = []
+    for x, y, w, h in rects:
+        cells += [(x + i, y + j) for j in range(h) for i in range(w)]
+    return cells
+
+def test_rects_merge_identical_rows():
+    bits = bytes([
+        0, 1, 1, 0,
+        0, 1, 1, 0,
+        1, 1, 0, 1,
+    ])
+    mask = AlphaMask(4, 3, bits)
+    assert sorted(mask.rects()) == [(0, 2, 2, 1), (1, 0, 2, 2), (3, 2, 1, 1)]
+
+def test_rects_cover_exactly_the_set_pixels():
+    rng = random.Random(7)
+    for _ in range(50):
+        w, h = rng.randint(1, 20), rng.randint(1, 20)
+        bits = bytes(rng.random() < 0.6 for _ in range(w * h))
+        mask = AlphaMask(w, h, bits)
+        cells = covered(mask.rects())
+        assert len(cells) == len(set(cells))
+        assert set(cells) == {(x, y) for y in range(h) for x in range(w) if bits[y * w + x]}
+
+def test_empty_and_full():
+    assert AlphaMask(3, 2, bytes(6)).rects() == []
+    assert AlphaMask(3, 2, b"\x01" * 6).rects() == [(0, 0, 3, 2)]
+
+def test_hit():
+    mask = AlphaMask(2, 2, bytes([1, 0, 0, 1]))
+    assert mask.hit(0, 0) and mask.hit(1, 1)
+    assert not mask.hit(1, 0)
+    assert not mask.hit(-1, 0) and not mask.hit(2, 1)
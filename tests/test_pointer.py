@@ -0,0 +1,69 @@
+from pixie import pointer
+
+class Job:
+    def __init__(self):
+        self.finished = False
+
+    def done(self):
+        return self.finished
+
+class Pool:
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args, key=None, callback=None):
+        job = Job()
+        self.jobs.append((job, callback))
+        return job
+
+    def finish(self, index, pos):
+        job, callback = self.jobs[index]
+        job.finished = True
+        callback(pos)
+
+def sampler(max_age=0.3):
+    t = [0.0]
+    pool = Pool()
+    return pointer.PointerSampler(pool, max_age=max_age, clock=lambda: t[0]), pool, t
+
+def test_one_query_in_flight_at_a_time():
+    s, pool, t = sampler()
+    s.tick()
+    s.tick()
+    assert len(pool.jobs) == 1
+    pool.finish(0, (10, 20))
+    s.tick()
+    assert len(pool.jobs) == 2
+
+def test_samples_expire_by_age_not_by_caller():
+    s, pool, t = sampler(max_age=0.3)
+    s.tick()
+    pool.finish(0, (10, 20))
+    t[0] = 0.2
+    assert s.latest() == (10, 20)
+    t[0] = 0.31
+    assert s.latest() is None
+
+def test_older_request_cannot_replace_a_newer_sample():
+    s, pool, t = sampler()
+    s.tick()
+    pool.jobs[0][0].finished = True
+    t[0] = 0.1
+    s.tick()
+    pool.finish(1, (5, 5))
+    pool.jobs[0][1]((1, 1))
+    assert s.latest() == (5, 5)
+
+def test_query_uses_the_sampler_for_blocking_backends():
+    s, pool, t = sampler()
+    saved = pointer._backends
+    pointer._backends = pointer._blocking
+    pointer.install_sampler(s)
+    try:
+        assert pointer.get_mouse_position() is None
+        pointer.tick()
+        pool.finish(0, (3, 4))
+        assert pointer.get_mouse_position() == (3, 4)
+    finally:
+        pointer.install_sampler(None)
+        pointer._backends = saved
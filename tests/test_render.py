@@ -0,0 +1,62 @@
+import random
+import pytest
+
+try:
+    from gi.repository import GdkPixbuf, GLib
+    from pixie import render
+    from pixie.bufpool import BufferPool
+except (ImportError, ValueError):
+    pytest.skip("needs PyGObject with GdkPixbuf", allow_module_level=True)
+
+def make_pixbuf(w, h, nch, pad, seed):
+    rng = random.Random(seed)
+    stride = w * nch + pad
+    data = bytes(rng.randrange(256) for _ in range(stride * h))
+    pix = GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(data), GdkPixbuf.Colorspace.RGB,
+                                          nch == 4, 8, w, h, stride)
+    return pix, data, stride
+
+def reference(data, stride, w, h, nch, k, rgb, facing):
+    out = bytearray()
+    for y in range(h):
+        row = []
+        for x in range(w):
+            px = list(data[y * stride + x * nch:y * stride + (x + 1) * nch])
+            if rgb:
+                px[:3] = [int(v * f) for v, f in zip(px[:3], rgb)]
+            row.append(bytes(px))
+        if facing < 0:
+            row.reverse()
+        line = b"".join(px * k for px in row)
+        out += line * k
+    return bytes(out)
+
+@pytest.mark.parametrize("nch", (3, 4))
+@pytest.mark.parametrize("pad", (0, 3))
+@pytest.mark.parametrize("k", (1, 2, 3))
+@pytest.mark.parametrize("rgb", (None, (0.5, 1.0, 0.25)))
+@pytest.mark.parametrize("facing", (1, -1))
+def test_matches_reference(nch, pad, k, rgb, facing):
+    w, h = 7, 5
+    pix, data, stride = make_pixbuf(w, h, nch, pad, seed=nch * 100 + pad * 10 + k)
+    pool = BufferPool()
+    rw, rh, rstride, alpha, out = render.render_raw(pix, float(k), rgb, facing=facing, pool=pool)
+    assert (rw, rh, rstride, alpha) == (w * k, h * k, w * nch * k, nch == 4)
+    assert bytes(out) == reference(data, stride, w, h, nch, k, rgb, facing)
+    assert pool.frames == 1
+
+def test_reuses_buffers_across_frames():
+    pix, _data, _stride = make_pixbuf(16, 16, 4, 0, seed=1)
+    pool = BufferPool()
+    first = render.render_raw(pix, 2.0, (0.9, 0.8, 0.7), facing=-1, pool=pool)
+    allocs = pool.allocs
+    second = render.render_raw(pix, 2.0, (0.9, 0.8, 0.7), facing=-1, pool=pool)
+    assert pool.allocs == allocs
+    assert pool.reuses >= allocs
+    assert bytes(first[4]) == bytes(second[4])
+
+def test_fractional_scale_uses_the_interpolator():
+    pix, _data, _stride = make_pixbuf(10, 6, 4, 0, seed=2)
+    w, h, stride, _alpha, out = render.render_raw(pix, 1.5, None, pool=BufferPool())
+    assert (w, h) == (15, 9)
+    assert len(out) >= stride * h
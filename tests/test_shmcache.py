@@ -0,0 +1,84 @@
+import mmap, os
+import pytest
+from pixie.shmcache import SharedFrameCache, MAGIC
+
+pytestmark = pytest.mark.skipif(not SharedFrameCache.available(), reason="needs fcntl")
+
+class Segments:
+    def __init__(self):
+        self.mapped = []
+
+    def __call__(self, path):
+        self.mapped.append(path)
+        with open(path, "rb") as f:
+            view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return lambda off, length: view[off:off + length]
+
+def cache(tmp_path, pid=None):
+    segments = Segments()
+    c = SharedFrameCache(str(tmp_path), segment=segments)
+    if pid is not None:
+        c._pid = pid
+    return c, segments
+
+RAWS = [
+    (2, 1, 8, True, bytes(range(8))),
+    (1, 1, 3, False, b"\xff\x00\x7f"),
+]
+
+def test_publish_then_attach(tmp_path):
+    pub, pub_segments = cache(tmp_path)
+    pub.publish("k", RAWS)
+    assert pub.load("k") == RAWS
+    assert pub_segments.mapped == []
+
+    other, segments = cache(tmp_path, pid=os.getppid())
+    frames = other.load("k")
+    assert [f[:4] for f in frames] == [r[:4] for r in RAWS]
+    assert [bytes(f[4]) for f in frames] == [r[4] for r in RAWS]
+    assert all(isinstance(f[4], memoryview) for f in frames)
+    assert len(segments.mapped) == 1
+    assert other.load("k") is frames
+
+def test_missing_or_corrupt_segments(tmp_path):
+    c, _ = cache(tmp_path)
+    assert c.load("nope") is None
+    with open(c._path("bad"), "wb") as f:
+        f.write(b"NOTMAGIC" + bytes(8))
+    assert c.load("bad") is None
+    c.publish("cut", RAWS)
+    c._attached.clear()
+    with open(c._path("cut"), "r+b") as f:
+        f.truncate(os.path.getsize(c._path("cut")) - 1)
+    assert c.load("cut") is None
+
+def test_last_reference_removes_the_segment(tmp_path):
+    pub, _ = cache(tmp_path)
+    pub.publish("k", RAWS)
+    other, _ = cache(tmp_path, pid=os.getppid())
+    assert other.load("k")
+    pub.close()
+    assert os.path.exists(pub._path("k"))
+    other.close()
+    assert not os.path.exists(pub._path("k"))
+    assert not os.path.exists(pub._path("k") + ".refs")
+
+def test_publish_does_not_overwrite(tmp_path):
+    a, _ = cache(tmp_path)
+    a.publish("k", RAWS)
+    b, _ = cache(tmp_path, pid=os.getppid())
+    b.publish("k", [(1, 1, 3, False, b"abc")])
+    with open(a._path("k"), "rb") as f:
+        assert f.read(len(MAGIC)) == MAGIC
+    assert [bytes(f[4]) for f in b.load("k")] == [r[4] for r in RAWS]
+
+def test_key_tracks_the_variant_and_source(tmp_path):
+    c, _ = cache(tmp_path)
+    asset = tmp_path / "cat.gif"
+    asset.write_bytes(b"GIF89a")
+    base = c.key(str(asset), 2.0, None, 1)
+    assert c.key(str(asset), 2.0, None, 1) == base
+    assert len({base, c.key(str(asset), 3.0, None, 1), c.key(str(asset), 2.0, (1.0, 0.5, 0.5), 1),
+                c.key(str(asset), 2.0, None, -1), c.key(str(asset), 2.0, None, 1, (1,))}) == 5
+    asset.write_bytes(b"GIF89a-changed")
+    assert c.key(str(asset), 2.0, None, 1) != base
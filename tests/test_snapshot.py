@@ -0,0 +1,57 @@
+import random, types
+from pixie import snapshot
+
+class Cache:
+    def raw(self, asset, index, facing):
+        return (2, 1, 8, True, bytes([index, facing & 0xff]) * 4)
+
+def make_pet(x, seed, asset="walk.gif", index=1, facing=-1):
+    bm = types.SimpleNamespace(state=lambda: {"mode": "walk"}, rng=random.Random(seed))
+    return types.SimpleNamespace(
+        pos_x=x, pos_y=20.0, facing=facing, bm=bm, cache=Cache(), _asset=asset,
+        sprite=types.SimpleNamespace(index=index), _offset=(1, 2), _sprite_size=(64, 64),
+        variants_in_use=lambda: [(asset, facing)], scale=2.0, tint=(1.0, 0.5, 0.5), interp=2)
+
+def make_app(*pets):
+    return types.SimpleNamespace(pets=list(pets), win=pets[0])
+
+def test_round_trip_keeps_state_and_frames(tmp_path):
+    path = str(tmp_path / "snap.bin")
+    a, b = make_pet(10.0, 1), make_pet(30.0, 2, index=3, facing=1)
+    assert snapshot.save(make_app(a, b), path)
+    header = snapshot.load(path)
+    first, second = header["pets"]
+    assert first["pos"] == [10.0, 20.0] and second["pos"] == [30.0, 20.0]
+    assert first["variants"] == [["walk.gif", -1]]
+    assert first["raw"] == (2, 1, 8, True, bytes([1, 0xff]) * 4)
+    assert second["raw"] == (2, 1, 8, True, bytes([3, 1]) * 4)
+    assert snapshot.matches(header, 2.0, (1.0, 0.5, 0.5), 2)
+    assert not snapshot.matches(header, 2.0, None, 2)
+
+def test_rng_resumes_where_it_left_off(tmp_path):
+    path = str(tmp_path / "snap.bin")
+    pet = make_pet(0.0, 7)
+    pet.bm.rng.random()
+    snapshot.save(make_app(pet), path)
+    want = [pet.bm.rng.random() for _ in range(3)]
+    rng = random.Random()
+    snapshot.restore_rng(rng, snapshot.load(path)["pets"][0]["rng"])
+    assert [rng.random() for _ in range(3)] == want
+    snapshot.restore_rng(rng, "garbage")
+
+def test_stale_or_foreign_snapshots_are_ignored(tmp_path, monkeypatch):
+    path = str(tmp_path / "snap.bin")
+    snapshot.save(make_app(make_pet(0.0, 1)), path)
+    monkeypatch.setattr(snapshot.time, "time", lambda: 1e12)
+    assert snapshot.load(path) is None
+    monkeypatch.undo()
+    (tmp_path / "other.bin").write_bytes(b"not a snapshot")
+    assert snapshot.load(str(tmp_path / "other.bin")) is None
+    assert snapshot.load(str(tmp_path / "missing.bin")) is None
+
+def test_truncated_frame_is_dropped(tmp_path):
+    path = tmp_path / "snap.bin"
+    snapshot.save(make_app(make_pet(0.0, 1)), str(path))
+    path.write_bytes(path.read_bytes()[:-1])
+    pet = snapshot.load(str(path))["pets"][0]
+    assert "raw" not in pet and pet["pos"] == [0.0, 20.0]
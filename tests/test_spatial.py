@@ -0,0 +1,47 @@
+import random
+from pixie.spatial import SpatialHash, naive_pairs
+
+def norm(pairs):
+    return sorted(tuple(sorted(p)) for p in pairs)
+
+def scatter(n, seed, span=1000.0):
+    rng = random.Random(seed)
+    return {f"pet{i}": (rng.uniform(-span, span), rng.uniform(-span, span)) for i in range(n)}
+
+def test_pairs_match_brute_force():
+    for seed, cell, radius in ((1, 96.0, 64.0), (2, 50.0, 120.0), (3, 200.0, 10.0)):
+        pos = scatter(150, seed)
+        grid = SpatialHash(cell)
+        for item, (x, y) in pos.items():
+            grid.update(item, x, y)
+        pairs = grid.pairs(radius)
+        assert len(pairs) == len(set(map(frozenset, pairs)))
+        assert norm(pairs) == norm(naive_pairs(pos, radius))
+
+def test_query_matches_brute_force():
+    pos = scatter(100, 4)
+    grid = SpatialHash(80.0)
+    for item, (x, y) in pos.items():
+        grid.update(item, x, y)
+    hits = sorted(item for item, _d2 in grid.query(0.0, 0.0, 300.0, exclude="pet0"))
+    want = sorted(k for k, (x, y) in pos.items() if k != "pet0" and x * x + y * y <= 300.0 ** 2)
+    assert hits == want
+
+def test_update_and_remove_keep_cells_consistent():
+    grid = SpatialHash(10.0)
+    grid.update("a", 1.0, 1.0)
+    grid.update("b", 5.0, 5.0)
+    assert norm(grid.pairs(10.0)) == [("a", "b")]
+    grid.update("a", 95.0, 95.0)
+    assert grid.pairs(10.0) == []
+    grid.remove("a")
+    grid.remove("a")
+    assert len(grid) == 1
+    assert set(grid._cells) == {(0, 0)}
+
+def test_exclude_compares_by_equality():
+    grid = SpatialHash(10.0)
+    grid.update(("pet", 1), 0.0, 0.0)
+    grid.update(("pet", 2), 3.0, 0.0)
+    key = tuple(["pet", 1])
+    assert [item for item, _d2 in grid.query(0.0, 0.0, 5.0, exclude=key)] == [("pet", 2)]
@@ -0,0 +1,40 @@
+import pytest
+
+try:
+    from gi.repository import GdkPixbuf, GLib
+    from pixie.sprite import Frames, content_box, crop_frames
+except (ImportError, ValueError):
+    pytest.skip("needs PyGObject with GdkPixbuf", allow_module_level=True)
+
+def make_pixbuf(w, h, opaque=(), pad=3):
+    stride = w * 4 + pad
+    data = bytearray(stride * h)
+    for x, y in opaque:
+        data[y * stride + x * 4:y * stride + x * 4 + 4] = bytes([x, y, 7, 255])
+    return GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(bytes(data)), GdkPixbuf.Colorspace.RGB,
+                                           True, 8, w, h, stride)
+
+def pixel(pix, x, y):
+    off = y * pix.get_rowstride() + x * pix.get_n_channels()
+    return bytes(pix.get_pixels()[off:off + 4])
+
+def test_content_box_bounds_opaque_pixels():
+    assert content_box(make_pixbuf(8, 6, [(2, 1), (5, 3)])) == (2, 1, 6, 4)
+    assert content_box(make_pixbuf(8, 6)) is None
+
+def test_crop_uses_the_union_of_all_frames():
+    frames = [(make_pixbuf(10, 8, [(2, 3)]), 100), (make_pixbuf(10, 8, [(6, 1), (4, 5)]), 80)]
+    out = crop_frames(frames)
+    assert out.offset == (2, 1) and out.full == (10, 8)
+    assert [(p.get_width(), p.get_height(), d) for p, d in out] == [(5, 5, 100), (5, 5, 80)]
+    assert pixel(out[0][0], 0, 2) == bytes([2, 3, 7, 255])
+    assert pixel(out[1][0], 4, 0) == bytes([6, 1, 7, 255])
+    assert pixel(out[1][0], 2, 4) == bytes([4, 5, 7, 255])
+
+def test_crop_leaves_full_or_mismatched_frames_alone():
+    full = [(make_pixbuf(3, 2, [(0, 0), (2, 1)]), 100)]
+    out = crop_frames(full)
+    assert out.offset == (0, 0) and out[0][0] is full[0][0]
+    mixed = [(make_pixbuf(4, 4, [(1, 1)]), 100), (make_pixbuf(5, 4, [(1, 1)]), 100)]
+    out = crop_frames(mixed)
+    assert out.offset == (0, 0) and isinstance(out, Frames)
@@ -0,0 +1,159 @@
+import pytest
+from pixie.timers import TimerService
+
+class Loop:
+    def __init__(self, snap=0.0):
+        self.snap = snap
+        self.now = 0.0
+        self.sources = {}
+        self.armed = []
+        self._next = 1
+
+    def clock(self):
+        return self.now
+
+    def arm(self, ms, fn, coarse):
+        sid, self._next = self._next, self._next + 1
+        self.sources[sid] = (self.now + ms / 1000.0 + (self.snap if coarse else 0.0), fn)
+        self.armed.append((ms, coarse))
+        return sid
+
+    def disarm(self, sid):
+        del self.sources[sid]
+
+    def run(self, until):
+        while self.sources:
+            sid, (at, fn) = min(self.sources.items(), key=lambda kv: kv[1][0])
+            if at > until:
+                break
+            self.now = at
+            del self.sources[sid]
+            fn()
+        self.now = until
+
+def service(snap=0.0):
+    loop = Loop(snap)
+    return loop, TimerService(clock=loop.clock, arm=loop.arm, disarm=loop.disarm)
+
+def test_fires_in_deadline_order():
+    loop, ts = service()
+    hits = []
+    ts.schedule("b", 0.2, lambda: hits.append(("b", loop.now)))
+    ts.schedule("a", 0.1, lambda: hits.append(("a", loop.now)))
+    loop.run(1.0)
+    assert hits == [("a", 0.1), ("b", 0.2)]
+    assert len(ts) == 0 and not loop.sources
+    assert ts.stats()["fired"] == 2
+
+def test_pushing_later_keeps_the_armed_source():
+    loop, ts = service()
+    hits = []
+    ts.schedule("happy", 1.0, lambda: hits.append(loop.now))
+    for _ in range(10):
+        loop.now += 0.1
+        ts.schedule("happy", 1.0, lambda: hits.append(loop.now))
+    assert loop.armed == [(1000, False)]
+    assert len(ts._heap) == 1
+    loop.run(1.5)
+    assert hits == []
+    loop.run(3.0)
+    assert hits == [2.0]
+    assert ts.stats()["wakeups"] == 2
+
+def test_pulling_earlier_rearms():
+    loop, ts = service()
+    hits = []
+    ts.schedule("k", 5.0, lambda: hits.append(loop.now))
+    ts.reschedule("k", 0.5)
+    assert ts.deadline("k") == 0.5
+    assert len(loop.sources) == 1
+    loop.run(10.0)
+    assert hits == [0.5]
+
+def test_cancel_and_clear_disarm():
+    loop, ts = service()
+    ts.schedule("a", 1.0, lambda: None)
+    assert ts.cancel("a")
+    assert not ts.cancel("a")
+    assert not loop.sources
+    ts.schedule("a", 1.0, lambda: None)
+    ts.schedule("b", 2.0, lambda: None)
+    ts.clear()
+    assert not loop.sources and len(ts) == 0
+    assert not ts.stats()["armed"]
+
+def test_numeric_return_repeats():
+    loop, ts = service()
+    hits = []
+    def tick():
+        hits.append(loop.now)
+        return 1.5 if len(hits) < 3 else None
+    ts.schedule("top", 1.5, tick)
+    loop.run(10.0)
+    assert hits == [1.5, 3.0, 4.5]
+    assert "top" not in ts
+
+def test_slack_shares_a_wakeup():
+    loop, ts = service()
+    hits = []
+    ts.schedule("lenient", 1.0, lambda: hits.append("lenient"), slack=0.5)
+    ts.schedule("strict", 1.3, lambda: hits.append("strict"))
+    loop.run(2.0)
+    assert sorted(hits) == ["lenient", "strict"]
+    assert ts.stats()["wakeups"] == 1
+
+def test_coarse_arming():
+    loop, ts = service()
+    ts.schedule("frame", 30.0, lambda: None, slack=0.25)
+    assert loop.armed[-1] == (30250, False)
+    ts.schedule("frame", 1.5, lambda: None)
+    assert loop.armed[-1] == (1500, False)
+    ts.cancel("frame")
+    ts.schedule("expiry", 8.0, lambda: None, slack=2.0)
+    assert loop.armed[-1] == (9000, True)
+    assert ts.stats()["coarse"]
+    ts.schedule("soon", 0.2, lambda: None, slack=2.0)
+    assert loop.armed[-1] == (1000, True)
+    ts.schedule("tight", 0.1, lambda: None, slack=0.5)
+    assert loop.armed[-1] == (600, False)
+
+@pytest.mark.parametrize("snap", (-0.25, 0.0, 0.5, 0.75))
+@pytest.mark.parametrize("delay", (0.3, 1.0, 1.5, 7.2))
+def test_coarse_wakeup_is_never_early_and_never_doubled(snap, delay):
+    loop, ts = service(snap)
+    hits = []
+    ts.schedule("expiry", delay, lambda: hits.append(loop.now), slack=2.0)
+    loop.run(delay + 10.0)
+    assert len(hits) == 1
+    assert delay <= hits[0] <= delay + 2.0
+    assert ts.stats()["wakeups"] == 1
+
+def test_repeating_timer_takes_one_wakeup_per_period():
+    loop, ts = service(0.75)
+    hits = []
+    def tick():
+        hits.append(loop.now)
+        return 1.5
+    ts.schedule("top", 1.5, tick)
+    loop.run(7.6)
+    assert hits == [1.5, 3.0, 4.5, 6.0, 7.5]
+    assert ts.stats()["wakeups"] == 5
+
+def test_failing_callback_does_not_stop_others():
+    loop, ts = service()
+    hits = []
+    ts.schedule("bad", 0.1, lambda: 1 / 0)
+    ts.schedule("good", 0.1, lambda: hits.append(loop.now))
+    loop.run(1.0)
+    assert hits == [0.1]
+
+def test_callback_scheduled_during_fire_waits_for_next_round():
+    loop, ts = service()
+    hits = []
+    def first():
+        ts.schedule("b", 0.0, lambda: hits.append(loop.now))
+    ts.schedule("a", 0.1, first)
+    loop.run(1.0)
+    assert hits == [0.1]
+    assert ts.stats()["wakeups"] == 2
+    assert not loop.sources
@@ -0,0 +1,80 @@
+import pytest
+from pixie.timestep import FixedStep
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_accumulates_whole_steps():
+    clock = Clock()
+    step = FixedStep(0.1, clock=clock)
+    step.reset()
+    clock.now = 0.25
+    assert step.advance() == 2
+    assert step.alpha == pytest.approx(0.5)
+    clock.now = 0.31
+    assert step.advance() == 1
+    assert step.alpha == pytest.approx(0.1)
+
+def test_slack_absorbs_timer_jitter():
+    clock = Clock()
+    step = FixedStep(0.1, slack=0.001, clock=clock)
+    step.reset()
+    clock.now = 0.0995
+    assert step.advance() == 1
+    assert step.alpha == 0.0
+
+def test_long_stall_is_clamped_and_dropped():
+    clock = Clock()
+    step = FixedStep(0.1, max_steps=5, clock=clock)
+    step.reset()
+    clock.now = 60.0
+    assert step.advance() == 5
+    assert step.alpha == 0.0
+    clock.now = 60.05
+    assert step.advance() == 0
+
+def test_set_dt_clamps_the_remainder():
+    clock = Clock()
+    step = FixedStep(1.0, clock=clock)
+    step.reset()
+    clock.now = 0.9
+    assert step.advance() == 0
+    step.set_dt(0.1)
+    assert step.alpha == pytest.approx(1.0)
+    assert step.advance() == 1
+
+def test_clock_never_runs_backwards():
+    clock = Clock()
+    step = FixedStep(0.1, clock=clock)
+    clock.now = 5.0
+    step.reset()
+    clock.now = 4.0
+    assert step.advance() == 0
+
+def test_leftover_steps_survive_a_retime():
+    clock = Clock()
+    step = FixedStep(0.1, clock=clock)
+    step.reset()
+    clock.now = 0.35
+    assert step.advance() == 3
+    step.refund(2)
+    step.retime(0.05)
+    assert step.advance() == 5
+    assert step.alpha == pytest.approx(0.0, abs=1e-6)
+    clock.now = 0.375
+    assert step.advance() == 0
+    assert step.alpha == pytest.approx(0.5)
+
+def test_retime_caps_carried_time():
+    clock = Clock()
+    step = FixedStep(1.0, max_steps=4, clock=clock)
+    step.reset()
+    clock.now = 3.5
+    assert step.advance() == 3
+    step.refund(3)
+    step.retime(0.1)
+    assert step.advance() == 4
@@ -0,0 +1,72 @@
+import pytest
+from pixie import trace
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "session.trace")
+    clock = Clock()
+    header = {"width": 1920, "height": 1080, "scale": 2.0, "tint": None}
+    rec = trace.TraceRecorder(path, header, clock=clock)
+    events = [
+        (0.001, rec.motion,  (1.5, -2.25),        trace.EV_MOTION,  (1.5, -2.25)),
+        (0.002, rec.leave,   (),                  trace.EV_LEAVE,   ()),
+        (0.010, rec.scroll,  (-1.0,),             trace.EV_SCROLL,  (-1.0,)),
+        (0.010, rec.click,   (),                  trace.EV_CLICK,   ()),
+        (0.250, rec.rng,     (0.123456789,),      trace.EV_RNG,     (0.123456789,)),
+        (0.300, rec.mode,    ("happy",),          trace.EV_MODE,    (trace.MODES.index("happy"),)),
+        (0.400, rec.step,    (100.5, 200.25),     trace.EV_STEP,    (100.5, 200.25)),
+        (0.500, rec.pointer, ((640.7, 480.2),),   trace.EV_POINTER, (1, 640, 480)),
+        (0.600, rec.pointer, (None,),             trace.EV_POINTER, (0, 0, 0)),
+        (0.700, rec.phase,   ("render", 0.0025),  trace.EV_PHASE,   (trace.PHASES.index("render"), 2500)),
+    ]
+    for at, fn, args, _kind, _values in events:
+        clock.now = at
+        fn(*args)
+    rec.close()
+    rec.close()
+    assert rec.count == len(events)
+
+    got_header, records = trace.read_trace(path)
+    assert got_header == header
+    assert [(t, k, v) for t, k, v in records] == [
+        (round(at * 1e6), kind, values) for at, _fn, _args, kind, values in events
+    ]
+
+def test_truncated_tail_is_ignored(tmp_path):
+    path = str(tmp_path / "cut.trace")
+    clock = Clock()
+    rec = trace.TraceRecorder(path, {}, clock=clock)
+    rec.step(1.0, 2.0)
+    rec.step(3.0, 4.0)
+    rec.close()
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-3])
+    _header, records = trace.read_trace(path)
+    assert [v for _t, _k, v in records] == [(1.0, 2.0)]
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.trace"
+    path.write_bytes(b"GIF89a....")
+    with pytest.raises(ValueError):
+        trace.read_trace(str(path))
+
+def test_replay_random_serves_recorded_draws():
+    rng = trace.ReplayRandom([0.25, 0.75])
+    assert [rng.random(), rng.random()] == [0.25, 0.75]
+    assert 0.0 <= rng.random() < 1.0
+    assert rng.misses == 1
+
+def test_traced_random_reports_draws():
+    seen = []
+    rng = trace.TracedRandom(3)
+    rng.sink = seen.append
+    draws = [rng.random() for _ in range(3)]
+    assert seen == draws
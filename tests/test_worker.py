@@ -0,0 +1,81 @@
+import threading, time
+import pytest
+from pixie.worker import WorkerPool, LagMonitor
+
+def pool(**kw):
+    delivered = []
+    def deliver(fn):
+        delivered.append(fn)
+    return WorkerPool(deliver=deliver, **kw), delivered
+
+def drain(delivered):
+    while delivered:
+        delivered.pop(0)()
+
+def wait(job):
+    job.future.result(timeout=5)
+
+def test_result_reaches_the_callback_on_delivery():
+    p, delivered = pool()
+    got = []
+    job = p.submit(lambda a, b: a + b, 2, 3, callback=got.append)
+    wait(job)
+    assert got == []
+    drain(delivered)
+    assert got == [5]
+    p.shutdown(wait=True)
+
+def test_failures_are_not_delivered_to_the_callback():
+    p, delivered = pool()
+    got = []
+    wait(p.submit(lambda: 1 / 0, callback=got.append))
+    drain(delivered)
+    assert got == []
+    p.shutdown(wait=True)
+
+def test_newer_job_with_the_same_key_supersedes():
+    p, delivered = pool(workers=1)
+    gate = threading.Event()
+    got = []
+    first = p.submit(lambda: (gate.wait(5), "old")[1], key="k", callback=got.append)
+    second = p.submit(lambda: "new", key="k", callback=got.append)
+    assert first.cancelled
+    gate.set()
+    wait(second)
+    drain(delivered)
+    assert got == ["new"]
+    assert p._pending == {}
+    p.shutdown(wait=True)
+
+def test_lane_runs_jobs_in_order_on_one_thread():
+    p, delivered = pool(workers=4)
+    seen = []
+    def job(i):
+        time.sleep(0.001 * (5 - i % 5))
+        seen.append((i, threading.current_thread().name))
+    jobs = [p.submit(job, i, lane="stream") for i in range(20)]
+    for j in jobs:
+        wait(j)
+    assert [i for i, _ in seen] == list(range(20))
+    assert len({name for _, name in seen}) == 1
+    assert seen[0][1].startswith("pixie-stream")
+    p.shutdown(wait=True)
+
+def test_nothing_is_delivered_after_shutdown():
+    p, delivered = pool()
+    got = []
+    wait(p.submit(lambda: 1, callback=got.append))
+    p.shutdown(wait=True)
+    drain(delivered)
+    assert got == []
+    assert p.submit(lambda: 1).cancelled
+
+def test_lag_monitor_records_overshoot():
+    t = [0.0]
+    lag = LagMonitor(interval_ms=100, clock=lambda: t[0])
+    lag._expected = 0.1
+    assert lag.record(0.15) == pytest.approx(50.0)
+    assert lag.record(0.25) == 0.0
+    snap = lag.snapshot()
+    assert snap["samples"] == 2 and snap["max_ms"] == pytest.approx(50.0)
+